@@ -1,13 +1,22 @@
 import os
+import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from dotenv import load_dotenv
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_anthropic import ChatAnthropic
 from tools import slack_api_tool, github_release_data_tool, release_summary_scorer, human_feedback_interface, process_analytics_optimizer, exception_handler_model_updater
 from context import slack_communication_guidelines, audience_specific_examples, release_notes_best_practices_tool, internal_review_guidelines, system_architecture_docs
-from prompts import agent1_prompt, agent2_prompt, agent3_prompt, agent4_prompt, agent5_prompt
+from prompts import agent1_prompt, agent2_prompt, agent3_prompt, agent4_prompt, agent5_prompt, pr_group_summary_prompt
 from langgraph.graph import StateGraph, END
+from instrumentation import MetricsCallbackHandler, record_run
+from release_parsing import extract_release_id, release_tool_input
+from compaction import COMPACTION_TOKEN_BUDGET, RELEASE_DATA_COMPACTION, compact_release_data
+from map_reduce import GENERATION_MODE, MAP_REDUCE_GROUP_SIZE, MAP_REDUCE_MIN_ITEMS, asummarize_groups, parse_release_data, summarize_groups, use_map_reduce
+from checkpoints import checkpoint_store, checkpointed, current_run_id
+from llm_cache import get_llm_cache
+from intent_classifier import OTHER, RELEASE_NOTES, classify
 from langchain_fireworks import ChatFireworks, FireworksEmbeddings
 
 # Setup logging
@@ -21,6 +30,9 @@ load_dotenv()
 class Config:
     RELEASE_NOTE_KEYWORDS = ["release notes", "changelog", "update", "new features"]
     REQUIRED_ENV_VARS = ['GITHUB_ACCESS_TOKEN', 'SLACK_APP_TOKEN',"SLACK_BOT_TOKEN", "SLACK_SIGNING_SECRET", "FIREWORKS_API_KEY"]
+    # "direct": parse the release ID and call github_release_data_tool without an LLM,
+    # using agent2 only when no single release ID can be parsed. "agent": always use agent2.
+    GITHUB_RETRIEVAL_MODE = os.environ.get("GITHUB_RETRIEVAL_MODE", "direct")
 
 # def validate_env_vars():
 #     for var in Config.REQUIRED_ENV_VARS:
@@ -31,7 +43,7 @@ class Config:
 
 # Initialize the language model
 anth_api_key = os.environ['ANTHROPIC_API_KEY']
-llm = ChatAnthropic(temperature=0.1, default_headers={"anthropic-beta": "max-tokens-3-5-sonnet-2024-07-15"}, anthropic_api_key=anth_api_key, model='claude-3-5-sonnet-20240620', max_tokens_to_sample=6000)
+llm = ChatAnthropic(temperature=0.1, default_headers={"anthropic-beta": "max-tokens-3-5-sonnet-2024-07-15"}, anthropic_api_key=anth_api_key, model='claude-3-5-sonnet-20240620', max_tokens_to_sample=6000, cache=get_llm_cache())
 # llm = ChatFireworks(
 #     api_key=os.getenv("FIREWORKS_API_KEY"),
 #     model="accounts/fireworks/models/llama-v3p1-70b-instruct"
@@ -73,18 +85,55 @@ class ReleaseNoteState(TypedDict):
     process_metrics: Dict[str, Any]
 
 # Define node functions
+def release_id_for(state: ReleaseNoteState) -> Optional[str]:
+    if Config.GITHUB_RETRIEVAL_MODE != "direct":
+        return None
+    release_id = extract_release_id(state["parsed_request"])
+    if release_id is None:
+        logger.info("No single release ID in the request, falling back to the GitHub retrieval agent")
+    return release_id
+
+def check_release_data(release_id: str, output: str) -> str:
+    data = json.loads(output)
+    if "error" in data:
+        raise ValueError(f"Could not fetch release {release_id}: {data['error']}")
+    return output
+
+# What each checkpointed node's output depends on besides its input state. A node only
+# lists its own prompts and settings, so editing a downstream prompt reuses upstream outputs.
+LLM_SETTINGS = (llm.model, llm.temperature, llm.max_tokens)
+RETRIEVAL_FINGERPRINT = (agent2_prompt, *LLM_SETTINGS, Config.GITHUB_RETRIEVAL_MODE)
+COMPACTION_FINGERPRINT = (RELEASE_DATA_COMPACTION, COMPACTION_TOKEN_BUDGET)
+GENERATION_FINGERPRINT = (agent3_prompt, pr_group_summary_prompt, *LLM_SETTINGS, GENERATION_MODE, MAP_REDUCE_MIN_ITEMS, MAP_REDUCE_GROUP_SIZE)
+
+def routed_without_llm(state: ReleaseNoteState) -> Optional[Dict[str, Any]]:
+    """Obvious requests and chatter are decided by the local intent classifier, skipping agent1."""
+    intent = classify(state["input"])
+    if not intent.confident:
+        return None
+    logger.info(f"Intent {intent.label} ({intent.reason}), skipping agent1")
+    return {**state, "parsed_request": state["input"] if intent.label == RELEASE_NOTES else None}
+
 def slack_interaction_node(state: ReleaseNoteState) -> Dict[str, Any]:
     try:
+        routed = routed_without_llm(state)
+        if routed is not None:
+            return routed
         result = agent1_executor.invoke({"input": state["input"]})
         return {**state, "parsed_request": result["output"]}
     except Exception as e:
         logger.error(f"Error in slack_interaction_node: {str(e)}")
         return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
 
+@checkpointed("github_data_retrieval", *RETRIEVAL_FINGERPRINT)
 def github_data_retrieval_node(state: ReleaseNoteState) -> Dict[str, Any]:
     try:
         if state["parsed_request"] is None:
             raise ValueError("No parsed request available")
+        release_id = release_id_for(state)
+        if release_id:
+            output = github_release_data_tool.invoke(release_tool_input(release_id))
+            return {**state, "github_data": check_release_data(release_id, output)}
         result = agent2_executor.invoke({"input": state["parsed_request"]})
         print(result)
         return {**state, "github_data": result["output"]}
@@ -92,11 +141,28 @@ def github_data_retrieval_node(state: ReleaseNoteState) -> Dict[str, Any]:
         logger.error(f"Error in github_data_retrieval_node: {str(e)}")
         return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
 
+@checkpointed("release_data_compaction", *COMPACTION_FINGERPRINT)
+def release_data_compaction_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        if state["github_data"] is None or not RELEASE_DATA_COMPACTION:
+            return state
+        github_data, report = compact_release_data(state["github_data"])
+        return {**state, "github_data": github_data, "process_metrics": {**state["process_metrics"], "compaction": report}}
+    except Exception as e:
+        logger.error(f"Error in release_data_compaction_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
+@checkpointed("data_analysis_content_generation", *GENERATION_FINGERPRINT)
 def data_analysis_content_generation_node(state: ReleaseNoteState) -> Dict[str, Any]:
     try:
         if state["github_data"] is None:
             raise ValueError("No GitHub data available")
-        result = agent3_executor.invoke({"input": state["github_data"]})
+        data = parse_release_data(state["github_data"])
+        if use_map_reduce(data):
+            # Large release: summarize groups of PRs in parallel, then have agent3 merge them
+            result = agent3_executor.invoke({"input": summarize_groups(llm, data)})
+        else:
+            result = agent3_executor.invoke({"input": state["github_data"]})
         return {**state, "generated_content": result["output"]}
     except Exception as e:
         logger.error(f"Error in data_analysis_content_generation_node: {str(e)}")
@@ -125,12 +191,83 @@ def process_management_optimization_node(state: ReleaseNoteState) -> Dict[str, A
         logger.error(f"Error in process_management_optimization_node: {str(e)}")
         return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
 
+# Async variants of the nodes: the executors run through `ainvoke`, so a single event loop
+# can drive many releases at once while each one waits on the LLM and GitHub.
+async def aslack_interaction_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        routed = routed_without_llm(state)
+        if routed is not None:
+            return routed
+        result = await agent1_executor.ainvoke({"input": state["input"]})
+        return {**state, "parsed_request": result["output"]}
+    except Exception as e:
+        logger.error(f"Error in slack_interaction_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
+@checkpointed("github_data_retrieval", *RETRIEVAL_FINGERPRINT)
+async def agithub_data_retrieval_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        if state["parsed_request"] is None:
+            raise ValueError("No parsed request available")
+        release_id = release_id_for(state)
+        if release_id:
+            output = await github_release_data_tool.ainvoke(release_tool_input(release_id))
+            return {**state, "github_data": check_release_data(release_id, output)}
+        result = await agent2_executor.ainvoke({"input": state["parsed_request"]})
+        return {**state, "github_data": result["output"]}
+    except Exception as e:
+        logger.error(f"Error in github_data_retrieval_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
+async def arelease_data_compaction_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    # Pure CPU work measured in milliseconds, so it runs on the loop (and is already checkpointed)
+    return release_data_compaction_node(state)
+
+@checkpointed("data_analysis_content_generation", *GENERATION_FINGERPRINT)
+async def adata_analysis_content_generation_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        if state["github_data"] is None:
+            raise ValueError("No GitHub data available")
+        data = parse_release_data(state["github_data"])
+        if use_map_reduce(data):
+            result = await agent3_executor.ainvoke({"input": await asummarize_groups(llm, data)})
+        else:
+            result = await agent3_executor.ainvoke({"input": state["github_data"]})
+        return {**state, "generated_content": result["output"]}
+    except Exception as e:
+        logger.error(f"Error in data_analysis_content_generation_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
+async def ahuman_interaction_feedback_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        if state["generated_content"] is None:
+            raise ValueError("No generated content available")
+        result = await agent4_executor.ainvoke({"input": state["generated_content"]})
+        return {**state, "human_feedback": result["output"], "final_release_notes": result.get("final_release_notes")}
+    except Exception as e:
+        logger.error(f"Error in human_interaction_feedback_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
+async def aprocess_management_optimization_node(state: ReleaseNoteState) -> Dict[str, Any]:
+    try:
+        input_data = {
+            "exception_reports": state["exception_reports"],
+            "process_metrics": state["process_metrics"],
+            "human_feedback": state["human_feedback"]
+        }
+        result = await agent5_executor.ainvoke({"input": str(input_data)})
+        return {**state, "process_feedback": result["output"]}
+    except Exception as e:
+        logger.error(f"Error in process_management_optimization_node: {str(e)}")
+        return {**state, "exception_reports": state["exception_reports"] + [str(e)]}
+
 # Define the graph
 workflow = StateGraph(ReleaseNoteState)
 
 # Add nodes
 #workflow.add_node("slack_interaction", slack_interaction_node)
 workflow.add_node("github_data_retrieval", github_data_retrieval_node)
+workflow.add_node("release_data_compaction", release_data_compaction_node)
 workflow.add_node("data_analysis_content_generation", data_analysis_content_generation_node)
 # workflow.add_node("human_interaction_feedback", human_interaction_feedback_node)
 # workflow.add_node("process_management_optimization", process_management_optimization_node)
@@ -151,7 +288,8 @@ def needs_revision(state: ReleaseNoteState) -> str:
 #         "end": END
 #     }
 # )
-workflow.add_edge("github_data_retrieval", "data_analysis_content_generation")
+workflow.add_edge("github_data_retrieval", "release_data_compaction")
+workflow.add_edge("release_data_compaction", "data_analysis_content_generation")
 workflow.add_edge("data_analysis_content_generation", END)
 # workflow.add_edge("data_analysis_content_generation", "human_interaction_feedback")
 # workflow.add_conditional_edges(
@@ -171,10 +309,29 @@ workflow.set_entry_point("github_data_retrieval")
 # Compile the graph
 graph = workflow.compile()
 
-# Main program
-def run_agent():
-    initial_state: ReleaseNoteState = {
-        "input": "",
+# Same graph over the async nodes, for `arun_agent`
+async_workflow = StateGraph(ReleaseNoteState)
+async_workflow.add_node("github_data_retrieval", agithub_data_retrieval_node)
+async_workflow.add_node("release_data_compaction", arelease_data_compaction_node)
+async_workflow.add_node("data_analysis_content_generation", adata_analysis_content_generation_node)
+async_workflow.add_edge("github_data_retrieval", "release_data_compaction")
+async_workflow.add_edge("release_data_compaction", "data_analysis_content_generation")
+async_workflow.add_edge("data_analysis_content_generation", END)
+async_workflow.set_entry_point("github_data_retrieval")
+async_graph = async_workflow.compile()
+
+def release_message(release_id: str) -> str:
+    return f"Please generate release notes for the latest github release {release_id}"
+
+DEFAULT_MESSAGE = release_message("langchain-openai==0.1.21")
+
+def is_release_note_message(message: str) -> bool:
+    # Uncertain messages pass too; the graph's LLM steps get the final say on those
+    return classify(message).label != OTHER
+
+def build_initial_state(message: str = "") -> ReleaseNoteState:
+    return {
+        "input": message,
         "parsed_request": None,
         "github_data": None,
         "generated_content": None,
@@ -185,20 +342,87 @@ def run_agent():
         "process_metrics": {}
     }
 
+def run_status(state: Optional[Dict[str, Any]]) -> str:
+    return "done" if state and state["generated_content"] and not state["exception_reports"] else "failed"
+
+async def arun_agent(message: str = DEFAULT_MESSAGE, run_id: Optional[str] = None) -> Optional[ReleaseNoteState]:
+    """Run one release-note request through `async_graph` and return the final state.
+
+    Returns None when the message is not a release-notes request. Node outputs are
+    checkpointed under `run_id`, so passing the `run_id` of a failed run (or calling
+    `aresume_run`) picks up after the last node that completed. A new run_id regenerates.
+    """
+    if not is_release_note_message(message):
+        return None
+    run_id = checkpoint_store.start_run(message, run_id)
+    token = current_run_id.set(run_id)
+    final_state = None
     try:
-        # new_messages = slack_api_tool.get_new_messages()
-        new_messages = ["Please generate release notes for the latest github release langchain-openai==0.1.21"]
-        for message in new_messages:
-            if any(keyword in message.lower() for keyword in Config.RELEASE_NOTE_KEYWORDS):
-                initial_state["parsed_request"] = message
-                for step in graph.stream(initial_state):
-                    print(f"Step: {step}")
-                    if "final_release_notes" in step and step["final_release_notes"]:
-                        print(step["final_release_notes"])
-
-                        return step["final_release_notes"]
-    except Exception as e:
-        logger.error(f"Error in main loop: {str(e)}")
-    
+        initial_state = build_initial_state(message)
+        initial_state["parsed_request"] = message
+        metrics = MetricsCallbackHandler()
+        final_state = await async_graph.ainvoke(initial_state, config={"callbacks": [metrics]})
+        final_state["process_metrics"] = {**final_state["process_metrics"], **metrics.summary(), "run_id": run_id}
+        record_run(final_state["process_metrics"], request=message)
+        return final_state
+    finally:
+        current_run_id.reset(token)
+        checkpoint_store.finish_run(run_id, run_status(final_state))
+
+async def aresume_run(run_id: str) -> Optional[ReleaseNoteState]:
+    """Rerun a recorded run; nodes it already completed are served from their checkpoints."""
+    run = checkpoint_store.run(run_id)
+    if run is None:
+        raise KeyError(f"Unknown run {run_id}")
+    return await arun_agent(run["message"], run_id=run_id)
+
+async def arun_agents(messages: List[str], concurrency: int = 4) -> List[Optional[ReleaseNoteState]]:
+    """Run many requests on one event loop, at most `concurrency` at a time, in input order."""
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(message):
+        async with semaphore:
+            try:
+                return await arun_agent(message)
+            except Exception as e:
+                logger.error(f"Error running agent for {message!r}: {str(e)}")
+                return None
+
+    return await asyncio.gather(*(run(message) for message in messages))
+
+# Main program
+def run_agent(message: str = DEFAULT_MESSAGE, on_step: Optional[Callable[[str, Dict[str, Any]], None]] = None, run_id: Optional[str] = None) -> Optional[str]:
+    """Run one request through `graph` and return the generated release notes.
+
+    `on_step(node, state)` is called as each node finishes. Returns None when the message
+    is not a release-notes request and raises RuntimeError, carrying the run's exception
+    reports, when no notes were generated. Pass the `run_id` of an earlier, failed run to
+    resume it from its checkpoints.
+    """
+    if not is_release_note_message(message):
+        return None
+    initial_state = build_initial_state(message)
+    initial_state["parsed_request"] = message
+    metrics = MetricsCallbackHandler()
+    run_id = checkpoint_store.start_run(message, run_id)
+    token = current_run_id.set(run_id)
+    last_state = None
+    try:
+        for step in graph.stream(initial_state, config={"callbacks": [metrics]}):
+            for node, node_state in step.items():
+                last_state = node_state
+                if on_step:
+                    on_step(node, {**node_state, "process_metrics": {**node_state["process_metrics"], **metrics.summary()}})
+    finally:
+        current_run_id.reset(token)
+        checkpoint_store.finish_run(run_id, run_status(last_state))
+        if last_state is not None:
+            last_state["process_metrics"] = {**last_state["process_metrics"], **metrics.summary(), "run_id": run_id}
+        record_run(last_state["process_metrics"] if last_state else {**metrics.summary(), "run_id": run_id}, request=message)
+    if last_state is None or not last_state["generated_content"]:
+        reports = last_state["exception_reports"] if last_state else []
+        raise RuntimeError(f"No release notes generated for run {run_id}: {'; '.join(reports) or 'no output'}")
+    return last_state["generated_content"]
+
 if __name__ == "__main__":
     run_agent()
@@ -0,0 +1,161 @@
+"""Generate release notes for many releases in one process.
+
+Releases come from the command line or a file: plain text with one release ID per line, or
+JSONL whose lines carry a `release_id` (or `release`) and optionally an `id` and a
+`message`/`body` to send instead of the default request. Jobs run through agent.py's async
+graph, at most `--parallelism` at a time, and share the process-wide GitHub release cache,
+issue/PR store, embedding cache and retriever caches. One JSON line per job is written as
+soon as it finishes:
+
+    python batch.py releases.jsonl --parallelism 8 --output results.jsonl
+    python batch.py --release langchain-openai==0.1.21 --release langchain-core==0.2.29
+
+Each job's graph nodes are checkpointed (see checkpoints.py) under a run ID derived from the
+output file and the job ID, so rerunning an interrupted batch with `--resume` skips jobs
+already marked ok in the output file and continues the rest from their last completed node.
+Without `--resume` those runs start from scratch.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, List, Optional, Set, TextIO
+
+import agent
+from checkpoints import checkpoint_store, fingerprint
+
+logger = logging.getLogger(__name__)
+
+BATCH_PARALLELISM = int(os.environ.get("BATCH_PARALLELISM", "4"))
+
+
+def load_releases(path: str) -> List[Dict[str, str]]:
+    """Read release jobs from a plain-text or JSONL file as [{id, release_id, message}]."""
+    jobs = []
+    with open(path, "r") as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                release_id = item.get("release_id") or item.get("release") or ""
+                message = item.get("message") or item.get("body")
+                if not release_id and not message:
+                    raise ValueError(f"{path}:{line_number}: expected a release_id, release, message or body")
+                jobs.append(make_job(release_id, message=message, job_id=item.get("id") or item.get("request_id")))
+            else:
+                jobs.append(make_job(line))
+    return jobs
+
+
+def completed_jobs(path: str) -> Set[str]:
+    """IDs of the jobs an earlier run already wrote to `path` with status ok."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # a line cut short when the batch was interrupted
+            if result.get("status") == "ok":
+                done.add(result["id"])
+    return done
+
+
+def job_run_id(output_path: str, job_id: str) -> str:
+    """Checkpoint run ID of a job, the same every time the batch writes to `output_path`."""
+    return f"batch-{fingerprint(os.path.abspath(output_path), job_id)}"
+
+
+def make_job(release_id: str, message: Optional[str] = None, job_id: Optional[str] = None) -> Dict[str, str]:
+    return {"id": job_id or release_id, "release_id": release_id, "message": message or agent.release_message(release_id)}
+
+
+async def run_job(job: Dict[str, str]) -> Dict[str, Any]:
+    started_at = time.time()
+    started = time.perf_counter()
+    result: Dict[str, Any] = {**job, "started_at": started_at}
+    try:
+        state = await agent.arun_agent(job["message"], run_id=job.get("run_id"))
+        if state is None:
+            result.update(status="skipped", error="not a release-notes request")
+        else:
+            result.update(
+                status="error" if state["exception_reports"] or not state["generated_content"] else "ok",
+                generated_content=state["generated_content"],
+                final_release_notes=state["final_release_notes"],
+                exception_reports=state["exception_reports"],
+                process_metrics=state["process_metrics"],
+            )
+    except Exception as e:
+        logger.exception(f"Job {job['id']} failed")
+        result.update(status="error", error=str(e))
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def run_batch(jobs: List[Dict[str, str]], output: TextIO, parallelism: int = BATCH_PARALLELISM) -> Dict[str, Any]:
+    """Run `jobs` with bounded parallelism, writing one JSON line per job as it completes."""
+    semaphore = asyncio.Semaphore(max(parallelism, 1))
+    started = time.perf_counter()
+
+    async def bounded(job):
+        async with semaphore:
+            return await run_job(job)
+
+    statuses: Dict[str, int] = {}
+    for finished in asyncio.as_completed([bounded(job) for job in jobs]):
+        result = await finished
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        output.write(json.dumps(result, default=str) + "\n")
+        output.flush()
+        logger.info(f"{result['id']}: {result['status']} in {result['seconds']}s")
+
+    seconds = time.perf_counter() - started
+    summary = {"jobs": len(jobs), "parallelism": parallelism, "seconds": round(seconds, 3), **statuses}
+    logger.info(f"Batch finished: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="plain-text or JSONL file of releases")
+    parser.add_argument("--release", action="append", default=[], help="release ID such as langchain-openai==0.1.21 (repeatable)")
+    parser.add_argument("--parallelism", type=int, default=BATCH_PARALLELISM)
+    parser.add_argument("--output", help="JSONL file to write results to (default: stdout)")
+    parser.add_argument("--resume", action="store_true", help="skip jobs already marked ok in --output")
+    args = parser.parse_args(argv)
+
+    jobs = (load_releases(args.file) if args.file else []) + [make_job(release_id) for release_id in args.release]
+    if not jobs:
+        parser.error("no releases given")
+    if args.resume:
+        if not args.output:
+            parser.error("--resume needs --output")
+        done = completed_jobs(args.output)
+        jobs = [job for job in jobs if job["id"] not in done]
+        logger.info(f"Resuming: {len(done)} jobs already done, {len(jobs)} to run")
+    if args.output:
+        for job in jobs:
+            job["run_id"] = job_run_id(args.output, job["id"])
+            if not args.resume:
+                checkpoint_store.clear_run(job["run_id"])
+
+    output = open(args.output, "a") if args.output else sys.stdout
+    try:
+        summary = asyncio.run(run_batch(jobs, output, args.parallelism))
+    finally:
+        if args.output:
+            output.close()
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary.get("error", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Release-note throughput of the async graph as concurrency grows, using a fake LLM.
+
+Swaps agent.py's retrieval and generation executors for ReAct executors over a fake chat
+model and a fake tool, each with a fixed latency, so every node does one tool call and
+two LLM round trips without touching the network. Compares sequential `graph.invoke`
+runs with `arun_agents` at several concurrency levels. Run from the repository root:
+
+    python -m benchmarks.bench_async_agent --jobs 16 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, List, Optional
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+# Every level reruns the same requests; node checkpoints would turn them into cache hits
+os.environ["CHECKPOINTS"] = "0"
+# Direct retrieval would call the real github_release_data_tool; keep agent2 on the fake executor
+os.environ["GITHUB_RETRIEVAL_MODE"] = "agent"
+
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+import agent
+from prompts import agent2_prompt, agent3_prompt
+
+TOOL_RESULT = "fake-tool-result"
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """Calls the tool once, then answers; every call takes `latency` seconds."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        if f"Observation: {TOOL_RESULT}" in messages[-1].content:
+            text = "Thought: I now know the final answer\nFinal Answer: Release notes for the requested release."
+        else:
+            text = "Thought: I should look this up\nAction: lookup\nAction Input: release"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+def make_executor(prompt, latency: float) -> AgentExecutor:
+    def lookup(query: str) -> str:
+        time.sleep(latency)
+        return TOOL_RESULT
+
+    async def alookup(query: str) -> str:
+        await asyncio.sleep(latency)
+        return TOOL_RESULT
+
+    tools = [StructuredTool.from_function(func=lookup, coroutine=alookup, name="lookup", description="Look up release data.")]
+    return AgentExecutor(agent=create_react_agent(SlowFakeChatModel(latency=latency), tools, prompt), tools=tools, handle_parsing_errors=True, max_iterations=5)
+
+
+def run(jobs: int, latency: float, levels: List[int]):
+    agent.agent2_executor = make_executor(agent2_prompt, latency)
+    agent.agent3_executor = make_executor(agent3_prompt, latency)
+    messages = [f"Please generate release notes for langchain-openai==0.1.{i}" for i in range(jobs)]
+
+    started = time.perf_counter()
+    for message in messages:
+        state = agent.build_initial_state(message)
+        state["parsed_request"] = message
+        agent.graph.invoke(state)
+    elapsed = time.perf_counter() - started
+    print(f"{'sync':<15} jobs={jobs:<4} time={elapsed:.2f}s throughput={jobs / elapsed:.2f} jobs/s")
+
+    for concurrency in levels:
+        started = time.perf_counter()
+        states = asyncio.run(agent.arun_agents(messages, concurrency=concurrency))
+        elapsed = time.perf_counter() - started
+        assert all(state and state["generated_content"] and not state["exception_reports"] for state in states)
+        print(f"{f'async x{concurrency}':<15} jobs={jobs:<4} time={elapsed:.2f}s throughput={jobs / elapsed:.2f} jobs/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per LLM call and per tool call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    run(args.jobs, args.latency, args.concurrency)
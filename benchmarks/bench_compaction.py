@@ -0,0 +1,35 @@
+"""Prompt size of release data before and after compaction, at several token budgets.
+
+Runs against the `langchain-openai==0.1.21.json` release data checked into the repository
+(or any file given with `--file`). Token counts are the same ~4 characters/token estimate
+the compaction stage budgets with. Run from the repository root:
+
+    python -m benchmarks.bench_compaction --budgets 8000 2000 500
+"""
+import argparse
+import time
+from typing import List
+
+from compaction import compact_release_data
+
+
+def run(path: str, budgets: List[int]):
+    with open(path, "r") as file:
+        raw = file.read()
+    for budget in budgets:
+        started = time.perf_counter()
+        compacted, report = compact_release_data(raw, token_budget=budget)
+        elapsed = time.perf_counter() - started
+        print(
+            f"budget={budget:<6} tokens {report['before_tokens']:>7} -> {report['after_tokens']:<6} "
+            f"chars {report['before_chars']:>8} -> {report['after_chars']:<7} ratio={report['ratio']:<6} "
+            f"time={elapsed * 1000:.1f}ms stages={','.join(report['stages'])}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default="langchain-openai==0.1.21.json")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[8000, 2000, 500])
+    args = parser.parse_args()
+    run(args.file, args.budgets)
@@ -0,0 +1,64 @@
+"""Sequential vs. concurrent knowledge-base crawling, then an offline replay from snapshots.
+
+Serves synthetic HTML pages from a local server reachable under two host names
+(127.0.0.1 and localhost) so per-host politeness limits come into play. Run from the
+repository root:
+
+    python -m benchmarks.bench_crawl --pages 16 --latency 0.3
+"""
+import argparse
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawler import HostLimiter, SnapshotStore, load_documents
+
+
+def make_handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            paragraphs = "".join(f"<p>Release notes should explain change {i} for {self.path}.</p>" for i in range(50))
+            body = f'<html lang="en"><head><title>Page {self.path}</title><meta name="description" content="Example"></head><body>{paragraphs}</body></html>'.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def run(pages: int, latency: float, per_host: int, delay: float):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    urls = [f"http://{host}:{port}/page/{i}" for i in range(pages // 2) for host in ("127.0.0.1", "localhost")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshots = SnapshotStore(tmp)
+        for label, workers in (("sequential", 1), ("concurrent", 8)):
+            started = time.perf_counter()
+            documents = load_documents(urls, max_workers=workers, limiter=HostLimiter(per_host=per_host, delay=delay), snapshots=snapshots)
+            print(f"{label:<11} pages={len(documents):<4} time={time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        replayed = load_documents(urls, snapshots=snapshots, offline=True)
+        print(f"{'offline':<11} pages={len(replayed):<4} time={time.perf_counter() - started:.2f}s")
+        assert [d.page_content for d in replayed] == [d.page_content for d in documents]
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per page response")
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--delay", type=float, default=0.1, help="seconds between request starts per host")
+    args = parser.parse_args()
+    run(args.pages, args.latency, args.per_host, args.delay)
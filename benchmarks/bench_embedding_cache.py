@@ -0,0 +1,68 @@
+"""Texts sent to the embedding API with and without the persistent embedding cache.
+
+Builds a corpus where a share of chunks is boilerplate repeated across pages, indexes
+it twice (a full re-index) and runs a set of repeated queries, using a fake embedding
+function so it runs fully offline. Run from the repository root:
+
+    python -m benchmarks.bench_embedding_cache --pages 40 --boilerplate 0.5
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from benchmarks.bench_ingestion import FakeEmbeddings
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.texts = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.texts += len(texts)
+        return super().embed_documents(texts)
+
+
+def make_corpus(pages: int, chunks_per_page: int, boilerplate: float) -> List[str]:
+    shared = int(chunks_per_page * boilerplate)
+    corpus = []
+    for page in range(pages):
+        corpus.extend(f"Footer paragraph {i}: be kind in #general, use threads. " * 5 for i in range(shared))
+        corpus.extend(f"Page {page} chunk {i}: " + "release notes guidance " * 20 for i in range(chunks_per_page - shared))
+    return corpus
+
+
+def run(pages: int, chunks_per_page: int, boilerplate: float, queries: int, latency: float):
+    corpus = make_corpus(pages, chunks_per_page, boilerplate)
+    questions = [f"How do I announce release {i % 5}?" for i in range(queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cached in (("uncached", False), ("cached", True)):
+            underlying = CountingEmbeddings(latency=latency)
+            embeddings = CachedEmbeddings(underlying, path=os.path.join(tmp, "embeddings.sqlite")) if cached else underlying
+            started = time.perf_counter()
+            for _ in range(2):
+                for start in range(0, len(corpus), 64):
+                    embeddings.embed_documents(corpus[start:start + 64])
+            for question in questions:
+                embeddings.embed_query(question)
+            print(
+                f"{label:<9} chunks={len(corpus) * 2:<6} queries={queries:<4} texts_embedded={underlying.texts:<6} "
+                f"api_calls={underlying.calls:<5} time={time.perf_counter() - started:.2f}s"
+            )
+            if cached:
+                print(f"          {embeddings.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--chunks-per-page", type=int, default=10)
+    parser.add_argument("--boilerplate", type=float, default=0.5, help="share of each page's chunks repeated on every page")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per embedding request")
+    args = parser.parse_args()
+    run(args.pages, args.chunks_per_page, args.boilerplate, args.queries, args.latency)
@@ -0,0 +1,109 @@
+"""Per-call `requests` vs. the shared `GitHubClient` against a flaky, rate-limited stub API.
+
+The stub serves a handful of release resources with ETags, answers `If-None-Match`
+with 304s that cost no quota, reports `X-RateLimit-*` headers, and fails a share of
+requests with 503 or 429 + Retry-After. Both callers poll the same releases repeatedly,
+the way slackbot.py re-reads a release. The output shows successful calls, quota spent,
+TCP connections opened and time. Run from the repository root:
+
+    python -m benchmarks.bench_github_client --calls 100 --failure-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import github_client
+from github_client import GitHubClient
+
+
+class StubAPI:
+    def __init__(self, latency: float, failure_rate: float, quota: int = 5000):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.quota = quota
+        self.spent = 0
+        self.connections = set()
+        self.random = random.Random(7)
+        self._lock = threading.Lock()
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                with stub._lock:
+                    remaining = stub.quota - stub.spent
+                for key, value in {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(int(time.time()) + 3600), **(headers or {})}.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                time.sleep(stub.latency)
+                with stub._lock:
+                    stub.connections.add(self.client_address)
+                    roll = stub.random.random()
+                etag = f'"{self.path}-v1"'
+                if roll < stub.failure_rate / 2:
+                    return self.send(503)
+                if roll < stub.failure_rate:
+                    return self.send(429, headers={"Retry-After": "0"})
+                if self.headers.get("If-None-Match") == etag:
+                    return self.send(304, headers={"ETag": etag})
+                with stub._lock:
+                    stub.spent += 1
+                body = json.dumps({"id": 1, "path": self.path, "body": "x" * 2000}).encode()
+                self.send(200, body, {"ETag": etag, "Content-Type": "application/json"})
+
+        return Handler
+
+
+def run(calls: int, releases: int, latency: float, failure_rate: float):
+    for label in ("requests", "client"):
+        stub = StubAPI(latency, failure_rate)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        client = GitHubClient(token="bench", base_url=base_url, rate=0)
+        ok = 0
+        started = time.perf_counter()
+        for i in range(calls):
+            path = f"/repos/o/r/releases/tags/v{i % releases}"
+            if label == "requests":
+                response = requests.get(base_url + path, headers={"Accept": "application/vnd.github.v3+json"}, timeout=10)
+                ok += response.status_code == 200
+            else:
+                try:
+                    client.get_json(path)
+                    ok += 1
+                except requests.HTTPError:
+                    pass
+        elapsed = time.perf_counter() - started
+        extra = f" retries={client.counts['retries']} not_modified={client.counts['not_modified']}" if label == "client" else ""
+        print(f"{label:<9} ok={ok}/{calls} quota_spent={stub.spent:<4} connections={len(stub.connections):<4} time={elapsed:.2f}s{extra}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--releases", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="GITHUB_BACKOFF_BASE for the client (seconds)")
+    args = parser.parse_args()
+    github_client.GITHUB_BACKOFF_BASE = args.backoff_base
+    run(args.calls, args.releases, args.latency, args.failure_rate)
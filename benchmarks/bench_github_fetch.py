@@ -0,0 +1,41 @@
+"""Serial vs. concurrent issue/PR fan-out against a local stub GitHub server.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_github_fetch --references 80 --latency 0.05
+"""
+import argparse
+import time
+
+from github import Github
+
+from benchmarks.stub_github import StubGitHub
+from github_fetch import fetch_references
+
+
+def run(references: int, latency: float, workers: list):
+    numbers = list(range(25000, 25000 + references))
+    with StubGitHub(numbers, latency=latency) as stub:
+        repo = Github(base_url=stub.base_url).get_repo("langchain-ai/langchain")
+        baseline = None
+        for max_workers in workers:
+            stub.reset_counts()
+            started = time.perf_counter()
+            data = fetch_references(repo, numbers, max_workers=max_workers, store=None)
+            elapsed = time.perf_counter() - started
+            if baseline is None:
+                baseline = (elapsed, data)
+            assert data == baseline[1], "output differs from the serial run"
+            print(
+                f"workers={max_workers:<3} refs={references} requests={stub.request_count:<4} "
+                f"time={elapsed:.2f}s speedup={baseline[0] / elapsed:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--references", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of latency per stub request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+    run(args.references, args.latency, args.workers)
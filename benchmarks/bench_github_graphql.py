@@ -0,0 +1,48 @@
+"""REST vs. GraphQL resolution of a release's issue/PR references against a local stub.
+
+The REST path makes one API call per reference (with `GITHUB_FETCH_MAX_WORKERS` in
+flight); the GraphQL path sends aliased batches of `GITHUB_GRAPHQL_BATCH_SIZE`. Both
+download PR diffs the same way. Run from the repository root:
+
+    python -m benchmarks.bench_github_graphql --references 80 --latency 0.1
+"""
+import argparse
+import time
+
+from github import Github
+
+from benchmarks.stub_github import StubGitHub
+import github_graphql
+from github_fetch import fetch_references
+from github_graphql import fetch_release_references
+
+
+def run(references: int, latency: float, batch_size: int):
+    numbers = list(range(25000, 25000 + references))
+    with StubGitHub(numbers, latency=latency) as stub:
+        github_graphql.GITHUB_GRAPHQL_URL = f"{stub.base_url}/graphql"
+        github_graphql.GITHUB_GRAPHQL_BATCH_SIZE = batch_size
+        repo = Github(base_url=stub.base_url).get_repo("langchain-ai/langchain")
+        baseline = None
+        for label, fetch in (
+            ("rest", lambda: fetch_references(repo, numbers, store=None)),
+            ("graphql", lambda: fetch_release_references(repo, numbers, token="bench", store=None)),
+        ):
+            stub.reset_counts()
+            started = time.perf_counter()
+            data = fetch()
+            elapsed = time.perf_counter() - started
+            if baseline is None:
+                baseline = data
+            assert data == baseline, "GraphQL output differs from REST"
+            diffs = sum(path.endswith(".diff") for path in stub.request_paths)
+            print(f"{label:<8} refs={references} api_requests={stub.request_count - diffs:<4} diff_downloads={diffs:<4} time={elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--references", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds of latency per stub request")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+    run(args.references, args.latency, args.batch_size)
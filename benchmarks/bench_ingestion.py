@@ -0,0 +1,72 @@
+"""Per-chunk vs. batched embedding ingestion into an in-memory Chroma collection.
+
+Uses a fake embedding function with a fixed per-request latency (the network round trip)
+plus a small per-text cost, so it runs fully offline. Run from the repository root:
+
+    python -m benchmarks.bench_ingestion --chunks 500 --latency 0.05
+"""
+import argparse
+import hashlib
+import time
+from typing import List
+
+import chromadb
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from ingestion import ingest_documents
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic hash-based vectors with simulated request latency."""
+
+    def __init__(self, size: int = 768, latency: float = 0.05, per_text: float = 0.0005):
+        self.size = size
+        self.latency = latency
+        self.per_text = per_text
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [digest[i % len(digest)] / 255.0 for i in range(self.size)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency + self.per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def make_documents(count: int) -> List[Document]:
+    return [
+        Document(page_content=f"Chunk {i}: " + "release notes best practice " * 30, metadata={"source": f"https://example.com/page/{i // 10}", "title": "Example"})
+        for i in range(count)
+    ]
+
+
+def run(chunks: int, latency: float, batch_sizes: List[int]):
+    documents = make_documents(chunks)
+    client = chromadb.EphemeralClient()
+    for batch_size in batch_sizes:
+        name = f"bench_batch_{batch_size}"
+        collection = client.create_collection(name)
+        embeddings = FakeEmbeddings(latency=latency)
+        stats = ingest_documents(collection, documents, embeddings, batch_size=batch_size)
+        assert collection.count() == chunks
+        print(
+            f"batch_size={batch_size:<4} embed_calls={embeddings.calls:<5} time={stats['seconds']:.2f}s "
+            f"(embed {stats['embed_seconds']:.2f}s, write {stats['write_seconds']:.2f}s) "
+            f"throughput={stats['chunks_per_second']} chunks/s"
+        )
+        client.delete_collection(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake embedding request")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 128])
+    args = parser.parse_args()
+    run(args.chunks, args.latency, args.batch_sizes)
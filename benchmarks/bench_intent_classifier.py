@@ -0,0 +1,93 @@
+"""Precision/recall of the local intent classifier on the labelled `intent_examples.jsonl`.
+
+Compares the old substring check over `RELEASE_NOTE_KEYWORDS`, the regex rules, and the
+rules backed by a nearest-neighbour vote (leave-one-out, over a local hashing
+bag-of-words embedding instead of Fireworks). Messages the classifier leaves
+"uncertain" would go to agent1; the LLM-call column counts them, and the end-to-end
+scores assume agent1 gets those right. Run from the repository root:
+
+    python -m benchmarks.bench_intent_classifier
+"""
+import hashlib
+import re
+import time
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from intent_classifier import OTHER, RELEASE_NOTES, UNCERTAIN, IntentClassifier, NearestNeighbourIntent, load_examples
+
+KEYWORDS = ["release notes", "changelog", "update", "new features"]
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, size: int = 512):
+        self.size = size
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.size] += 1.0
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def score(predicted: List[str], actual: List[str]) -> Dict[str, float]:
+    """Precision/recall of release_notes among confident predictions; uncertain counts as an LLM call."""
+    decided = [(p, a) for p, a in zip(predicted, actual) if p != UNCERTAIN]
+    tp = sum(p == a == RELEASE_NOTES for p, a in decided)
+    fp = sum(p == RELEASE_NOTES != a for p, a in decided)
+    fn = sum(a == RELEASE_NOTES != p for p, a in decided)
+    # End to end, uncertain messages take agent1's answer (assumed correct)
+    e2e = [a if p == UNCERTAIN else p for p, a in zip(predicted, actual)]
+    e2e_tp = sum(p == a == RELEASE_NOTES for p, a in zip(e2e, actual))
+    e2e_fp = sum(p == RELEASE_NOTES != a for p, a in zip(e2e, actual))
+    e2e_fn = sum(a == RELEASE_NOTES != p for p, a in zip(e2e, actual))
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "llm_calls": len(predicted) - len(decided),
+        "e2e_precision": e2e_tp / (e2e_tp + e2e_fp) if e2e_tp + e2e_fp else 1.0,
+        "e2e_recall": e2e_tp / (e2e_tp + e2e_fn) if e2e_tp + e2e_fn else 1.0,
+    }
+
+
+def report(label: str, predicted: List[str], actual: List[str], seconds: float):
+    s = score(predicted, actual)
+    print(
+        f"{label:<10} precision={s['precision']:.2f} recall={s['recall']:.2f} llm_calls={s['llm_calls']:<3} "
+        f"e2e_precision={s['e2e_precision']:.2f} e2e_recall={s['e2e_recall']:.2f} per_message={seconds / len(actual) * 1e6:.0f}us"
+    )
+
+
+def run():
+    examples = load_examples()
+    texts = [text for text, _ in examples]
+    actual = [label for _, label in examples]
+    print(f"{len(examples)} messages, {actual.count(RELEASE_NOTES)} release-notes requests")
+
+    started = time.perf_counter()
+    keyword = [RELEASE_NOTES if any(k in text.lower() for k in KEYWORDS) else OTHER for text in texts]
+    report("keywords", keyword, actual, time.perf_counter() - started)
+
+    rules = IntentClassifier()
+    started = time.perf_counter()
+    predicted = [rules.classify(text).label for text in texts]
+    report("rules", predicted, actual, time.perf_counter() - started)
+
+    embeddings = HashingEmbeddings()
+    predicted, seconds = [], 0.0
+    for i, text in enumerate(texts):
+        # Leave the message itself out of the neighbours it is judged by
+        classifier = IntentClassifier(NearestNeighbourIntent(embeddings, examples[:i] + examples[i + 1:]))
+        started = time.perf_counter()
+        predicted.append(classifier.classify(text).label)
+        seconds += time.perf_counter() - started
+    report("rules+knn", predicted, actual, seconds)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+"""Repeated agent-executor runs with and without the persistent LLM response cache.
+
+Runs agent3's ReAct executor over a fake chat model (fixed latency per call) and a fake
+tool several times on the same input, as happens while iterating on a prompt elsewhere
+in the graph. The first cached run fills `TTLSQLiteCache`; later runs replay it. Run from
+the repository root:
+
+    python -m benchmarks.bench_llm_cache --runs 5 --latency 0.5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain_core.tools import StructuredTool
+
+from benchmarks.bench_async_agent import TOOL_RESULT, SlowFakeChatModel
+from llm_cache import TTLSQLiteCache
+from prompts import agent3_prompt
+
+
+def make_executor(model: SlowFakeChatModel) -> AgentExecutor:
+    tools = [StructuredTool.from_function(func=lambda query: TOOL_RESULT, name="lookup", description="Look up release data.")]
+    return AgentExecutor(agent=create_react_agent(model, tools, agent3_prompt), tools=tools, handle_parsing_errors=True, max_iterations=5)
+
+
+def run(runs: int, latency: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTLSQLiteCache(path=os.path.join(tmp, "llm.sqlite"))
+        for label, model in (("no cache", SlowFakeChatModel(latency=latency)), ("cache", SlowFakeChatModel(latency=latency, cache=cache))):
+            executor = make_executor(model)
+            times = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                output = executor.invoke({"input": "langchain-openai==0.1.21 release data"})["output"]
+                times.append(time.perf_counter() - started)
+            assert output == "Release notes for the requested release."
+            print(f"{label:<9} first={times[0]:.3f}s repeat_avg={sum(times[1:]) / max(len(times) - 1, 1):.3f}s total={sum(times):.2f}s")
+        print(f"cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    args = parser.parse_args()
+    run(args.runs, args.latency)
@@ -0,0 +1,103 @@
+"""Single-prompt vs. map-reduce generation time as releases grow, using a fake LLM.
+
+The fake chat model's latency grows with prompt and output size: a fixed round trip plus
+per-token costs. The generation agent re-reads its whole input on every ReAct iteration
+(`--iterations`). In single mode that input is the full release. In map-reduce mode,
+small group prompts are summarized in parallel first, and the agent iterates over the
+much shorter summaries. Run from the repository root:
+
+    python -m benchmarks.bench_map_reduce --prs 20 60 120 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from compaction import compact_release_data, estimate_tokens
+from map_reduce import asummarize_groups
+
+SCOPES = ["core", "openai", "anthropic", "community", "text-splitters", "docs"]
+
+
+class SizedFakeChatModel(BaseChatModel):
+    """Latency = round trip + per input token + per output token (output ~ 1/8 of input, capped)."""
+
+    round_trip: float = 0.2
+    per_input_token: float = 0.0001
+    per_output_token: float = 0.002
+    max_output_tokens: int = 400
+
+    @property
+    def _llm_type(self) -> str:
+        return "sized-fake-chat"
+
+    def _cost(self, messages: List[BaseMessage]):
+        input_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        output_tokens = min(input_tokens // 8, self.max_output_tokens)
+        latency = self.round_trip + input_tokens * self.per_input_token + output_tokens * self.per_output_token
+        return latency, ChatResult(generations=[ChatGeneration(message=AIMessage(content="- summary point\n" * max(output_tokens // 4, 1)))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        latency, result = self._cost(messages)
+        time.sleep(latency)
+        return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        latency, result = self._cost(messages)
+        await asyncio.sleep(latency)
+        return result
+
+
+def make_release(prs: int) -> str:
+    pull_requests = []
+    for number in range(prs):
+        scope = SCOPES[number % len(SCOPES)]
+        diff = "".join(
+            f"diff --git a/libs/{scope}/module_{number}_{f}.py b/libs/{scope}/module_{number}_{f}.py\n@@ -1,3 +1,40 @@ class Thing{f}:\n"
+            + "".join(f"+    def method_{i}(self):\n+        return {i}\n" for i in range(20))
+            for f in range(3)
+        )
+        pull_requests.append({"number": 1000 + number, "title": f"{scope}[patch]: improve thing {number}", "state": "closed", "author": "dev", "diff": diff})
+    return json.dumps({"release_title": "langchain==0.3.0", "release_body": "Many changes", "edited_code": [], "issues": [], "pull_requests": pull_requests}, indent=2)
+
+
+async def generate(llm, generation_input: str, iterations: int) -> None:
+    for _ in range(iterations):
+        await llm.ainvoke(generation_input)
+
+
+async def run_map_reduce(llm, github_data: str, concurrency: int, iterations: int) -> int:
+    reduce_input = await asummarize_groups(llm, json.loads(github_data), concurrency=concurrency)
+    await generate(llm, reduce_input, iterations)
+    return estimate_tokens(reduce_input)
+
+
+def run(sizes: List[int], concurrency: int, iterations: int):
+    llm = SizedFakeChatModel()
+    for prs in sizes:
+        github_data, _ = compact_release_data(make_release(prs), token_budget=10 ** 9)
+        started = time.perf_counter()
+        asyncio.run(generate(llm, github_data, iterations))
+        single = time.perf_counter() - started
+        started = time.perf_counter()
+        reduce_tokens = asyncio.run(run_map_reduce(llm, github_data, concurrency, iterations))
+        mapped = time.perf_counter() - started
+        print(
+            f"prs={prs:<5} input_tokens={estimate_tokens(github_data):<7} single={single:.2f}s "
+            f"map_reduce(x{concurrency})={mapped:.2f}s reduce_input_tokens={reduce_tokens}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prs", type=int, nargs="+", default=[20, 60, 120])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=4, help="ReAct iterations of the generation agent")
+    args = parser.parse_args()
+    run(args.prs, args.concurrency, args.iterations)
@@ -0,0 +1,57 @@
+"""Requests needed for a series of overlapping releases, with and without the reference store.
+
+Each release shares most of its references with the previous one (backports, release PRs),
+and a few references get edited between releases. Run from the repository root:
+
+    python -m benchmarks.bench_reference_store --releases 5 --references 60 --overlap 0.8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from github import Github
+
+from benchmarks.stub_github import StubGitHub
+from github_fetch import fetch_references
+from reference_store import ReferenceStore
+
+
+def release_series(releases: int, references: int, overlap: float):
+    fresh = max(int(references * (1 - overlap)), 1)
+    start = 25000
+    for _ in range(releases):
+        yield list(range(start, start + references))
+        start += fresh
+
+
+def run(releases: int, references: int, overlap: float, latency: float, edited: int):
+    series = list(release_series(releases, references, overlap))
+    all_numbers = sorted({n for numbers in series for n in numbers})
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, store in (("no store", None), ("reference store", ReferenceStore(os.path.join(tmp, "refs.sqlite")))):
+            with StubGitHub(all_numbers, latency=latency) as stub:
+                repo = Github(base_url=stub.base_url).get_repo("langchain-ai/langchain")
+                stub.reset_counts()
+                started = time.perf_counter()
+                for index, numbers in enumerate(series):
+                    if index:
+                        # Edit a few references the previous release already pulled in
+                        stub.updated_numbers = set(numbers[:edited])
+                    fetch_references(repo, numbers, store=store)
+                elapsed = time.perf_counter() - started
+                diffs = sum(1 for path in stub.request_paths if path.endswith(".diff"))
+                print(f"{label:<16} requests={stub.request_count:<5} diff_downloads={diffs:<5} time={elapsed:.2f}s")
+                if store is not None:
+                    print(f"{'':<16} store {store.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--releases", type=int, default=5)
+    parser.add_argument("--references", type=int, default=60)
+    parser.add_argument("--overlap", type=float, default=0.8, help="share of references carried over from the previous release")
+    parser.add_argument("--edited", type=int, default=3, help="carried-over references edited between releases")
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    run(args.releases, args.references, args.overlap, args.latency, args.edited)
@@ -0,0 +1,60 @@
+"""Retriever-tool latency for a ReAct-style query mix, with and without the result cache.
+
+Indexes synthetic chunks into an in-memory Chroma collection with a fake embedding
+function (fixed latency per request), then replays queries the way an agent does:
+the same few questions, re-asked with small changes in case and punctuation. Run from
+the repository root:
+
+    python -m benchmarks.bench_retrieval_cache --queries 30 --latency 0.05
+"""
+import argparse
+import random
+import time
+
+import chromadb
+from langchain.vectorstores.chroma import Chroma
+
+from benchmarks.bench_ingestion import FakeEmbeddings, make_documents
+from ingestion import ingest_documents
+from retrieval_cache import CachingRetriever
+
+QUESTIONS = [
+    "release notes format for engineers",
+    "how to write release notes for executives",
+    "tone for program managers",
+    "what to include in breaking changes section",
+]
+
+
+def agent_queries(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        question = rng.choice(QUESTIONS)
+        yield rng.choice([question, question.capitalize(), question + "?", question.upper(), f"  {question}. "])
+
+
+def run(queries: int, latency: float):
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection("bench_retrieval_cache")
+    embeddings = FakeEmbeddings(latency=latency)
+    ingest_documents(collection, make_documents(200), embeddings)
+    retriever = Chroma(client=client, collection_name=collection.name, embedding_function=embeddings).as_retriever()
+
+    for label, tool_retriever in (
+        ("uncached", retriever),
+        ("exact", CachingRetriever(retriever=retriever, collection_name=collection.name, normalize=False)),
+        ("normalized", CachingRetriever(retriever=retriever, collection_name=collection.name, normalize=True)),
+    ):
+        started = time.perf_counter()
+        for query in agent_queries(queries):
+            tool_retriever.invoke(query)
+        stats = tool_retriever.stats() if isinstance(tool_retriever, CachingRetriever) else {}
+        print(f"{label:<11} queries={queries:<4} time={time.perf_counter() - started:.2f}s hit_rate={stats.get('hit_rate', 0.0):.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per embedding request")
+    args = parser.parse_args()
+    run(args.queries, args.latency)
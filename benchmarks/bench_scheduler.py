@@ -0,0 +1,52 @@
+"""Sequential vs. DAG-scheduled execution of the five-agent pipeline from agents.json.
+
+Each stage is replaced by a sleep of a fixed latency (seconds, overridable per stage),
+then the stages run one after another, as `langchain_agents.process_message` used to,
+and through `scheduler.run_dag`. Prints the critical path for the DAG run. Run from the
+repository root:
+
+    python -m benchmarks.bench_scheduler --latency agent5=3 --latency agent1_from_agent4=1.5
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+
+from scheduler import build_dag, load_agents, run_dag
+
+DEFAULT_LATENCIES = {"agent1": 0.5, "agent2": 1.0, "agent3": 2.0, "agent4": 1.0, "agent1_from_agent4": 0.5, "agent5": 1.5}
+
+
+def make_runner(name: str, latency: float):
+    async def runner(inputs):
+        await asyncio.sleep(latency)
+        return name
+
+    return runner
+
+
+async def run(latencies: Dict[str, float]):
+    stages = build_dag(load_agents())
+    runners = {name: make_runner(name, latencies.get(name, 0.5)) for name in stages}
+
+    started = time.perf_counter()
+    for name in stages:
+        await runners[name]({})
+    print(f"{'sequential':<10} time={time.perf_counter() - started:.2f}s")
+
+    result = await run_dag(stages, runners, "Please generate release notes")
+    report = result["report"]
+    print(f"{'dag':<10} time={report['wall_seconds']:.2f}s critical_path={' -> '.join(report['critical_path'])} ({report['critical_path_seconds']:.2f}s)")
+    print(json.dumps(report["stages"], indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", action="append", default=[], help="stage=seconds (repeatable)")
+    args = parser.parse_args()
+    latencies = dict(DEFAULT_LATENCIES)
+    for item in args.latency:
+        name, seconds = item.split("=", 1)
+        latencies[name] = float(seconds)
+    asyncio.run(run(latencies))
@@ -0,0 +1,59 @@
+"""Sequential `chat_postMessage` loop vs. `slack_distribution.distribute` on a fake Slack.
+
+The fake takes `--latency` per post, 429s a channel that gets posts less than 0.9s apart
+and does not know one of the channels. The old loop posts the whole notes as one text
+message per channel, one channel at a time. The engine posts block chunks to all
+channels concurrently inside the per-channel pacing. Run from the repository root:
+
+    python -m benchmarks.bench_slack_distribution --channels 20 --notes-chars 8000
+    python -m benchmarks.bench_slack_distribution --notes-chars 200000 --channel-interval 0.2
+"""
+import argparse
+import json
+import time
+
+from slack_sdk.errors import SlackApiError
+
+from benchmarks.fake_slack import FakeSlack
+from slack_distribution import SlackPacer, distribute
+
+
+def make_notes(chars: int) -> str:
+    paragraph = "## Changes\n" + "- Improved structured output support and tool calling. " * 8
+    return ("\n\n".join([paragraph] * (chars // len(paragraph) + 1)))[:chars]
+
+
+def run(channels: int, notes_chars: int, latency: float, channel_interval: float):
+    names = [f"C{i:03d}" for i in range(channels)] + ["C-missing"]
+    notes = make_notes(notes_chars)
+
+    slack = FakeSlack(post_latency=latency, channel_interval=0.9, missing_channels={"C-missing"})
+    started = time.perf_counter()
+    delivered = 0
+    for channel in names:
+        try:
+            slack.chat_postMessage(channel=channel, text=notes)
+            delivered += 1
+        except SlackApiError:
+            pass
+    print(f"{'sequential':<10} delivered={delivered}/{len(names)} posts={slack.posts:<4} rate_limited={slack.rate_limited:<3} time={time.perf_counter() - started:.2f}s")
+
+    slack = FakeSlack(post_latency=latency, channel_interval=0.9, missing_channels={"C-missing"})
+    result = distribute(slack, names, notes, pacer=SlackPacer(channel_interval=channel_interval))
+    delivered = sum(channel["ok"] for channel in result["channels"])
+    retries = sum(channel["retries"] for channel in result["channels"])
+    print(
+        f"{'engine':<10} delivered={delivered}/{len(names)} posts={slack.posts:<4} rate_limited={slack.rate_limited:<3} retries={retries:<3} "
+        f"messages_per_channel={result['messages_per_channel']} time={result['seconds']:.2f}s"
+    )
+    print(json.dumps([channel for channel in result["channels"] if not channel["ok"]]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--notes-chars", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake chat.postMessage call")
+    parser.add_argument("--channel-interval", type=float, default=1.0, help="engine's per-channel spacing (below 0.9 triggers 429s)")
+    args = parser.parse_args()
+    run(args.channels, args.notes_chars, args.latency, args.channel_interval)
@@ -0,0 +1,147 @@
+"""Polling `conversations.history` vs. event-driven ingestion against a fake Slack.
+
+Messages are posted to two channels at a steady rate. The polling loop reads the latest
+100 messages per channel every `--poll-interval` seconds, as `monitor_slack_channel` used
+to, and hands everything it reads to the pipeline. The event path feeds Socket-Mode-style
+events, including app_mention twins, redeliveries and bot chatter, through
+`SlackEventIngestor`. Then the ingestor is restarted and catches up on messages posted
+while it was down. Last, a burst overflows a small queue, more traffic is handled, and a
+restart re-reads only the dropped messages. Run from the repository root:
+
+    python -m benchmarks.bench_slack_events --messages 60 --rate 30 --poll-interval 1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_slack import FakeSlack
+from slack_events import CursorStore, SlackEventIngestor
+
+CHANNELS = ["C1", "C2"]
+
+
+def post_all(slack: FakeSlack, messages: int, rate: float):
+    for i in range(messages):
+        slack.post(CHANNELS[i % 2], f"<@U0BOT> please write release notes for v0.{i}")
+        time.sleep(1 / rate)
+
+
+def summary(label, slack, handed, first_seen):
+    latencies = [first_seen[ts] - slack.posted_at[ts] for ts in first_seen]
+    humans = sum(1 for history in slack.history.values() for m in history if "bot_id" not in m)
+    print(
+        f"{label:<9} api_calls={slack.api_calls:<4} downloaded={slack.messages_downloaded:<5} handed_to_pipeline={handed:<5} "
+        f"distinct={len(first_seen)}/{humans} avg_pickup={sum(latencies) / max(len(latencies), 1) * 1000:.0f}ms"
+    )
+
+
+async def polling(messages: int, rate: float, poll_interval: float):
+    slack = FakeSlack()
+    poster = threading.Thread(target=post_all, args=(slack, messages, rate))
+    poster.start()
+    handed, first_seen = 0, {}
+    while True:
+        done = not poster.is_alive()
+        for channel in CHANNELS:
+            for message in slack.conversations_history(channel=channel, limit=100)["messages"]:
+                if "bot_id" in message:
+                    continue
+                handed += 1
+                first_seen.setdefault(message["ts"], time.perf_counter())
+        if done:
+            break
+        await asyncio.sleep(poll_interval)
+    summary("polling", slack, handed, first_seen)
+
+
+async def events(messages: int, rate: float, cursor_path: str):
+    slack = FakeSlack()
+    ingestor = SlackEventIngestor(cursors=CursorStore(cursor_path)).bind()
+    slack.subscriber = ingestor.handle_event
+    handed, first_seen = 0, {}
+
+    async def consume():
+        nonlocal handed
+        async for message in ingestor.messages():
+            handed += 1
+            first_seen.setdefault(message.ts, time.perf_counter())
+
+    consumer = asyncio.ensure_future(consume())
+    await asyncio.get_running_loop().run_in_executor(None, post_all, slack, messages, rate)
+    await ingestor.queue.join()
+    await asyncio.sleep(0)  # let the consumer come back for the next message, which marks the last one handled
+    ingestor.flush()
+    summary("events", slack, handed, first_seen)
+    print(f"          ingestor={ingestor.stats()}")
+
+    # Restart: messages posted while nothing is listening are picked up from the saved marks
+    slack.subscriber = None
+    missed = [slack.post(CHANNELS[i % 2], f"posted while down {i}") for i in range(10)]
+    restarted = SlackEventIngestor(cursors=CursorStore(cursor_path)).bind()
+    calls_before, downloaded_before = slack.api_calls, slack.messages_downloaded
+    read = restarted.catch_up(slack, CHANNELS)
+    await asyncio.sleep(0)
+    print(
+        f"{'catch-up':<9} api_calls={slack.api_calls - calls_before:<4} downloaded={slack.messages_downloaded - downloaded_before:<5} "
+        f"read={read} queued={restarted.stats()['queued']} (posted while down: {len(missed)}, some are bot messages)"
+    )
+    consumer.cancel()
+
+
+async def dropped_then_restart(cursor_path: str, queue_size: int = 5, burst: int = 20):
+    logging.getLogger("slack_events").setLevel(logging.ERROR)  # one warning per dropped message
+    slack = FakeSlack()
+    ingestor = SlackEventIngestor(queue_size=queue_size, cursors=CursorStore(cursor_path)).bind()
+    slack.subscriber = ingestor.handle_event
+    # Burst while the consumer is busy: everything past the queue size is dropped
+    for i in range(burst):
+        slack.post(CHANNELS[i % 2], f"burst {i}")
+    await asyncio.sleep(0)
+    dropped = ingestor.stats()["dropped"]
+
+    async def consume(source: SlackEventIngestor):
+        async for _ in source.messages():
+            pass
+
+    consumer = asyncio.ensure_future(consume(ingestor))
+    # More traffic after the drop moves the marks past the dropped messages
+    for i in range(10):
+        slack.post(CHANNELS[i % 2], f"after the burst {i}")
+        await asyncio.sleep(0)
+    await ingestor.queue.join()
+    await asyncio.sleep(0)
+    ingestor.flush()
+    consumer.cancel()
+
+    restarted = SlackEventIngestor(cursors=CursorStore(cursor_path)).bind()
+    calls_before = slack.api_calls
+    read = restarted.catch_up(slack, CHANNELS)
+    calls = slack.api_calls - calls_before
+    await asyncio.sleep(0)
+    queued = restarted.stats()["queued"]
+    consumer = asyncio.ensure_future(consume(restarted))
+    await restarted.queue.join()
+    await asyncio.sleep(0)
+    restarted.flush()
+    consumer.cancel()
+    again = SlackEventIngestor(cursors=CursorStore(cursor_path)).bind().catch_up(slack, CHANNELS)
+    print(
+        f"{'drops':<9} dropped={dropped} restart: api_calls={calls} read={read} queued={queued}; "
+        f"next restart read={again} (reads include bot messages past the marks)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=60)
+    parser.add_argument("--rate", type=float, default=30, help="messages posted per second")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(polling(args.messages, args.rate, args.poll_interval))
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(events(args.messages, args.rate, os.path.join(tmp, "cursors.json")))
+        asyncio.run(dropped_then_restart(os.path.join(tmp, "dropped.json")))
@@ -0,0 +1,50 @@
+"""Cold-start cost of importing the retriever module, and of warming it up.
+
+Each import is timed in a fresh interpreter so module caches don't hide the cost.
+`--warm-up` additionally loads every retriever (needs FIREWORKS_API_KEY and, for
+collections that don't exist yet, network access). Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import context
+elapsed = time.perf_counter() - started
+assert not any(r.loaded for r in context.retrievers.values()), "retrievers loaded at import time"
+print(elapsed)
+"""
+
+WARM_UP_SNIPPET = """
+import json
+import context
+print(json.dumps(context.warm_up()))
+"""
+
+
+def time_import(runs: int):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    print(f"import context: median={statistics.median(samples):.2f}s min={min(samples):.2f}s max={max(samples):.2f}s over {runs} runs")
+
+
+def time_warm_up():
+    output = subprocess.run([sys.executable, "-c", WARM_UP_SNIPPET], capture_output=True, text=True, check=True).stdout
+    print(f"warm_up(): {output.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm-up", action="store_true", help="also time loading every retriever")
+    args = parser.parse_args()
+    time_import(args.runs)
+    if args.warm_up:
+        time_warm_up()
@@ -0,0 +1,99 @@
+"""A local stand-in for Slack used by the ingestion and distribution benchmarks.
+
+`FakeSlack` keeps per-channel history and answers `conversations_history` like the Web
+API (newest first, `oldest`/`limit`/`cursor`), counting calls. `post` records a message
+and emits its events to a subscriber the way Socket Mode would: a `message` event, an
+`app_mention` twin for mentions, occasional redeliveries of the same event, and bot
+chatter that should be ignored. `chat_postMessage` takes `post_latency` per call, answers
+`channel_not_found` for `missing_channels`, and returns a 429 with `Retry-After` when a
+channel gets posts faster than `channel_interval`, like Slack's special tier.
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+
+class FakeSlack:
+    def __init__(self, redelivery_rate: float = 0.2, bot_rate: float = 0.1, seed: int = 7, post_latency: float = 0.0, channel_interval: float = 0.0, missing_channels=()):
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+        self.posted_at: Dict[str, float] = {}
+        self.subscriber: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self.redelivery_rate = redelivery_rate
+        self.bot_rate = bot_rate
+        self.random = random.Random(seed)
+        self.api_calls = 0
+        self.messages_downloaded = 0
+        self.post_latency = post_latency
+        self.channel_interval = channel_interval
+        self.missing_channels = set(missing_channels)
+        self.posts = 0
+        self.rate_limited = 0
+        self._last_post: Dict[str, float] = {}
+        self._clock = 1_700_000_000.0
+        self._lock = threading.Lock()
+
+    def post(self, channel: str, text: str, user: str = "U1") -> str:
+        with self._lock:
+            self._clock += 1
+            ts = f"{self._clock:.6f}"
+            bot = self.random.random() < self.bot_rate
+            message = {"type": "message", "ts": ts, "text": text, "user": user}
+            if bot:
+                message.update(subtype="bot_message", bot_id="B1")
+            self.history.setdefault(channel, []).append(message)
+            self.posted_at[ts] = time.perf_counter()
+            redeliver = self.random.random() < self.redelivery_rate
+        if self.subscriber:
+            event = {**message, "channel": channel}
+            self.subscriber(event)
+            if "<@" in text:
+                self.subscriber({**event, "type": "app_mention"})
+            if redeliver:
+                self.subscriber(dict(event))
+        return ts
+
+    def conversations_history(self, channel: str, oldest: Optional[str] = None, latest: Optional[str] = None, inclusive: bool = False, limit: int = 100, cursor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        def in_range(ts: float) -> bool:
+            if inclusive:
+                return (oldest is None or ts >= float(oldest)) and (latest is None or ts <= float(latest))
+            return (oldest is None or ts > float(oldest)) and (latest is None or ts < float(latest))
+
+        with self._lock:
+            self.api_calls += 1
+            messages = [m for m in reversed(self.history.get(channel, [])) if in_range(float(m["ts"]))]
+            start = int(cursor or 0)
+            page = messages[start:start + limit]
+            self.messages_downloaded += len(page)
+        has_more = start + limit < len(messages)
+        return {"ok": True, "messages": page, "has_more": has_more, "response_metadata": {"next_cursor": str(start + limit) if has_more else ""}}
+
+    def _error(self, error: str, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        response = SlackResponse(client=None, http_verb="POST", api_url="chat.postMessage", req_args={}, data={"ok": False, "error": error}, headers=headers or {}, status_code=status_code)
+        raise SlackApiError(f"The request to the Slack API failed: {error}", response)
+
+    def chat_postMessage(self, channel: str, text: str = "", blocks=None, thread_ts: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.post_latency)
+        with self._lock:
+            self.api_calls += 1
+            if channel in self.missing_channels:
+                failure = ("channel_not_found", 404, None)
+            else:
+                now = time.monotonic()
+                last = self._last_post.get(channel)
+                if last is not None and now - last < self.channel_interval:
+                    self.rate_limited += 1
+                    failure = ("ratelimited", 429, {"Retry-After": "1"})
+                else:
+                    self._last_post[channel] = now
+                    self.posts += 1
+                    self._clock += 1
+                    ts = f"{self._clock:.6f}"
+                    self.history.setdefault(channel, []).append({"type": "message", "ts": ts, "text": text, "blocks": blocks, "thread_ts": thread_ts})
+                    failure = None
+        if failure:
+            self._error(*failure)
+        return {"ok": True, "channel": channel, "ts": ts}
@@ -0,0 +1,181 @@
+"""A tiny local stand-in for the GitHub REST API, used by the benchmarks.
+
+Serves just enough of `/repos/{owner}/{repo}`, `/repos/{owner}/{repo}/releases/tags/{tag}`,
+`/repos/{owner}/{repo}/issues[/{number}]`, PR diff downloads and aliased
+`issueOrPullRequest` lookups on `/graphql` for PyGithub and the fetch engines, with a
+fixed artificial latency per request to stand in for the network.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+def make_release_body(numbers: List[int]) -> str:
+    return "Changes since previous release\n\n" + "\n".join(f"pkg[patch]: change number {n} (#{n})" for n in numbers)
+
+
+class StubGitHub:
+    def __init__(self, numbers: List[int], latency: float = 0.05, diff_lines: int = 200, tag: str = "pkg==0.0.1"):
+        self.numbers = numbers
+        self.latency = latency
+        self.diff_lines = diff_lines
+        self.tag = tag
+        # Numbers reported as edited after the initial fetch (newer updated_at, listed by /issues?since=)
+        self.updated_numbers = set()
+        self.request_count = 0
+        self.request_paths: List[str] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path: str):
+        with self._lock:
+            self.request_count += 1
+            self.request_paths.append(path)
+
+    def reset_counts(self):
+        with self._lock:
+            self.request_count = 0
+            self.request_paths = []
+
+    # Payloads
+
+    def repo_payload(self, owner: str, name: str) -> Dict:
+        return {
+            "id": 1,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "url": f"{self.base_url}/repos/{owner}/{name}",
+        }
+
+    def release_payload(self, owner: str, name: str) -> Dict:
+        return {
+            "id": 1,
+            "tag_name": self.tag,
+            "name": self.tag,
+            "title": self.tag,
+            "body": make_release_body(self.numbers),
+            "url": f"{self.base_url}/repos/{owner}/{name}/releases/1",
+        }
+
+    def issue_payload(self, owner: str, name: str, number: int) -> Dict:
+        created = datetime(2024, 8, 1, tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        updated = datetime(2024, 8, 2 if number in self.updated_numbers else 1, tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        payload = {
+            "number": number,
+            "title": f"Change number {number}",
+            "state": "closed",
+            "user": {"login": f"author{number % 7}"},
+            "created_at": created,
+            "updated_at": updated,
+            "closed_at": created,
+            "url": f"{self.base_url}/repos/{owner}/{name}/issues/{number}",
+        }
+        # Even numbers are pull requests, odd numbers plain issues
+        if number % 2 == 0:
+            payload["pull_request"] = {"diff_url": f"{self.base_url}/{owner}/{name}/pull/{number}.diff"}
+        return payload
+
+    def graphql_node(self, owner: str, name: str, number: int) -> Optional[Dict]:
+        if number not in self.numbers:
+            return None
+        issue = self.issue_payload(owner, name, number)
+        is_pull = "pull_request" in issue
+        return {
+            "__typename": "PullRequest" if is_pull else "Issue",
+            "number": number,
+            "title": issue["title"],
+            "state": "MERGED" if is_pull else "CLOSED",
+            "url": f"{self.base_url}/{owner}/{name}/{'pull' if is_pull else 'issues'}/{number}",
+            "author": {"login": issue["user"]["login"]},
+            "createdAt": issue["created_at"],
+            "updatedAt": issue["updated_at"],
+            "closedAt": issue["closed_at"],
+        }
+
+    def diff_payload(self, number: int) -> str:
+        lines = [
+            f"diff --git a/libs/module_{number}.py b/libs/module_{number}.py",
+            "index 3309e38e150..3c148c1f377 100644",
+            f"--- a/libs/module_{number}.py",
+            f"+++ b/libs/module_{number}.py",
+            f"@@ -1,{self.diff_lines} +1,{self.diff_lines} @@ def function_{number}():",
+        ]
+        for i in range(self.diff_lines):
+            lines.append(f"-    value_{i} = {i}")
+            lines.append(f"+    value_{i} = {i + number}")
+        return "\n".join(lines) + "\n"
+
+    # Server
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stub.count(self.path)
+                time.sleep(stub.latency)
+                path = self.path.split("?")[0]
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)", path):
+                    return self.send_json(stub.repo_payload(*match.groups()))
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)/releases/tags/(.+)", path):
+                    return self.send_json(stub.release_payload(*match.groups()[:2]))
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)/issues", path):
+                    owner, name = match.groups()
+                    return self.send_json([stub.issue_payload(owner, name, n) for n in sorted(stub.updated_numbers)])
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)/issues/(\d+)", path):
+                    owner, name, number = match.groups()
+                    if int(number) not in stub.numbers:
+                        return self.send_json({"message": "Not Found"}, status=404)
+                    return self.send_json(stub.issue_payload(owner, name, int(number)))
+                if match := re.fullmatch(r"/([^/]+)/([^/]+)/pull/(\d+)\.diff", path):
+                    body = stub.diff_payload(int(match.group(3))).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_json({"message": "Not Found"}, status=404)
+
+            def do_POST(self):
+                stub.count(self.path)
+                time.sleep(stub.latency)
+                if self.path != "/graphql":
+                    return self.send_json({"message": "Not Found"}, status=404)
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                owner, name = request["variables"]["owner"], request["variables"]["name"]
+                aliases = re.findall(r"(r\d+): issueOrPullRequest\(number: (\d+)\)", request["query"])
+                repository = {alias: stub.graphql_node(owner, name, int(number)) for alias, number in aliases}
+                self.send_json({"data": {"repository": repository}})
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", os.path.join(LAZYPMS_CACHE_DIR, "checkpoints.sqlite"))
+CHECKPOINTS = os.environ.get("CHECKPOINTS", "1").lower() in ("1", "true", "yes")
+# Node outputs older than this are recomputed (GitHub data goes stale)
+CHECKPOINT_TTL = float(os.environ.get("CHECKPOINT_TTL", str(24 * 60 * 60)))
+# Outputs are only reused within the run that stored them (resume). Set to share them
+# across runs while iterating on prompts; new requests would otherwise replay old notes.
+CHECKPOINT_SHARED = os.environ.get("CHECKPOINT_SHARED", "0").lower() in ("1", "true", "yes")
+
+# State keys that describe a run rather than feed a node; left out of input hashes
+UNHASHED_KEYS = ("process_metrics",)
+
+# Run the current graph invocation belongs to, set by `run_context`
+current_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_run_id", default=None)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of whatever determines a node's behaviour: prompts, model settings, flags."""
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def state_hash(state: Dict[str, Any]) -> str:
+    relevant = {key: value for key, value in state.items() if key not in UNHASHED_KEYS}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite store of node outputs keyed by (scope, node, input state hash, node fingerprint), plus a run log.
+
+    The scope is the run's ID, so a node's output is reused when the same run sees the
+    same input state with the same prompts and settings: resuming a failed run skips every
+    node that completed, and changing a downstream prompt only reruns the nodes from there
+    on. With CHECKPOINT_SHARED the scope is empty and outputs are shared across runs. Only
+    the keys a node changed are stored.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH, ttl: float = CHECKPOINT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(node_outputs)")]
+            if columns and "scope" not in columns:
+                conn.execute("DROP TABLE node_outputs")  # unscoped outputs from an older version
+            conn.executescript(
+                """CREATE TABLE IF NOT EXISTS node_outputs (
+                    scope TEXT NOT NULL,
+                    node TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (scope, node, input_hash, fingerprint)
+                );
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS run_nodes (
+                    run_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    node TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    cached INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, seq)
+                );"""
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, scope: str, node: str, input_hash: str, node_fingerprint: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT output, created_at FROM node_outputs WHERE scope = ? AND node = ? AND input_hash = ? AND fingerprint = ?",
+                (scope, node, input_hash, node_fingerprint),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, scope: str, node: str, input_hash: str, node_fingerprint: str, output: Dict[str, Any], seconds: float) -> None:
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO node_outputs (scope, node, input_hash, fingerprint, output, seconds, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (scope, node, input_hash, node_fingerprint, json.dumps(output, default=str), seconds, time.time()),
+                )
+
+    def clear_run(self, run_id: str) -> None:
+        """Forget a run's outputs and log, so reusing its ID starts from scratch."""
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM node_outputs WHERE scope = ?", (run_id,))
+                conn.execute("DELETE FROM run_nodes WHERE run_id = ?", (run_id,))
+                conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def start_run(self, message: str, run_id: Optional[str] = None) -> str:
+        run_id = run_id or uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO runs (run_id, message, status, created_at, updated_at) VALUES (?, ?, 'running', ?, ?) "
+                    "ON CONFLICT(run_id) DO UPDATE SET status = 'running', updated_at = excluded.updated_at",
+                    (run_id, message, now, now),
+                )
+        return run_id
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id))
+
+    def log_node(self, run_id: str, node: str, input_hash: str, cached: bool, failed: bool, seconds: float) -> None:
+        with self._lock, closing(self._connect()) as conn:
+            with conn:
+                seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM run_nodes WHERE run_id = ?", (run_id,)).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO run_nodes (run_id, seq, node, input_hash, cached, failed, seconds, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, seq, node, input_hash, int(cached), int(failed), seconds, time.time()),
+                )
+
+    def run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """A run's message, status and node log (oldest first), or None if unknown."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT message, status, created_at, updated_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            nodes = conn.execute(
+                "SELECT node, cached, failed, seconds, finished_at FROM run_nodes WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+        return {
+            "run_id": run_id,
+            "message": row[0],
+            "status": row[1],
+            "created_at": row[2],
+            "updated_at": row[3],
+            "nodes": [{"node": n, "cached": bool(c), "failed": bool(f), "seconds": s, "finished_at": t} for n, c, f, s, t in nodes],
+        }
+
+    def runs(self, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            query = "SELECT run_id, message, status, updated_at FROM runs"
+            params: Tuple[Any, ...] = ()
+            if status:
+                query += " WHERE status = ?"
+                params = (status,)
+            rows = conn.execute(query + " ORDER BY updated_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [{"run_id": r, "message": m, "status": s, "updated_at": u} for r, m, s, u in rows]
+
+
+checkpoint_store = CheckpointStore()
+
+
+def _delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in after.items() if key not in UNHASHED_KEYS and before.get(key) != value}
+
+
+def checkpointed(node: str, *fingerprint_parts: Any, store: Optional[CheckpointStore] = None) -> Callable:
+    """Decorate a graph node (sync or async) so its output is checkpointed and reused.
+
+    `fingerprint_parts` are whatever shapes the node's output besides its input state
+    (prompts, model settings, flags); changing any of them invalidates only this node.
+    A run that added to `exception_reports` counts as failed and is not stored. Outside a
+    run (no `current_run_id`) the node just runs, unless CHECKPOINT_SHARED is set.
+    """
+    node_fingerprint = fingerprint(node, *fingerprint_parts)
+
+    def lookup(state, scope):
+        store_ = store or checkpoint_store
+        input_hash = state_hash(state)
+        delta = store_.get(scope, node, input_hash, node_fingerprint)
+        if delta is not None:
+            logger.info(f"Reusing checkpointed output of {node}")
+            hits = state.get("process_metrics", {}).get("checkpoint_hits", [])
+            result = {**state, **delta, "process_metrics": {**state.get("process_metrics", {}), "checkpoint_hits": hits + [node]}}
+            _log(store_, node, input_hash, cached=True, failed=False, seconds=0.0)
+            return store_, input_hash, result
+        return store_, input_hash, None
+
+    def save(store_, scope, input_hash, state, result, seconds):
+        failed = len(result.get("exception_reports", [])) > len(state.get("exception_reports", []))
+        if not failed:
+            store_.put(scope, node, input_hash, node_fingerprint, _delta(state, result), seconds)
+        _log(store_, node, input_hash, cached=False, failed=failed, seconds=seconds)
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(state):
+                scope = _scope()
+                if scope is None:
+                    return await function(state)
+                store_, input_hash, result = lookup(state, scope)
+                if result is not None:
+                    return result
+                started = time.perf_counter()
+                result = await function(state)
+                save(store_, scope, input_hash, state, result, time.perf_counter() - started)
+                return result
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(state):
+            scope = _scope()
+            if scope is None:
+                return function(state)
+            store_, input_hash, result = lookup(state, scope)
+            if result is not None:
+                return result
+            started = time.perf_counter()
+            result = function(state)
+            save(store_, scope, input_hash, state, result, time.perf_counter() - started)
+            return result
+        return wrapper
+
+    return decorator
+
+
+def _scope() -> Optional[str]:
+    """Key prefix for node outputs: the current run, "" when shared, None to skip checkpointing."""
+    if not CHECKPOINTS:
+        return None
+    return "" if CHECKPOINT_SHARED else current_run_id.get()
+
+
+def _log(store_: CheckpointStore, node: str, input_hash: str, cached: bool, failed: bool, seconds: float) -> None:
+    run_id = current_run_id.get()
+    if run_id:
+        store_.log_node(run_id, node, input_hash, cached, failed, seconds)
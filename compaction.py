@@ -0,0 +1,171 @@
+import os
+import re
+import json
+import time
+import logging
+import posixpath
+from typing import Any, Dict, List, Optional, Tuple
+
+from diff_reader import parse_diff
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt-token budget for the release data handed to content generation
+COMPACTION_TOKEN_BUDGET = int(os.environ.get("COMPACTION_TOKEN_BUDGET", "8000"))
+RELEASE_DATA_COMPACTION = os.environ.get("RELEASE_DATA_COMPACTION", "1").lower() in ("1", "true", "yes")
+# Most changed symbols listed per file
+MAX_SYMBOLS_PER_FILE = 8
+
+# Definitions on added/removed lines, and the enclosing definition git puts in hunk headers
+DEFINITION_PATTERN = re.compile(r"^[+-]\s*(?:async\s+def|def|class|function|func|fn)\s+([A-Za-z_$][\w$]*)")
+HUNK_CONTEXT_PATTERN = re.compile(r"^@@[^@]*@@\s*(?:.*?\b(?:async\s+def|def|class|function|func|fn)\s+([A-Za-z_$][\w$]*))?")
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly four characters per token; close enough for budgeting English, JSON and code."""
+    return (len(text) + 3) // 4
+
+
+def changed_symbols(diff: str) -> Dict[str, List[str]]:
+    """Functions and classes touched per file: defined on changed lines or enclosing a hunk."""
+    symbols: Dict[str, Dict[str, None]] = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            path = line.split(" b/", 1)[-1]
+            symbols.setdefault(path, {})
+            continue
+        if path is None:
+            continue
+        match = HUNK_CONTEXT_PATTERN.match(line) if line.startswith("@@") else DEFINITION_PATTERN.match(line)
+        if match and match.group(1):
+            symbols[path][match.group(1)] = None
+    return {path: list(names) for path, names in symbols.items()}
+
+
+def common_root(paths: List[str]) -> str:
+    if len(paths) < 2:
+        return posixpath.dirname(paths[0]) + "/" if paths and "/" in paths[0] else ""
+    root = posixpath.commonpath(paths)
+    return root + "/" if root else ""
+
+
+def summarize_pull_request(pr: Dict[str, Any], root: str, with_symbols: bool, max_files: Optional[int]) -> Dict[str, Any]:
+    diff = pr.get("diff") or ""
+    stats = pr.get("diff_stats") or parse_diff(diff.splitlines(), max_bytes=0)["diff_stats"]
+    symbols = changed_symbols(diff) if with_symbols else {}
+
+    # One line per distinct file, biggest changes first
+    files: Dict[str, Dict[str, int]] = {}
+    for entry in stats.get("files", []):
+        totals = files.setdefault(entry["path"], {"additions": 0, "deletions": 0})
+        totals["additions"] += entry.get("additions", 0)
+        totals["deletions"] += entry.get("deletions", 0)
+    ordered = sorted(files.items(), key=lambda item: -(item[1]["additions"] + item[1]["deletions"]))
+    lines = []
+    for path, totals in ordered[:max_files]:
+        line = f"{path[len(root):] if root and path.startswith(root) else path} +{totals['additions']}/-{totals['deletions']}"
+        names = symbols.get(path, [])[:MAX_SYMBOLS_PER_FILE]
+        if names:
+            line += ": " + ", ".join(names)
+        lines.append(line)
+    if max_files is not None and len(ordered) > max_files:
+        lines.append(f"... {len(ordered) - max_files} more files")
+
+    summary = {key: pr[key] for key in ("number", "title", "state", "author") if pr.get(key)}
+    for key in ("created_at", "closed_at", "merged_at"):
+        if pr.get(key):
+            summary[key] = str(pr[key])[:10]
+    if pr.get("body"):
+        summary["body"] = " ".join(str(pr["body"]).split())
+    summary["changes"] = f"+{sum(f['additions'] for f in files.values())}/-{sum(f['deletions'] for f in files.values())} in {len(files)} files"
+    summary["files"] = lines
+    return summary
+
+
+def compact_issue(issue: Dict[str, Any]) -> Dict[str, Any]:
+    compacted = {key: value for key, value in issue.items() if value not in (None, "", [], {})}
+    for key in ("created_at", "closed_at"):
+        if compacted.get(key):
+            compacted[key] = str(compacted[key])[:10]
+    if compacted.get("body"):
+        compacted["body"] = " ".join(str(compacted["body"]).split())
+    return compacted
+
+
+def truncate(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max(max_chars - 15, 0)] + " ...[truncated]"
+
+
+def render(data: Dict[str, Any]) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_release_data(github_data: str, token_budget: int = COMPACTION_TOKEN_BUDGET) -> Tuple[str, Dict[str, Any]]:
+    """Shrink `github_release_data_tool` output to fit `token_budget`; returns (text, report).
+
+    Whitespace and indentation go, raw diffs become per-file line counts and changed
+    symbols, and file paths lose the directory prefix they share (stated once as
+    `path_root`). If that is still over budget, symbols, long bodies and the less-changed
+    files are dropped in turn. Text that isn't release JSON is only squeezed and truncated.
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"before_chars": len(github_data), "before_tokens": estimate_tokens(github_data), "token_budget": token_budget, "stages": []}
+
+    try:
+        data = json.loads(github_data)
+    except (TypeError, json.JSONDecodeError):
+        data = None
+    if not isinstance(data, dict) or "error" in data:
+        compacted = truncate(" ".join(github_data.split()), token_budget * 4)
+        report["stages"].append("whitespace")
+    else:
+        pull_requests = data.get("pull_requests", [])
+        paths = [entry["path"] for pr in pull_requests for entry in (pr.get("diff_stats") or {}).get("files", [])]
+        paths += [line.split(" b/", 1)[-1] for pr in pull_requests if not pr.get("diff_stats") for line in (pr.get("diff") or "").splitlines() if line.startswith("diff --git ")]
+        root = common_root(sorted(set(paths)))
+
+        def build(with_symbols: bool = True, max_files: Optional[int] = None, max_body: Optional[int] = None) -> str:
+            compacted_data = {
+                "release_title": data.get("release_title"),
+                "release_body": data.get("release_body") or "",
+            }
+            if data.get("edited_code"):
+                compacted_data["edited_code"] = data["edited_code"]
+            if root:
+                compacted_data["path_root"] = root
+            compacted_data["issues"] = [compact_issue(issue) for issue in data.get("issues", [])]
+            compacted_data["pull_requests"] = [summarize_pull_request(pr, root, with_symbols, max_files) for pr in pull_requests]
+            if max_body is not None:
+                compacted_data["release_body"] = truncate(compacted_data["release_body"], max_body * 4)
+                for entry in compacted_data["issues"] + compacted_data["pull_requests"]:
+                    if "body" in entry:
+                        entry["body"] = truncate(entry["body"], max_body)
+            return render(compacted_data)
+
+        # Progressively lossier passes until the result fits
+        passes = [
+            ("summarize", {}),
+            ("drop_symbols", {"with_symbols": False}),
+            ("trim_bodies", {"with_symbols": False, "max_body": 400}),
+            ("top_10_files", {"with_symbols": False, "max_body": 400, "max_files": 10}),
+            ("top_3_files", {"with_symbols": False, "max_body": 200, "max_files": 3}),
+        ]
+        for stage, options in passes:
+            compacted = build(**options)
+            report["stages"].append(stage)
+            if estimate_tokens(compacted) <= token_budget:
+                break
+        else:
+            compacted = truncate(compacted, token_budget * 4)
+            report["stages"].append("truncate")
+
+    report.update(
+        after_chars=len(compacted),
+        after_tokens=estimate_tokens(compacted),
+        saved_tokens=report["before_tokens"] - estimate_tokens(compacted),
+        ratio=round(len(compacted) / len(github_data), 3) if github_data else 1.0,
+        seconds=round(time.perf_counter() - started, 4),
+    )
+    logger.info(f"Compacted release data from {report['before_tokens']} to {report['after_tokens']} tokens ({', '.join(report['stages'])})")
+    return compacted, report
@@ -5,10 +5,36 @@ from langchain.vectorstores.chroma import Chroma
 import chromadb
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_fireworks import FireworksEmbeddings
-
-embeddings = FireworksEmbeddings(model="nomic-ai/nomic-embed-text-v1.5")
-
-chroma = chromadb.PersistentClient(path="./chroma_db")
+from ingestion import index_documents
+from crawler import load_documents
+from embedding_cache import CachedEmbeddings
+from retrieval_cache import CachingRetriever
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.retrievers import BaseRetriever
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Nothing below touches Chroma, the embeddings API or the network at import time: the
+# client, embeddings and each collection are created on first use of a retriever tool,
+# or up front through warm_up().
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    # Shared by ingestion and Chroma query time, so each text is only ever embedded once
+    return CachedEmbeddings(FireworksEmbeddings(model="nomic-ai/nomic-embed-text-v1.5"))
+
+@lru_cache(maxsize=None)
+def get_chroma():
+    return chromadb.PersistentClient(path="./chroma_db")
 
 from chromadb.api import AdminAPI, ClientAPI
 def collection_exists(client:ClientAPI, collection_name):
@@ -20,14 +46,79 @@ def collection_exists(client:ClientAPI, collection_name):
     return found
 
 
+class LazyRetriever(BaseRetriever):
+    """Chroma retriever that runs its loader and connects to its collection on first query."""
+
+    collection_name: str
+    loader: Callable[[Any, Any], Any]
+
+    _retriever: Optional[BaseRetriever] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def load(self) -> BaseRetriever:
+        if self._retriever is None:
+            with self._lock:
+                if self._retriever is None:
+                    started = time.perf_counter()
+                    chroma, embeddings = get_chroma(), get_embeddings()
+                    self.loader(chroma, embeddings)
+                    self._retriever = Chroma(
+                        client=chroma,
+                        collection_name=self.collection_name,
+                        embedding_function=embeddings,
+                    ).as_retriever()
+                    logger.info(f"Loaded retriever for {self.collection_name} in {time.perf_counter() - started:.2f}s")
+        return self._retriever
+
+    @property
+    def loaded(self) -> bool:
+        return self._retriever is not None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.load().invoke(query, config={"callbacks": run_manager.get_child()})
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        retriever = self._retriever or await asyncio.get_running_loop().run_in_executor(None, self.load)
+        return await retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+
+
+# Retriever tool name -> lazy retriever, filled in below
+retrievers: Dict[str, LazyRetriever] = {}
+
+def cached(retriever: LazyRetriever, name: str) -> CachingRetriever:
+    """Put a query-result cache in front of a retriever tool (see retrieval_cache.cache_stats())."""
+    return CachingRetriever(retriever=retriever, collection_name=retriever.collection_name, name=name)
+
+def warm_up(names: Optional[List[str]] = None, max_workers: int = 4) -> Dict[str, float]:
+    """Load the named retrievers (all of them by default) ahead of the first request.
+
+    Returns the load time in seconds per retriever.
+    """
+    selected = {name: retrievers[name] for name in (names or list(retrievers))}
+
+    def load(item):
+        name, retriever = item
+        started = time.perf_counter()
+        retriever.load()
+        return name, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(load, selected.items()))
+
+def refresh_knowledge_base(names: Optional[List[str]] = None) -> None:
+    """Re-crawl the sources behind the named retrievers and re-index only what changed."""
+    for name in names or list(retrievers):
+        logger.info(f"Refreshing knowledge base for {name}")
+        retrievers[name].loader(get_chroma(), get_embeddings(), refresh=True)
+
+
 from langchain_community.document_loaders import WebBaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
 from langchain.vectorstores.chroma import Chroma
-import uuid
 
-def load_slack_communication_guidelines(chroma, embeddings):
-    collection_name = "langchain_tools"
+def load_slack_communication_guidelines(chroma, embeddings, refresh=False):
+    collection_name = "slack_communication_guidelines"
     urls = [
         "https://slack.com/blog/collaboration/etiquette-tips-in-slack",
         "https://www.forbes.com/sites/theyec/2021/02/17/working-remotely-eight-tips-to-communicate-professionally-and-effectively-on-slack/",
@@ -39,28 +130,20 @@ def load_slack_communication_guidelines(chroma, embeddings):
         "https://www.talaera.com/blog/slack-communication/"
     ]
     
-    if not collection_exists(chroma, collection_name):
-        loader = WebBaseLoader(urls)
-        data = loader.load()
+    if refresh or not collection_exists(chroma, collection_name):
+        data = load_documents(urls)
 
         documents = RecursiveCharacterTextSplitter(
             chunk_size=1000, chunk_overlap=200
         ).split_documents(data)
 
-        collection = chroma.create_collection(collection_name)
-        for doc in documents:
-            emb = embeddings.embed_documents([doc.page_content])
-            collection.add(
-                ids=[str(uuid.uuid1())],
-                embeddings=emb,
-                metadatas=doc.metadata,
-                documents=[doc.page_content]
-            )
+        collection = chroma.get_or_create_collection(collection_name)
+        index_documents(collection, documents, embeddings, urls, source_set="slack_communication_guidelines")
 
-load_slack_communication_guidelines(chroma, embeddings)
+retrievers["slack_communication_guidelines"] = LazyRetriever(collection_name="slack_communication_guidelines", loader=load_slack_communication_guidelines)
 
 slack_communication_guidelines = create_retriever_tool(
-    Chroma(client=chroma, collection_name="slack_communication_guidelines", embedding_function=embeddings).as_retriever(),
+    cached(retrievers["slack_communication_guidelines"], "slack_communication_guidelines"),
     "slack_communication_guidelines",
     "Search for guidelines on appropriate channels, tone, and format for Slack communications within the organization. Use this tool for any questions about Slack communication etiquette and best practices."
 )
@@ -70,10 +153,9 @@ from langchain_community.document_loaders import WebBaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
 from langchain.vectorstores.chroma import Chroma
-import uuid
 from typing import List
 
-urls: List[str] = [
+audience_specific_examples_urls: List[str] = [
     "https://www.linkedin.com/advice/3/heres-how-you-can-tailor-your-communication-q2yhf",
     "https://leaddev.com/personal-development/navigating-different-communication-styles-engineers",
     "https://www.forbes.com/sites/forbesagencycouncil/2022/08/02/creating-a-content-strategy-that-speaks-to-the-c-suite/",
@@ -83,38 +165,24 @@ urls: List[str] = [
     "https://contently.com/2023/11/08/a-guide-to-crafting-the-perfect-content-format/"
 ]
 
-def load_audience_specific_examples(chroma, embeddings):
-    if not collection_exists(chroma, "audience_specific_examples"):
+def load_audience_specific_examples(chroma, embeddings, refresh=False):
+    if refresh or not collection_exists(chroma, "audience_specific_examples"):
         try:
-            loader = WebBaseLoader(urls)
-            data = loader.load()
+            data = load_documents(audience_specific_examples_urls)
 
             documents = RecursiveCharacterTextSplitter(
                 chunk_size=1000, chunk_overlap=200
             ).split_documents(data)
 
-            collection = chroma.create_collection("audience_specific_examples")
-            for doc in documents:
-                emb = embeddings.embed_documents([doc.page_content])
-                metadata = doc.metadata.copy()
-                metadata['source'] = metadata.get('source', '')
-                collection.add(
-                    ids=[str(uuid.uuid1())],
-                    embeddings=emb,
-                    metadatas=[metadata],
-                    documents=[doc.page_content]
-                )
+            collection = chroma.get_or_create_collection("audience_specific_examples")
+            index_documents(collection, documents, embeddings, audience_specific_examples_urls, source_set="audience_specific_examples")
         except Exception as e:
             print(f"Error loading documents: {e}")
 
-load_audience_specific_examples(chroma, embeddings)
+retrievers["audience_specific_examples"] = LazyRetriever(collection_name="audience_specific_examples", loader=load_audience_specific_examples)
 
 audience_specific_examples = create_retriever_tool(
-    Chroma(
-        client=chroma,
-        collection_name="audience_specific_examples",
-        embedding_function=embeddings
-    ).as_retriever(),
+    cached(retrievers["audience_specific_examples"], "audience_specific_examples"),
     "audience_specific_examples",
     "Search for examples of communication styles and content strategies for Program Managers, Engineers, and C-suite executives. Use this tool to understand the expected format, tone, and content for each audience group."
 )
@@ -125,9 +193,8 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
 from langchain.vectorstores import Chroma
 import chromadb
-import uuid
 
-urls = [
+release_notes_best_practices_urls = [
     "https://www.aha.io/roadmapping/guide/launch/how-to-write-excellent-release-notes",
     "https://www.launchnotes.com/blog/how-to-write-great-product-release-notes-the-ultimate-guide",
     "https://www.productlogz.com/blog/how-to-write-release-notes",
@@ -138,46 +205,35 @@ urls = [
     "https://www.onset.io/blog/release-notes-best-practices"
 ]
 
-def load_release_notes_best_practices(chroma, embeddings):
-    if not collection_exists(chroma, "langchain_tools"):
+def load_release_notes_best_practices(chroma, embeddings, refresh=False):
+    if refresh or not collection_exists(chroma, "release_notes_best_practices"):
         try:
-            loader = WebBaseLoader(urls)
-            data = loader.load()
+            data = load_documents(release_notes_best_practices_urls)
 
             documents = RecursiveCharacterTextSplitter(
                 chunk_size=1000, chunk_overlap=200
             ).split_documents(data)
 
-            collection = chroma.create_collection("langchain_tools")
-            for doc in documents:
-                emb = embeddings.embed_documents([doc.page_content])
-                collection.add(
-                    ids=[str(uuid.uuid1())], embeddings=emb, metadatas=doc.metadata, documents=[doc.page_content]
-                )
+            collection = chroma.get_or_create_collection("release_notes_best_practices")
+            index_documents(collection, documents, embeddings, release_notes_best_practices_urls, source_set="release_notes_best_practices")
         except Exception as e:
             print(f"Error loading release notes best practices: {e}")
 
-load_release_notes_best_practices(chroma, embeddings)
-
-release_notes_best_practices = Chroma(
-    client=chroma,
-    collection_name="internal_review_guidelines",
-    embedding_function=embeddings,
-).as_retriever()
+release_notes_best_practices = LazyRetriever(collection_name="release_notes_best_practices", loader=load_release_notes_best_practices)
+retrievers["release_notes_best_practices"] = release_notes_best_practices
 
 release_notes_best_practices_tool = create_retriever_tool(
-    release_notes_best_practices,
+    cached(release_notes_best_practices, "release_notes_best_practices"),
     "release_notes_best_practices",
     "Search for best practices in writing effective release notes. For any questions about release notes principles and guidelines, you must use this tool!"
 )
 
 
-import uuid
 from langchain_community.document_loaders import WebBaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
 
-urls = [
+internal_review_guidelines_urls = [
     "https://bizfluent.com/how-10002395-conduct-organizational-review.html",
     "https://www.powerdms.com/policy-learning-center/why-it-is-important-to-review-policies-and-procedures",
     "https://www.launchnotes.com/blog/the-ultimate-guide-to-internal-feedback-in-the-workplace",
@@ -187,22 +243,17 @@ urls = [
     "https://www.utrgv.edu/curriculum-assessment/_files/022024/apr-process.pdf"
 ]
 
-def load_internal_review_guidelines(chroma, embeddings, collection_name="internal_review_guidelines"):
-    if not collection_exists(chroma, collection_name):
+def load_internal_review_guidelines(chroma, embeddings, collection_name="internal_review_guidelines", refresh=False):
+    if refresh or not collection_exists(chroma, collection_name):
         try:
-            loader = WebBaseLoader(urls)
-            data = loader.load()
+            data = load_documents(internal_review_guidelines_urls)
 
             documents = RecursiveCharacterTextSplitter(
                 chunk_size=1000, chunk_overlap=200
             ).split_documents(data)
 
-            collection = chroma.create_collection(collection_name)
-            for doc in documents:
-                emb = embeddings.embed_documents([doc.page_content])
-                collection.add(
-                    ids=[str(uuid.uuid1())], embeddings=emb, metadatas=doc.metadata, documents=[doc.page_content]
-                )
+            collection = chroma.get_or_create_collection(collection_name)
+            index_documents(collection, documents, embeddings, internal_review_guidelines_urls, source_set="internal_review_guidelines")
             print(f"Successfully loaded documents into {collection_name} collection.")
         except Exception as e:
             print(f"Error loading documents: {e}")
@@ -211,16 +262,11 @@ def load_internal_review_guidelines(chroma, embeddings, collection_name="interna
         print(f"Collection {collection_name} already exists. Skipping document loading.")
     return True
 
-load_internal_review_guidelines(chroma, embeddings)
-
-chroma_retriever = Chroma(
-    client=chroma,
-    collection_name="internal_review_guidelines",
-    embedding_function=embeddings,
-).as_retriever()
+chroma_retriever = LazyRetriever(collection_name="internal_review_guidelines", loader=load_internal_review_guidelines)
+retrievers["internal_review_guidelines"] = chroma_retriever
 
 internal_review_guidelines = create_retriever_tool(
-    chroma_retriever,
+    cached(chroma_retriever, "internal_review_guidelines"),
     "internal_review_guidelines",
     "Search for information about organizational review procedures and feedback incorporation methods. Use this tool for any questions related to internal review guidelines, feedback processes, or evaluation procedures."
 )
@@ -230,9 +276,8 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
 from langchain.vectorstores.chroma import Chroma
 import chromadb
-import uuid
 
-urls = [
+system_architecture_urls = [
     "https://www.bp-3.com/blog/process-management-architecture-overview-of-methods-features-and-capabilities",
     "https://www.processmaker.com/blog/process-optimization-explained/",
     "https://www.redhat.com/architect/architecture-documentation-practices",
@@ -244,33 +289,32 @@ urls = [
     "https://orgmapper.com/what-is-organizational-mapping-understand-this-business-architecture-concept/"
 ]
 
-def load_system_architecture_docs(chroma_client, embeddings):
+def load_system_architecture_docs(chroma_client, embeddings, refresh=False):
     collection_name = "system_architecture_search"
-    if not collection_exists(chroma_client, collection_name):
-        loader = WebBaseLoader(urls)
-        data = loader.load()
+    if refresh or not collection_exists(chroma_client, collection_name):
+        data = load_documents(system_architecture_urls)
 
         documents = RecursiveCharacterTextSplitter(
             chunk_size=1000, chunk_overlap=200
         ).split_documents(data)
 
-        collection = chroma_client.create_collection(collection_name)
-        for doc in documents:
-            emb = embeddings.embed_documents([doc.page_content])
-            collection.add(
-                ids=[str(uuid.uuid1())], embeddings=emb, metadatas=doc.metadata, documents=[doc.page_content]
-            )
-
-load_system_architecture_docs(chroma, embeddings)
+        collection = chroma_client.get_or_create_collection(collection_name)
+        index_documents(collection, documents, embeddings, system_architecture_urls, source_set="system_architecture_search")
 
-system_architecture_vectorstore = Chroma(
-    client=chroma,
-    collection_name="system_architecture_search",
-    embedding_function=embeddings,
-)
+retrievers["system_architecture_search"] = LazyRetriever(collection_name="system_architecture_search", loader=load_system_architecture_docs)
 
 system_architecture_docs = create_retriever_tool(
-    system_architecture_vectorstore.as_retriever(),
+    cached(retrievers["system_architecture_search"], "system_architecture_search"),
     "system_architecture_search",
     "Search for information about system architecture, process management, and optimization. Use this tool for questions related to organizational system architecture and effective process management."
 )
+
+if __name__ == "__main__":
+    import sys
+
+    if "--refresh" in sys.argv:
+        # Pick up edits to the source pages without re-embedding unchanged chunks
+        refresh_knowledge_base()
+    # Build or attach every knowledge collection ahead of time, e.g. in a deploy step
+    for name, seconds in warm_up().items():
+        print(f"{name}: {seconds:.2f}s")
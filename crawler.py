@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+CRAWL_SNAPSHOT_DIR = os.environ.get("CRAWL_SNAPSHOT_DIR", os.path.join(LAZYPMS_CACHE_DIR, "snapshots"))
+# Replay pages from snapshots only, never touching the network
+CRAWL_OFFLINE = os.environ.get("CRAWL_OFFLINE", "").lower() in ("1", "true", "yes")
+CRAWL_MAX_WORKERS = int(os.environ.get("CRAWL_MAX_WORKERS", "8"))
+CRAWL_PER_HOST = int(os.environ.get("CRAWL_PER_HOST", "2"))
+CRAWL_HOST_DELAY = float(os.environ.get("CRAWL_HOST_DELAY", "0.5"))
+CRAWL_TIMEOUT = float(os.environ.get("CRAWL_TIMEOUT", "20"))
+CRAWL_RETRIES = int(os.environ.get("CRAWL_RETRIES", "2"))
+
+USER_AGENT = "Mozilla/5.0 (compatible; lazypms-crawler/0.1)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SnapshotStore:
+    """Raw page bodies on disk, keyed by the sha256 of the URL, with a JSON sidecar."""
+
+    def __init__(self, directory: str = CRAWL_SNAPSHOT_DIR):
+        self.directory = directory
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.raw"), os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as file:
+                meta = json.load(file)
+            with open(body_path, "rb") as file:
+                return file.read(), meta
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, url: str, body: bytes, meta: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        # Body first, so a sidecar never points at a missing or partial body
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps({**meta, "url": url}).encode("utf-8"))
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class HostLimiter:
+    """At most `per_host` requests in flight per host, and `delay` seconds between request starts."""
+
+    def __init__(self, per_host: int = CRAWL_PER_HOST, delay: float = CRAWL_HOST_DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: Dict[str, threading.Semaphore] = defaultdict(lambda: threading.Semaphore(self.per_host))
+        self._next_start: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores[host]
+        semaphore.acquire()
+        with self._lock:
+            start = max(time.monotonic(), self._next_start[host])
+            self._next_start[host] = start + self.delay
+        time.sleep(max(start - time.monotonic(), 0))
+        return semaphore
+
+
+def fetch_page(url: str, session: requests.Session, limiter: HostLimiter, timeout: float = CRAWL_TIMEOUT, retries: int = CRAWL_RETRIES) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    """GET `url` politely, retrying timeouts, connection errors, 429s and 5xx with backoff."""
+    host = urlparse(url).netloc
+    for attempt in range(retries + 1):
+        semaphore = limiter.acquire(host)
+        try:
+            response = session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            error = str(e)
+            response = None
+        finally:
+            semaphore.release()
+
+        if response is not None:
+            if response.status_code == 200:
+                meta = {
+                    "status": response.status_code,
+                    "content_type": response.headers.get("Content-Type", ""),
+                    "encoding": response.encoding or response.apparent_encoding,
+                    "fetched_at": time.time(),
+                }
+                return response.content, meta
+            if response.status_code not in RETRY_STATUSES:
+                logger.warning(f"Giving up on {url}: HTTP {response.status_code}")
+                return None
+            error = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After", "")
+        else:
+            retry_after = ""
+
+        if attempt < retries:
+            backoff = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            logger.info(f"Retrying {url} in {backoff:.1f}s after {error}")
+            time.sleep(backoff + random.uniform(0, 0.5))
+    logger.warning(f"Giving up on {url} after {retries + 1} attempts: {error}")
+    return None
+
+
+def crawl(urls: List[str], max_workers: int = CRAWL_MAX_WORKERS, limiter: Optional[HostLimiter] = None, snapshots: Optional[SnapshotStore] = None, offline: bool = CRAWL_OFFLINE) -> Dict[str, Optional[Tuple[bytes, Dict[str, Any]]]]:
+    """Fetch `urls` concurrently and return {url: (body, meta) or None}.
+
+    Every successful fetch is written to the snapshot store; in offline mode pages are
+    only read back from it, so an index build can be replayed without network.
+    """
+    snapshots = snapshots or SnapshotStore()
+    if offline:
+        pages = {url: snapshots.get(url) for url in urls}
+        for url, page in pages.items():
+            if page is None:
+                logger.warning(f"No snapshot for {url} in {snapshots.directory}")
+        return pages
+
+    limiter = limiter or HostLimiter()
+    with requests.Session() as session:
+        session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_maxsize=max(max_workers, 1))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        def fetch(url):
+            page = fetch_page(url, session, limiter)
+            if page is not None:
+                snapshots.put(url, *page)
+            return page
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            return dict(zip(urls, executor.map(fetch, urls)))
+
+
+def build_metadata(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    """Same metadata WebBaseLoader attaches to each page."""
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html := soup.find("html"):
+        metadata["language"] = html.get("lang", "No language found.")
+    return metadata
+
+
+def load_documents(urls: List[str], **kwargs) -> List[Document]:
+    """Drop-in for `WebBaseLoader(urls).load()` backed by the concurrent crawler."""
+    documents = []
+    for url, page in crawl(urls, **kwargs).items():
+        if page is None:
+            continue
+        body, meta = page
+        try:
+            html = body.decode(meta.get("encoding") or "utf-8", errors="replace")
+        except LookupError:
+            html = body.decode("utf-8", errors="replace")
+        soup = BeautifulSoup(html, "html.parser")
+        documents.append(Document(page_content=soup.get_text(), metadata=build_metadata(soup, url)))
+    return documents
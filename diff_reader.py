@@ -0,0 +1,190 @@
+import os
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Bytes of diff text kept per pull request for the agent prompt
+GITHUB_DIFF_MAX_BYTES = int(os.environ.get("GITHUB_DIFF_MAX_BYTES", str(48 * 1024)))
+# Stop downloading altogether after this many bytes; stats for the rest are marked incomplete
+GITHUB_DIFF_MAX_READ_BYTES = int(os.environ.get("GITHUB_DIFF_MAX_READ_BYTES", str(20 * 1024 * 1024)))
+DIFF_CHUNK_SIZE = 64 * 1024
+
+
+class DiffParser:
+    """Incremental unified diff parser that keeps whole hunks until a byte budget runs out.
+
+    Feed it one line at a time. Per-file addition/deletion counts are kept for every file,
+    but hunk text is only retained while it fits in `max_bytes`; hunks that don't fit are
+    counted and replaced by a one-line marker under their file header, so memory stays
+    bounded no matter how large the diff is.
+    """
+
+    def __init__(self, max_bytes: int = GITHUB_DIFF_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.kept: List[str] = []
+        self.kept_bytes = 0
+        self.total_bytes = 0
+        self.files: List[Dict[str, Any]] = []
+        self.hunks_omitted = 0
+        self.bytes_omitted = 0
+        self.stopped_reading = False
+        self._file: Optional[Dict[str, Any]] = None
+        self._header: List[str] = []
+        self._header_written = False
+        self._hunk: List[str] = []
+        self._hunk_bytes = 0
+        self._hunk_overflow = False
+
+    def feed(self, line: str) -> None:
+        size = len(line.encode("utf-8")) + 1
+        self.total_bytes += size
+
+        if line.startswith("diff --git "):
+            self._finish_file()
+            path = line.split(" b/", 1)[-1] if " b/" in line else line[len("diff --git "):]
+            self._file = {"path": path, "additions": 0, "deletions": 0, "hunks": 0, "hunks_omitted": 0, "binary": False}
+            self.files.append(self._file)
+            self._header = [line]
+            self._header_written = False
+            return
+
+        if self._file is None:
+            # Preamble before the first file header
+            self._keep([line], size)
+            return
+
+        if line.startswith("@@"):
+            self._finish_hunk()
+            self._file["hunks"] += 1
+            self._hunk = [line]
+            self._hunk_bytes = size
+            self._hunk_overflow = False
+            return
+
+        if not self._hunk:
+            # Still in the file header (index, ---/+++ lines, mode and rename info)
+            if line.startswith("Binary files "):
+                self._file["binary"] = True
+            self._header.append(line)
+            return
+
+        if line.startswith("+"):
+            self._file["additions"] += 1
+        elif line.startswith("-"):
+            self._file["deletions"] += 1
+
+        self._hunk_bytes += size
+        if self._hunk_overflow:
+            return
+        if self._header_bytes() + self.kept_bytes + self._hunk_bytes > self.max_bytes:
+            # Can't fit anymore; stop buffering but keep counting
+            self._hunk_overflow = True
+            self._hunk = self._hunk[:1]
+            return
+        self._hunk.append(line)
+
+    def close(self) -> Dict[str, Any]:
+        self._finish_file()
+        return {
+            "diff": "\n".join(self.kept),
+            "diff_stats": {
+                "files": self.files,
+                "total_bytes": self.total_bytes,
+                "kept_bytes": self.kept_bytes,
+                "truncated": {
+                    "hunks_omitted": self.hunks_omitted,
+                    "bytes_omitted": self.bytes_omitted,
+                    "stopped_reading": self.stopped_reading,
+                },
+            },
+        }
+
+    def _header_bytes(self) -> int:
+        if self._header_written:
+            return 0
+        return sum(len(line.encode("utf-8")) + 1 for line in self._header)
+
+    def _keep(self, lines: List[str], size: int) -> None:
+        self.kept.extend(lines)
+        self.kept_bytes += size
+
+    def _finish_hunk(self) -> None:
+        if not self._hunk:
+            return
+        if not self._hunk_overflow and self._header_bytes() + self.kept_bytes + self._hunk_bytes <= self.max_bytes:
+            self._write_header()
+            self._keep(self._hunk, self._hunk_bytes)
+        else:
+            self._file["hunks_omitted"] += 1
+            self.hunks_omitted += 1
+            self.bytes_omitted += self._hunk_bytes
+        self._hunk = []
+        self._hunk_bytes = 0
+        self._hunk_overflow = False
+
+    def _write_header(self) -> None:
+        if self._header_written:
+            return
+        self._keep(self._header, self._header_bytes())
+        self._header_written = True
+
+    def _finish_file(self) -> None:
+        if self._file is None:
+            return
+        self._finish_hunk()
+        if not self._header_written and not self._file["hunks"] and self.kept_bytes + self._header_bytes() <= self.max_bytes:
+            # Renames, mode changes and binary files are all header
+            self._write_header()
+        lines = []
+        if not self._header_written:
+            lines.append(self._header[0])
+        if self._file["hunks_omitted"]:
+            lines.append(f"# {self._file['hunks_omitted']} hunk(s) omitted (+{self._file['additions']}/-{self._file['deletions']} lines)")
+        size = sum(len(line.encode("utf-8")) + 1 for line in lines)
+        # Files past the budget still show up in diff_stats
+        if lines and self.kept_bytes + size <= self.max_bytes:
+            self._keep(lines, size)
+        self._file = None
+        self._header = []
+        self._header_written = False
+
+
+def parse_diff(lines: Iterable[str], max_bytes: int = GITHUB_DIFF_MAX_BYTES) -> Dict[str, Any]:
+    parser = DiffParser(max_bytes)
+    for line in lines:
+        parser.feed(line)
+    return parser.close()
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a byte stream on `\n` only (diff lines can contain `\r`), across chunk boundaries."""
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def read_diff(url: str, session: Optional[requests.Session] = None, max_bytes: int = GITHUB_DIFF_MAX_BYTES, max_read_bytes: int = GITHUB_DIFF_MAX_READ_BYTES) -> Dict[str, Any]:
+    """Stream a PR diff from `url` and return {"diff": kept text, "diff_stats": {...}}."""
+    http = session or requests
+    parser = DiffParser(max_bytes)
+    with http.get(url, stream=True, timeout=30) as response:
+        if response.status_code != 200:
+            logger.warning(f"Diff download failed with HTTP {response.status_code}: {url}")
+            result = parser.close()
+            result["diff_stats"]["error"] = f"HTTP {response.status_code}"
+            return result
+        # requests' iter_lines(delimiter=...) yields spurious empty lines at chunk boundaries
+        for raw_line in iter_lines(response.iter_content(chunk_size=DIFF_CHUNK_SIZE)):
+            parser.feed(raw_line.decode("utf-8", errors="replace"))
+            if parser.total_bytes >= max_read_bytes:
+                parser.stopped_reading = True
+                logger.warning(f"Stopped reading diff after {parser.total_bytes} bytes: {url}")
+                break
+    return parser.close()
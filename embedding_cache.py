@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", os.path.join(LAZYPMS_CACHE_DIR, "embeddings.sqlite"))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings object with a persistent SQLite cache keyed by (model, sha256(text)).
+
+    Documents and queries are cached separately since some models embed them differently.
+    Vectors are stored as float32 blobs. Within one call, repeated texts are embedded once,
+    and only texts that have never been seen are sent to the underlying model.
+    """
+
+    def __init__(self, underlying: Embeddings, path: str = EMBEDDING_CACHE_PATH, model: Optional[str] = None):
+        self.underlying = underlying
+        self.path = path
+        self.model = model or getattr(underlying, "model", None) or type(underlying).__name__
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, kind, text_hash)
+                )"""
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _lookup(self, kind: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with closing(self._connect()) as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND kind = ? AND text_hash IN ({placeholders})",
+                    (self.model, kind, *batch),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = array("f", blob).tolist()
+        return found
+
+    def _store(self, kind: str, vectors: Dict[str, List[float]]) -> None:
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, kind, text_hash, vector) VALUES (?, ?, ?, ?)",
+                    [(self.model, kind, digest, array("f", vector).tobytes()) for digest, vector in vectors.items()],
+                )
+
+    def _embed(self, kind: str, texts: List[str], embed) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        vectors = self._lookup(kind, list(unique))
+        missing = [digest for digest in unique if digest not in vectors]
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            fresh = dict(zip(missing, embed([unique[digest] for digest in missing])))
+            self._store(kind, fresh)
+            vectors.update(fresh)
+        return [vectors[digest] for digest in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts, self.underlying.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda texts: [self.underlying.embed_query(texts[0])])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"model": self.model, "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
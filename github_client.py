@@ -0,0 +1,307 @@
+"""Shared, rate-limit-aware access to the GitHub API.
+
+Every GitHub call in the app goes through the process-wide `github_client`:
+
+- one pooled keep-alive `requests.Session`, so calls reuse connections instead of
+  opening new ones;
+- a token bucket (`GITHUB_REQUESTS_PER_SECOND`, burst `GITHUB_BURST`) that paces calls to
+  the API host;
+- `X-RateLimit-Remaining`/`X-RateLimit-Reset` tracking. Once the quota is spent, calls wait
+  for the reset, up to `GITHUB_MAX_RATE_LIMIT_WAIT` seconds, and then raise
+  `RateLimitExceeded`;
+- retries on 429s, 5xx, secondary-rate-limit 403s and connection errors, honouring
+  `Retry-After` or else using full-jitter exponential backoff;
+- `get_json` sends `If-None-Match` with the last ETag it saw for the URL, so an unchanged
+  resource comes back as a 304, which does not count against the quota.
+
+`github()` hands out one shared PyGithub `Github` instance whose requests are sent through
+`request`, so PyGithub calls share the same session, token bucket, quota tracking and
+retries. PyGithub's own pacing and `GithubRetry` are turned off.
+"""
+import os
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from github import Auth, Github
+from github.Requester import Requester, RequestsResponse
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+GITHUB_POOL_SIZE = int(os.environ.get("GITHUB_POOL_SIZE", "16"))
+GITHUB_REQUESTS_PER_SECOND = float(os.environ.get("GITHUB_REQUESTS_PER_SECOND", "10"))
+GITHUB_BURST = int(os.environ.get("GITHUB_BURST", "20"))
+GITHUB_MAX_RETRIES = int(os.environ.get("GITHUB_MAX_RETRIES", "4"))
+GITHUB_BACKOFF_BASE = float(os.environ.get("GITHUB_BACKOFF_BASE", "1.0"))
+GITHUB_BACKOFF_MAX = float(os.environ.get("GITHUB_BACKOFF_MAX", "60"))
+# Longest we'll sleep for an exhausted quota to reset before giving up
+GITHUB_MAX_RATE_LIMIT_WAIT = float(os.environ.get("GITHUB_MAX_RATE_LIMIT_WAIT", "60"))
+GITHUB_ETAG_CACHE_SIZE = int(os.environ.get("GITHUB_ETAG_CACHE_SIZE", "512"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def github_time(headers) -> float:
+    """GitHub's clock (the `Date` header) for a response, as a Unix timestamp; local time if absent."""
+    date = (headers or {}).get("Date") or (headers or {}).get("date")
+    try:
+        return parsedate_to_datetime(date).timestamp() if date else time.time()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub rate limit exhausted until {time.strftime('%H:%M:%S UTC', time.gmtime(reset_at))}")
+
+
+class TokenBucket:
+    """Allows `capacity` calls at once, refilled at `rate` per second."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def connection_class(client: "GitHubClient", protocol: str) -> type:
+    """A PyGithub connection class (the httplib-like interface its Requester expects) that sends through `client`."""
+
+    class ClientConnection:
+        def __init__(self, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None, retry=None, pool_size=None, **kwargs):
+            self.host = host
+            self.port = port
+            self.protocol = protocol
+            self.timeout = timeout
+            self.verify = kwargs.get("verify", True)
+
+        def request(self, verb: str, url: str, input, headers: Dict[str, str]) -> None:
+            self.verb, self.url, self.input, self.headers = verb, url, input, headers
+
+        def getresponse(self) -> RequestsResponse:
+            netloc = f"{self.host}:{self.port}" if self.port else self.host
+            response = client.request(
+                self.verb,
+                f"{self.protocol}://{netloc}{self.url}",
+                headers=self.headers,
+                data=self.input,
+                timeout=self.timeout,
+                verify=self.verify,
+                allow_redirects=False,
+            )
+            return RequestsResponse(response)
+
+        def close(self) -> None:
+            pass
+
+    return ClientConnection
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = GITHUB_API_URL,
+        pool_size: int = GITHUB_POOL_SIZE,
+        rate: float = GITHUB_REQUESTS_PER_SECOND,
+        burst: int = GITHUB_BURST,
+        max_retries: int = GITHUB_MAX_RETRIES,
+        max_rate_limit_wait: float = GITHUB_MAX_RATE_LIMIT_WAIT,
+    ):
+        self._token = token
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.rate = rate
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/vnd.github.v3+json"
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.counts = {"requests": 0, "not_modified": 0, "retries": 0, "paced_seconds": 0.0, "rate_limit_seconds": 0.0}
+        self._etags: "OrderedDict[Tuple[str, Tuple], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._github: Optional[Github] = None
+
+    @property
+    def token(self) -> Optional[str]:
+        # Read late so a .env loaded after import still applies
+        return self._token or os.environ.get("GITHUB_ACCESS_TOKEN")
+
+    def url(self, path: str) -> str:
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def is_api(self, url: str) -> bool:
+        return url.startswith(self.base_url)
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def _observe(self, response: requests.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self.reset_at = float(reset)
+
+    def _wait_for_quota(self) -> None:
+        with self._lock:
+            remaining, reset_at = self.remaining, self.reset_at
+        if remaining != 0 or reset_at is None:
+            return
+        wait = reset_at - time.time() + 1
+        if wait <= 0:
+            return
+        if wait > self.max_rate_limit_wait:
+            raise RateLimitExceeded(reset_at)
+        logger.warning(f"GitHub rate limit exhausted, waiting {wait:.0f}s for it to reset")
+        self._count("rate_limit_seconds", wait)
+        time.sleep(wait)
+        with self._lock:
+            self.remaining = None
+
+    def backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+            if response.headers.get("X-RateLimit-Remaining") == "0" and response.headers.get("X-RateLimit-Reset", "").isdigit():
+                return max(float(response.headers["X-RateLimit-Reset"]) - time.time() + 1, 0.0)
+        # Full jitter keeps retrying workers from hitting GitHub in lockstep
+        return random.uniform(0, min(GITHUB_BACKOFF_MAX, GITHUB_BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def should_retry(response: requests.Response) -> bool:
+        if response.status_code in RETRY_STATUSES:
+            return True
+        # Primary (quota) and secondary (abuse) rate limits both come back as 403
+        return response.status_code == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers or "rate limit" in response.text.lower()
+        )
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request with pacing, rate-limit waits and retries; returns the last response."""
+        url = self.url(path)
+        api = self.is_api(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if api and self.token:
+            headers.setdefault("Authorization", f"token {self.token}")
+        kwargs.setdefault("timeout", 30)
+        for attempt in range(self.max_retries + 1):
+            if api:
+                self._wait_for_quota()
+                self._count("paced_seconds", self.bucket.acquire())
+            self._count("requests")
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logger.info(f"Retrying {method} {url} in {delay:.1f}s after {e}")
+            else:
+                if api:
+                    self._observe(response)
+                if not self.should_retry(response) or attempt == self.max_retries:
+                    return response
+                delay = self.backoff(attempt, response)
+                if delay > self.max_rate_limit_wait:
+                    return response
+                response.close()
+                logger.info(f"Retrying {method} {url} in {delay:.1f}s after HTTP {response.status_code}")
+            self._count("retries")
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET and decode JSON, revalidating with the last ETag for this URL (a 304 is free)."""
+        url = self.url(path)
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self._count("not_modified")
+            with self._lock:
+                self._etags.move_to_end(key)
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._etags[key] = (etag, data)
+                self._etags.move_to_end(key)
+                while len(self._etags) > GITHUB_ETAG_CACHE_SIZE:
+                    self._etags.popitem(last=False)
+        return data
+
+    def github(self) -> Github:
+        """The shared PyGithub client; its requests go through `request` (pacing, quota, retries).
+
+        PyGithub's connection classes are process-wide, so this routes every `Github`
+        instance's traffic through this client.
+        """
+        with self._lock:
+            if self._github is None:
+                Requester.injectConnectionClasses(connection_class(self, "http"), connection_class(self, "https"))
+                self._github = Github(
+                    auth=Auth.Token(self.token) if self.token else None,
+                    base_url=self.base_url,
+                    retry=None,
+                    seconds_between_requests=None,
+                    seconds_between_writes=None,
+                )
+            return self._github
+
+    def rate_limit(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"remaining": self.remaining, "reset_at": self.reset_at}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counts, "remaining": self.remaining, "reset_at": self.reset_at, "etags": len(self._etags)}
+
+
+github_client = GitHubClient()
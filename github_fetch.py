@@ -0,0 +1,144 @@
+import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests
+from github import GithubException
+
+from diff_reader import read_diff
+from github_client import github_client, github_time
+from reference_store import ReferenceStore, reference_store
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on issue/PR lookups (and diff downloads) in flight at once
+GITHUB_FETCH_MAX_WORKERS = int(os.environ.get("GITHUB_FETCH_MAX_WORKERS", "8"))
+# How many "updated since" issues to scan before falling back to revalidating stored references one by one
+GITHUB_STORE_SINCE_LIMIT = int(os.environ.get("GITHUB_STORE_SINCE_LIMIT", "300"))
+# Start "updated since" listings this much before the last confirmation, since GitHub's listings can lag writes
+GITHUB_SINCE_MARGIN = float(os.environ.get("GITHUB_SINCE_MARGIN", "60"))
+
+REFERENCE_PATTERN = r'#(\d+)'
+
+
+def extract_reference_numbers(body: str) -> List[int]:
+    """Return every `#NNN` reference in a release body, in order of appearance."""
+    return [int(number) for number in re.findall(REFERENCE_PATTERN, body or "")]
+
+
+def fetch_reference(repo, number: int, session: Optional[requests.Session] = None, store: Optional[ReferenceStore] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Fetch one issue or pull request and return ("issues" | "pull_requests", entry).
+
+    Returns None when GitHub can't resolve the number, mirroring the serial loop that
+    used to skip those references. With a `store`, the diff is only downloaded when this
+    (number, updated_at) hasn't been seen before.
+    """
+    try:
+        issue = repo.get_issue(number)
+        updated_at = issue.updated_at.isoformat() if issue.updated_at else ""
+        checked_at = github_time(issue.raw_headers)
+        if store is not None and updated_at:
+            stored = store.get(repo.full_name, number, updated_at)
+            if stored is not None:
+                store.touch(repo.full_name, [number], checked_at)
+                return stored
+
+        if issue.pull_request:
+            result = "pull_requests", {
+                "number": issue.number,
+                "title": issue.title,
+                "state": issue.state,
+                "author": issue.user.login,
+                **read_diff(issue.pull_request.diff_url, session),
+                "created_at": issue.created_at.isoformat(),
+            }
+        else:
+            result = "issues", {
+                "number": issue.number,
+                "title": issue.title,
+                "state": issue.state,
+                "author": issue.user.login,
+                "created_at": issue.created_at.isoformat(),
+                "closed_at": issue.closed_at.isoformat() if issue.closed_at else None
+            }
+        if store is not None and updated_at:
+            store.put(repo.full_name, number, updated_at, *result, fetched_at=checked_at)
+        return result
+    except GithubException:
+        # If we can't fetch the issue/PR, we'll skip it
+        return None
+
+
+def unchanged_since_stored(repo, stored: Dict[int, Tuple[str, str, Dict[str, Any], float]], limit: int = GITHUB_STORE_SINCE_LIMIT) -> Tuple[Set[int], Optional[float]]:
+    """Return the stored numbers GitHub reports as untouched since they were last confirmed.
+
+    Lists the repo's issues updated since the oldest confirmation (one paginated call
+    instead of one call per reference) and also returns GitHub's time for the listing, to
+    `touch` the confirmed rows with. If more than `limit` issues changed in that window
+    nothing is confirmed and the caller revalidates references individually.
+    """
+    if not stored:
+        return set(), None
+    since = datetime.fromtimestamp(min(record[3] for record in stored.values()), timezone.utc) - timedelta(seconds=GITHUB_SINCE_MARGIN)
+    changed: Dict[int, str] = {}
+    checked_at = None
+    url: Optional[str] = f"{repo.url}/issues"
+    params: Optional[Dict[str, Any]] = {"state": "all", "since": since.isoformat(), "sort": "updated", "direction": "asc", "per_page": 100}
+    seen = 0
+    try:
+        while url:
+            response = github_client.get(url, params=params)
+            response.raise_for_status()
+            # Anything updated after the first page was served shows up in the next window
+            checked_at = checked_at or github_time(response.headers)
+            for issue in response.json():
+                seen += 1
+                if seen > limit:
+                    logger.info(f"More than {limit} issues updated since {since.isoformat()}, revalidating references individually")
+                    return set(), None
+                if issue["number"] in stored:
+                    changed[issue["number"]] = datetime.fromisoformat(issue["updated_at"].replace("Z", "+00:00")).isoformat()
+            url, params = response.links.get("next", {}).get("url"), None
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Could not list updated issues, revalidating references individually: {e}")
+        return set(), None
+    return {number for number, record in stored.items() if changed.get(number, record[0]) == record[0]}, checked_at
+
+
+def fetch_references(repo, numbers: List[int], max_workers: int = GITHUB_FETCH_MAX_WORKERS, store: Optional[ReferenceStore] = reference_store) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch issues and pull requests for `numbers` with at most `max_workers` in flight.
+
+    Each distinct number is fetched once; the output lists follow the order of `numbers`
+    (duplicates included), so the result is identical to fetching them one by one.
+    References already in `store` and unchanged on GitHub are not fetched at all.
+    """
+    unique_numbers = list(dict.fromkeys(numbers))
+    results: Dict[int, Optional[Tuple[str, Dict[str, Any]]]] = {}
+
+    if store is not None:
+        stored = store.latest(repo.full_name, unique_numbers)
+        unchanged, checked_at = unchanged_since_stored(repo, stored)
+        for number in unchanged:
+            _, kind, entry, _ = stored[number]
+            results[number] = kind, entry
+        if unchanged:
+            store.touch(repo.full_name, unchanged, checked_at)
+        store.record_hits(len(results))
+    to_fetch = [number for number in unique_numbers if number not in results]
+
+    # Diffs download over the shared client's pooled keep-alive connections
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        for number, result in zip(to_fetch, executor.map(lambda n: fetch_reference(repo, n, github_client, store), to_fetch)):
+            results[number] = result
+
+    data: Dict[str, List[Dict[str, Any]]] = {"issues": [], "pull_requests": []}
+    for number in numbers:
+        result = results.get(number)
+        if result is not None:
+            kind, entry = result
+            data[kind].append(entry)
+    logger.info(f"Fetched {len(to_fetch)} of {len(unique_numbers)} references with {max_workers} workers")
+    return data
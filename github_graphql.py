@@ -0,0 +1,158 @@
+"""Resolve release references through GitHub's GraphQL API in a few batched queries.
+
+The REST path (`github_fetch.fetch_references`) costs one API call per referenced number.
+Here every `#NNN` becomes an aliased `issueOrPullRequest` field, `GITHUB_GRAPHQL_BATCH_SIZE`
+per query, so an 80-reference release takes two requests instead of eighty. PR diffs still
+come from the diff URL, which does not count against the API quota, and are skipped when
+the reference store already holds that (number, updatedAt). Queries and diffs go through
+the shared `github_client`. If a query fails, for example with no token (GraphQL requires
+auth), a server error or a repo-level error, the numbers it covered go through the REST
+path instead.
+"""
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from diff_reader import read_diff
+from github_client import GITHUB_API_URL, GitHubClient, RateLimitExceeded, github_client, github_time
+from github_fetch import GITHUB_FETCH_MAX_WORKERS, fetch_references
+from reference_store import ReferenceStore, reference_store
+
+logger = logging.getLogger(__name__)
+
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+# "graphql" (falling back to REST per failed batch) or "rest"
+GITHUB_FETCH_BACKEND = os.environ.get("GITHUB_FETCH_BACKEND", "graphql")
+# Aliased lookups per query; GitHub caps query cost, and 50 small nodes stays well inside it
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.environ.get("GITHUB_GRAPHQL_BATCH_SIZE", "50"))
+
+REFERENCE_FIELDS = """
+      __typename
+      ... on Issue { number title state url author { login } createdAt updatedAt closedAt }
+      ... on PullRequest { number title state url author { login } createdAt updatedAt closedAt }"""
+
+
+class GraphQLError(Exception):
+    pass
+
+
+def build_query(numbers: List[int]) -> str:
+    fields = "".join(f"\n    r{number}: issueOrPullRequest(number: {number}) {{{REFERENCE_FIELDS}\n    }}" for number in numbers)
+    return f"query($owner: String!, $name: String!) {{\n  repository(owner: $owner, name: $name) {{{fields}\n  }}\n}}"
+
+
+def iso(timestamp: Optional[str]) -> Optional[str]:
+    """GraphQL's `2024-08-01T00:00:00Z` in the `+00:00` form PyGithub's datetimes produce."""
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).isoformat() if timestamp else None
+
+
+def run_query(client: GitHubClient, query: str, variables: Dict[str, Any], token: Optional[str]) -> Tuple[Dict[str, Any], float]:
+    """The query's `repository` object and GitHub's time for the response."""
+    if not token:
+        raise GraphQLError("GraphQL needs a GITHUB_ACCESS_TOKEN")
+    response = client.post(GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables}, headers={"Authorization": f"bearer {token}"}, timeout=30)
+    if response.status_code != 200:
+        raise GraphQLError(f"GraphQL request failed with HTTP {response.status_code}")
+    payload = response.json()
+    repository = (payload.get("data") or {}).get("repository")
+    if repository is None:
+        raise GraphQLError(f"GraphQL query failed: {payload.get('errors')}")
+    # Per-alias NOT_FOUND errors just leave that alias null, like a 404 on the REST path
+    return repository, github_time(response.headers)
+
+
+def to_entry(node: Dict[str, Any], client: GitHubClient) -> Tuple[str, Dict[str, Any]]:
+    """Build the same ("issues" | "pull_requests", entry) pair as `github_fetch.fetch_reference`."""
+    common = {
+        "number": node["number"],
+        "title": node["title"],
+        # MERGED is a closed pull request as far as the REST API is concerned
+        "state": "closed" if node["state"] == "MERGED" else node["state"].lower(),
+        "author": (node.get("author") or {}).get("login", "ghost"),
+    }
+    if node["__typename"] == "PullRequest":
+        return "pull_requests", {**common, **read_diff(f"{node['url']}.diff", client), "created_at": iso(node["createdAt"])}
+    return "issues", {**common, "created_at": iso(node["createdAt"]), "closed_at": iso(node.get("closedAt"))}
+
+
+def fetch_references_graphql(
+    repo_name: str,
+    numbers: List[int],
+    token: Optional[str] = None,
+    batch_size: int = GITHUB_GRAPHQL_BATCH_SIZE,
+    max_workers: int = GITHUB_FETCH_MAX_WORKERS,
+    store: Optional[ReferenceStore] = reference_store,
+) -> Tuple[Dict[int, Optional[Tuple[str, Dict[str, Any]]]], List[int]]:
+    """Resolve `numbers` in batched queries; returns ({number: result or None}, numbers left unresolved).
+
+    A None result means GitHub has no such issue or PR. Unresolved numbers belong to
+    batches whose query failed.
+    """
+    owner, name = repo_name.split("/", 1)
+    unique_numbers = list(dict.fromkeys(numbers))
+    batches = [unique_numbers[start:start + batch_size] for start in range(0, len(unique_numbers), max(batch_size, 1))]
+    results: Dict[int, Optional[Tuple[str, Dict[str, Any]]]] = {}
+    failed: List[int] = []
+
+    def query(batch):
+        try:
+            return (batch, *run_query(github_client, build_query(batch), {"owner": owner, "name": name}, token))
+        except (GraphQLError, RateLimitExceeded, requests.RequestException, ValueError) as e:
+            logger.warning(f"GraphQL batch of {len(batch)} references failed, using REST for it: {e}")
+            return batch, None, None
+
+    def resolve(item):
+        number, node, checked_at = item
+        if node is None:
+            return number, None
+        updated_at = iso(node["updatedAt"])
+        if store is not None:
+            stored = store.get(repo_name, number, updated_at)
+            if stored is not None:
+                store.record_hits(1)
+                store.touch(repo_name, [number], checked_at)
+                return number, stored
+        result = to_entry(node, github_client)
+        if store is not None:
+            store.put(repo_name, number, updated_at, *result, fetched_at=checked_at)
+        return number, result
+
+    nodes = []
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        for batch, repository, checked_at in executor.map(query, batches):
+            if repository is None:
+                failed.extend(batch)
+            else:
+                nodes.extend((number, repository.get(f"r{number}"), checked_at) for number in batch)
+        for number, result in executor.map(resolve, nodes):
+            results[number] = result
+
+    logger.info(f"Resolved {len(results)} of {len(unique_numbers)} references in {len(batches)} GraphQL queries")
+    return results, failed
+
+
+def fetch_release_references(repo, numbers: List[int], token: Optional[str] = None, backend: str = GITHUB_FETCH_BACKEND, store: Optional[ReferenceStore] = reference_store) -> Dict[str, List[Dict[str, Any]]]:
+    """Issues and pull requests for `numbers`, in the shape and order `fetch_references` returns.
+
+    `repo` is the PyGithub repository, used by the REST fallback.
+    """
+    if backend != "graphql":
+        return fetch_references(repo, numbers, store=store)
+    results, failed = fetch_references_graphql(repo.full_name, numbers, token=token, store=store)
+    data: Dict[str, List[Dict[str, Any]]] = {"issues": [], "pull_requests": []}
+    if failed:
+        # The REST path returns its lists in the order given; regroup them by number
+        rest = fetch_references(repo, failed, store=store)
+        for kind, entries in rest.items():
+            for entry in entries:
+                results[entry["number"]] = kind, entry
+    for number in numbers:
+        result = results.get(number)
+        if result is not None:
+            kind, entry = result
+            data[kind].append(entry)
+    return data
@@ -0,0 +1,171 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from retrieval_cache import invalidate_collection
+
+logger = logging.getLogger(__name__)
+
+# Chunks embedded per request and written per Chroma `add`
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+
+
+def chroma_metadata(doc: Document) -> Dict[str, Any]:
+    """Chroma only accepts str/int/float/bool metadata values, so drop anything else."""
+    metadata = {key: value for key, value in doc.metadata.items() if isinstance(value, (str, int, float, bool))}
+    metadata['source'] = metadata.get('source', '')
+    return metadata
+
+
+def ingest_documents(collection, documents: List[Document], embeddings: Embeddings, batch_size: int = EMBEDDING_BATCH_SIZE, ids: Optional[List[str]] = None, upsert: bool = False) -> Dict[str, Any]:
+    """Embed `documents` in batches and add (or upsert) them to a Chroma collection in bulk.
+
+    One embedding request and one Chroma write per `batch_size` chunks instead of per chunk.
+    Returns throughput stats, which are also logged.
+    """
+    batch_size = max(batch_size, 1)
+    ids = ids or [str(uuid.uuid1()) for _ in documents]
+    embed_seconds = 0.0
+    write_seconds = 0.0
+    batches = 0
+    started = time.perf_counter()
+
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        texts = [doc.page_content for doc in batch]
+
+        embed_started = time.perf_counter()
+        vectors = embeddings.embed_documents(texts)
+        embed_seconds += time.perf_counter() - embed_started
+
+        write_started = time.perf_counter()
+        write = collection.upsert if upsert else collection.add
+        write(
+            ids=ids[start:start + batch_size],
+            embeddings=vectors,
+            metadatas=[chroma_metadata(doc) for doc in batch],
+            documents=texts
+        )
+        write_seconds += time.perf_counter() - write_started
+        batches += 1
+
+    if documents:
+        invalidate_collection(collection.name)
+
+    seconds = time.perf_counter() - started
+    stats = {
+        "collection": getattr(collection, "name", None),
+        "chunks": len(documents),
+        "batches": batches,
+        "batch_size": batch_size,
+        "seconds": round(seconds, 3),
+        "embed_seconds": round(embed_seconds, 3),
+        "write_seconds": round(write_seconds, 3),
+        "chunks_per_second": round(len(documents) / seconds, 1) if seconds else None,
+    }
+    logger.info(f"Ingested {stats['chunks']} chunks into {stats['collection']} in {stats['batches']} batches ({stats['chunks_per_second']} chunks/s)")
+    return stats
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_ids(source: str, hashes: List[str]) -> List[str]:
+    """Stable chunk IDs derived from the source URL and chunk content.
+
+    Identical chunks on the same page are told apart by their occurrence count, so an
+    unchanged chunk keeps its ID even when text is inserted above it.
+    """
+    seen: Dict[str, int] = defaultdict(int)
+    ids = []
+    for digest in hashes:
+        ids.append(hashlib.sha256(f"{source}\0{digest}\0{seen[digest]}".encode("utf-8")).hexdigest()[:32])
+        seen[digest] += 1
+    return ids
+
+
+def index_documents(collection, documents: List[Document], embeddings: Embeddings, urls: List[str], source_set: str, batch_size: int = EMBEDDING_BATCH_SIZE) -> Dict[str, Any]:
+    """Incrementally sync the chunks of `urls` into `collection`.
+
+    Chunks carry `source_set`, a `content_hash` and the `page_hash` of their URL. Pages
+    whose hash is unchanged are skipped outright; on changed pages only chunks with new
+    content are embedded and upserted, and chunks that disappeared are deleted. URLs that
+    were dropped from `urls` lose their chunks. A URL in `urls` that yielded no chunks
+    (for example because the fetch failed) keeps what is already indexed. Chunks indexed
+    before stable IDs existed (no `content_hash`) are replaced when their URL is re-indexed.
+    """
+    started = time.perf_counter()
+    by_source: Dict[str, List[Document]] = defaultdict(list)
+    for doc in documents:
+        by_source[doc.metadata.get('source', '')].append(doc)
+
+    existing = collection.get(include=["metadatas"])
+    owned: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+        metadata = metadata or {}
+        source = metadata.get('source', '')
+        if metadata.get('source_set') == source_set or ('content_hash' not in metadata and source in urls):
+            owned[source][chunk_id] = metadata
+
+    to_embed: List[Document] = []
+    to_embed_ids: List[str] = []
+    to_delete: List[str] = []
+    to_update_ids: List[str] = []
+    to_update_metadatas: List[Dict[str, Any]] = []
+    unchanged_pages = 0
+
+    for source, chunks in by_source.items():
+        hashes = [content_hash(doc.page_content) for doc in chunks]
+        page_hash = content_hash("".join(hashes))
+        current = owned.get(source, {})
+        if current and all(metadata.get('page_hash') == page_hash for metadata in current.values()):
+            unchanged_pages += 1
+            continue
+
+        ids = chunk_ids(source, hashes)
+        for chunk_id, digest, doc in zip(ids, hashes, chunks):
+            if chunk_id in current:
+                # Same content, only the page hash moves
+                to_update_ids.append(chunk_id)
+                to_update_metadatas.append({**current[chunk_id], 'page_hash': page_hash})
+            else:
+                metadata = {**doc.metadata, 'source_set': source_set, 'content_hash': digest, 'page_hash': page_hash}
+                to_embed.append(Document(page_content=doc.page_content, metadata=metadata))
+                to_embed_ids.append(chunk_id)
+        new_ids = set(ids)
+        to_delete.extend(chunk_id for chunk_id in current if chunk_id not in new_ids)
+
+    for source, chunks in owned.items():
+        if source not in urls:
+            to_delete.extend(chunks)
+        elif source not in by_source:
+            logger.warning(f"No content loaded for {source}, keeping its {len(chunks)} indexed chunks")
+
+    if to_embed:
+        ingest_documents(collection, to_embed, embeddings, batch_size=batch_size, ids=to_embed_ids, upsert=True)
+    if to_update_ids:
+        collection.update(ids=to_update_ids, metadatas=to_update_metadatas)
+    if to_delete:
+        collection.delete(ids=to_delete)
+    if to_update_ids or to_delete:
+        invalidate_collection(collection.name)
+
+    stats = {
+        "collection": getattr(collection, "name", None),
+        "pages": len(by_source),
+        "unchanged_pages": unchanged_pages,
+        "embedded": len(to_embed),
+        "kept": len(to_update_ids),
+        "deleted": len(to_delete),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Indexed {stats['collection']}: {stats}")
+    return stats
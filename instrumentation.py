@@ -0,0 +1,337 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+# Structured (one JSON object per line) run metrics go to this logger
+metrics_logger = logging.getLogger("lazypms.metrics")
+
+# USD per million (input, output) tokens; override with MODEL_PRICES='{"model": [in, out]}'
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-3-5-sonnet-20240620": (3.0, 15.0),
+    "accounts/fireworks/models/llama-v3p1-70b-instruct": (0.9, 0.9),
+    **{model: tuple(prices) for model, prices in json.loads(os.environ.get("MODEL_PRICES", "{}")).items()},
+}
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Events outside any graph node (e.g. an executor invoked directly) are filed under this name
+NO_NODE = "-"
+
+
+def token_usage(response: LLMResult) -> Tuple[int, int]:
+    """(input, output) tokens of an LLM response, whichever way the provider reports them."""
+    input_tokens = output_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                found = True
+    if found:
+        return input_tokens, output_tokens
+    llm_output = response.llm_output or {}
+    # Anthropic reports `usage`, OpenAI-style providers `token_usage`
+    usage = llm_output.get("usage") or llm_output.get("token_usage") or {}
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "__dict__", {})
+    return (
+        usage.get("input_tokens", usage.get("prompt_tokens", 0)) or 0,
+        usage.get("output_tokens", usage.get("completion_tokens", 0)) or 0,
+    )
+
+
+def llm_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    prices = MODEL_PRICES.get(model or "")
+    if not prices:
+        return 0.0
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+def new_node_metrics() -> Dict[str, Any]:
+    return {
+        "runs": 0,
+        "seconds": 0.0,
+        "llm_calls": 0,
+        "llm_seconds": 0.0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cost_usd": 0.0,
+        "tool_calls": defaultdict(int),
+        "tool_seconds": 0.0,
+        "retriever_calls": 0,
+        "retriever_seconds": 0.0,
+        "errors": 0,
+        "iterations": [],
+    }
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Collects latency, LLM, token, tool and retriever metrics per graph node.
+
+    Pass it as a callback when invoking a graph; LangGraph tags every nested run with the
+    node it belongs to (`langgraph_node` metadata), which is how events are attributed.
+    Each AgentExecutor step (LLM call(s) followed by a tool call, or the final answer) is
+    recorded as an iteration of its node.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = defaultdict(new_node_metrics)
+        self.started_at = time.time()
+        self._runs: Dict[UUID, Tuple[str, float, Optional[str]]] = {}
+        # Chain run -> node, so agent actions (which carry no metadata) can be attributed
+        self._chain_nodes: Dict[UUID, str] = {}
+        # Retriever runs in flight -> whether nested in another (wrappers like CachingRetriever
+        # and LazyRetriever emit a run per layer; only the outermost one is counted)
+        self._retriever_runs: Dict[UUID, bool] = {}
+        self._pending: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"llm_calls": 0, "llm_seconds": 0.0, "input_tokens": 0, "output_tokens": 0})
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]], label: Optional[str] = None) -> None:
+        node = (metadata or {}).get("langgraph_node", NO_NODE)
+        with self._lock:
+            self._runs[run_id] = (node, time.perf_counter(), label)
+
+    def _end(self, run_id: UUID) -> Tuple[str, float, Optional[str]]:
+        with self._lock:
+            node, started, label = self._runs.pop(run_id, (NO_NODE, time.perf_counter(), None))
+        return node, time.perf_counter() - started, label
+
+    # Graph nodes
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        # Only the node's own run carries the node's name; nested chains are skipped
+        node = (metadata or {}).get("langgraph_node")
+        if node is None:
+            return
+        with self._lock:
+            self._chain_nodes[run_id] = node
+        # LangGraph's own bookkeeping nodes (__start__) aren't worth reporting
+        if kwargs.get("name") == node and not node.startswith("__"):
+            self._start(run_id, metadata, "node")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        with self._lock:
+            self._chain_nodes.pop(run_id, None)
+        if run_id in self._runs:
+            node, seconds, _ = self._end(run_id)
+            with self._lock:
+                self.nodes[node]["runs"] += 1
+                self.nodes[node]["seconds"] += seconds
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._chain_nodes.pop(run_id, None)
+        if run_id in self._runs:
+            node, seconds, _ = self._end(run_id)
+            with self._lock:
+                self.nodes[node]["runs"] += 1
+                self.nodes[node]["seconds"] += seconds
+                self.nodes[node]["errors"] += 1
+
+    # LLM calls
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, invocation_params=None, **kwargs):
+        params = invocation_params or {}
+        self._start(run_id, metadata, params.get("model") or params.get("model_name"))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, invocation_params=None, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id, metadata=metadata, invocation_params=invocation_params)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        node, seconds, model = self._end(run_id)
+        input_tokens, output_tokens = token_usage(response)
+        model = model or (response.llm_output or {}).get("model")
+        with self._lock:
+            metrics = self.nodes[node]
+            metrics["llm_calls"] += 1
+            metrics["llm_seconds"] += seconds
+            metrics["input_tokens"] += input_tokens
+            metrics["output_tokens"] += output_tokens
+            metrics["cost_usd"] += llm_cost(model, input_tokens, output_tokens)
+            pending = self._pending[node]
+            pending["llm_calls"] += 1
+            pending["llm_seconds"] += seconds
+            pending["input_tokens"] += input_tokens
+            pending["output_tokens"] += output_tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        node, seconds, _ = self._end(run_id)
+        with self._lock:
+            self.nodes[node]["llm_calls"] += 1
+            self.nodes[node]["llm_seconds"] += seconds
+            self.nodes[node]["errors"] += 1
+
+    # Agent executor iterations
+    def _close_iteration(self, node: str, tool: Optional[str]) -> None:
+        with self._lock:
+            pending = self._pending.pop(node, None) or {"llm_calls": 0, "llm_seconds": 0.0, "input_tokens": 0, "output_tokens": 0}
+            self.nodes[node]["iterations"].append({**pending, "tool": tool, "tool_seconds": 0.0})
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        self._close_iteration(self._chain_nodes.get(run_id, NO_NODE), action.tool)
+
+    def on_agent_finish(self, finish, *, run_id, **kwargs):
+        self._close_iteration(self._chain_nodes.get(run_id, NO_NODE), None)
+
+    # Tools and retrievers
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata, (serialized or {}).get("name") or kwargs.get("name"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._record_tool(run_id, error=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._record_tool(run_id, error=True)
+
+    def _record_tool(self, run_id: UUID, error: bool) -> None:
+        node, seconds, tool = self._end(run_id)
+        with self._lock:
+            metrics = self.nodes[node]
+            metrics["tool_calls"][tool or "unknown"] += 1
+            metrics["tool_seconds"] += seconds
+            metrics["errors"] += int(error)
+            if metrics["iterations"] and metrics["iterations"][-1]["tool"] == tool:
+                metrics["iterations"][-1]["tool_seconds"] += seconds
+
+    def on_retriever_start(self, serialized, query, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        with self._lock:
+            nested = parent_run_id in self._retriever_runs
+            self._retriever_runs[run_id] = nested
+        if not nested:
+            self._start(run_id, metadata)
+
+    def _retriever_nested(self, run_id: UUID) -> bool:
+        with self._lock:
+            return self._retriever_runs.pop(run_id, False)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        if self._retriever_nested(run_id):
+            return
+        node, seconds, _ = self._end(run_id)
+        with self._lock:
+            self.nodes[node]["retriever_calls"] += 1
+            self.nodes[node]["retriever_seconds"] += seconds
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        if self._retriever_nested(run_id):
+            return
+        node, seconds, _ = self._end(run_id)
+        with self._lock:
+            self.nodes[node]["retriever_calls"] += 1
+            self.nodes[node]["retriever_seconds"] += seconds
+            self.nodes[node]["errors"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Plain-dict metrics for `process_metrics`: per node, plus totals."""
+        with self._lock:
+            nodes = {}
+            for node, metrics in self.nodes.items():
+                nodes[node] = {
+                    **metrics,
+                    "seconds": round(metrics["seconds"], 3),
+                    "llm_seconds": round(metrics["llm_seconds"], 3),
+                    "tool_seconds": round(metrics["tool_seconds"], 3),
+                    "retriever_seconds": round(metrics["retriever_seconds"], 3),
+                    "cost_usd": round(metrics["cost_usd"], 6),
+                    "tool_calls": dict(metrics["tool_calls"]),
+                    "iterations": [
+                        {**iteration, "llm_seconds": round(iteration["llm_seconds"], 3), "tool_seconds": round(iteration["tool_seconds"], 3)}
+                        for iteration in metrics["iterations"]
+                    ],
+                }
+        totals = {
+            key: sum(metrics[key] for metrics in nodes.values())
+            for key in ("llm_calls", "input_tokens", "output_tokens", "retriever_calls", "errors")
+        }
+        totals["tool_calls"] = sum(sum(metrics["tool_calls"].values()) for metrics in nodes.values())
+        totals["cost_usd"] = round(sum(metrics["cost_usd"] for metrics in nodes.values()), 6)
+        totals["seconds"] = round(time.time() - self.started_at, 3)
+        return {"nodes": nodes, "totals": totals}
+
+
+class MetricsRegistry:
+    """Process-wide counters over all instrumented runs, rendered in Prometheus text format."""
+
+    COUNTERS = {
+        "runs": "Graph node runs",
+        "seconds": "Wall time spent in graph nodes",
+        "llm_calls": "LLM calls",
+        "llm_seconds": "Time spent waiting on LLM calls",
+        "input_tokens": "LLM input tokens",
+        "output_tokens": "LLM output tokens",
+        "cost_usd": "Estimated LLM cost in USD",
+        "tool_seconds": "Time spent in tool calls",
+        "retriever_calls": "Retriever queries",
+        "retriever_seconds": "Time spent in retriever queries",
+        "errors": "Errors raised in LLM, tool or node runs",
+    }
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            for node, metrics in summary["nodes"].items():
+                for key in self.COUNTERS:
+                    self._values[(key, (("node", node),))] += metrics[key]
+                for tool, calls in metrics["tool_calls"].items():
+                    self._values[("tool_calls", (("node", node), ("tool", tool)))] += calls
+
+    def render(self) -> str:
+        with self._lock:
+            values = dict(self._values)
+        descriptions = {**self.COUNTERS, "tool_calls": "Tool calls"}
+        lines = []
+        for key, description in descriptions.items():
+            name = f"lazypms_node_{key}_total"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(values.items()):
+                if metric == key:
+                    label_text = ",".join(f'{label}="{value_}"' for label, value_ in labels)
+                    lines.append(f"{name}{{{label_text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def record_run(summary: Dict[str, Any], **fields: Any) -> None:
+    """Add a run's metrics to the registry and log them as one JSON line."""
+    registry.record(summary)
+    metrics_logger.info(json.dumps({"event": "graph_run", **fields, **summary}, default=str))
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve `registry` at /metrics in a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
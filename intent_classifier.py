@@ -0,0 +1,149 @@
+"""Local intent routing for incoming Slack messages, ahead of any LLM call.
+
+Compiled regexes pick out strong release-notes phrases ("release notes", "changelog",
+"what's new"), request cues ("can you", "write", "generate"), weaker release vocabulary
+("update", "version", "v0.2") and release IDs (`release_parsing`). Obvious requests and
+obvious chatter are decided here. Anything in between is "uncertain": agent1 (or, when
+`INTENT_KNN=1`, a nearest-neighbour vote over embedded labelled examples) decides it.
+"""
+import os
+import re
+import json
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from release_parsing import find_release_ids
+
+logger = logging.getLogger(__name__)
+
+RELEASE_NOTES = "release_notes"
+OTHER = "other"
+UNCERTAIN = "uncertain"
+
+INTENT_KNN = os.environ.get("INTENT_KNN", "0").lower() in ("1", "true", "yes")
+INTENT_EXAMPLES_PATH = os.environ.get("INTENT_EXAMPLES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_examples.jsonl"))
+INTENT_KNN_K = int(os.environ.get("INTENT_KNN_K", "5"))
+# Share of the k neighbours' similarity that must agree before the vote counts
+INTENT_KNN_THRESHOLD = float(os.environ.get("INTENT_KNN_THRESHOLD", "0.7"))
+
+
+def compile_words(*patterns: str) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(patterns) + r")\b", re.IGNORECASE)
+
+
+STRONG_PATTERN = compile_words(
+    r"release[\s-]?notes?", r"change[\s-]?logs?", r"patch[\s-]?notes", r"what'?s\s+new", r"what\s+changed",
+    r"new\s+features", r"notes\s+for",
+)
+REQUEST_PATTERN = compile_words(
+    r"please", r"pls", r"can\s+(?:you|we|i)", r"could\s+you", r"would\s+you", r"any\s+chance", r"need", r"i'?d\s+like",
+    r"give\s+me", r"tell\s+me", r"write", r"generate", r"draft", r"create", r"prepare", r"put\s+together", r"summari[sz]e",
+    r"suggest", r"rewrite", r"improve", r"list", r"announce",
+)
+WEAK_PATTERN = compile_words(r"release[sd]?", r"update", r"version", r"shipped", r"v?\d+\.\d+(?:\.\d+)?", r"tag")
+# Reading or discussing notes rather than asking for them
+DECLINE_PATTERN = compile_words(r"thanks", r"thank\s+you", r"look\s+great", r"just\s+want\s+to\s+read", r"broke", r"failing", r"bump")
+
+
+@dataclass
+class Intent:
+    label: str
+    source: str = "rules"
+    release_ids: List[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def confident(self) -> bool:
+        return self.label != UNCERTAIN
+
+
+def classify_rules(text: str) -> Intent:
+    release_ids = find_release_ids(text)
+    strong = STRONG_PATTERN.search(text)
+    request = REQUEST_PATTERN.search(text)
+    weak = WEAK_PATTERN.search(text)
+    decline = DECLINE_PATTERN.search(text)
+
+    if decline:
+        if strong or release_ids:
+            return Intent(UNCERTAIN, release_ids=release_ids, reason=f"release terms but also {decline.group(0)!r}")
+        return Intent(OTHER, reason=f"{decline.group(0)!r}")
+    if (strong or release_ids) and request:
+        return Intent(RELEASE_NOTES, release_ids=release_ids, reason=f"{(strong or request).group(0)!r} with a request")
+    if strong or release_ids:
+        return Intent(UNCERTAIN, release_ids=release_ids, reason="release terms without a request")
+    if weak and request:
+        return Intent(UNCERTAIN, reason=f"{weak.group(0)!r} with a request")
+    return Intent(OTHER, reason="no release terms")
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def load_examples(path: str = INTENT_EXAMPLES_PATH) -> List[Tuple[str, str]]:
+    with open(path, "r") as file:
+        return [(item["text"], item["label"]) for item in map(json.loads, filter(str.strip, file))]
+
+
+class NearestNeighbourIntent:
+    """Similarity-weighted k-nearest-neighbour vote over embedded, labelled examples."""
+
+    def __init__(self, embeddings, examples: List[Tuple[str, str]], k: int = INTENT_KNN_K, threshold: float = INTENT_KNN_THRESHOLD):
+        self.embeddings = embeddings
+        self.labels = [label for _, label in examples]
+        self.vectors = embeddings.embed_documents([text for text, _ in examples])
+        self.k = k
+        self.threshold = threshold
+
+    def classify(self, text: str) -> Intent:
+        query = self.embeddings.embed_query(text)
+        neighbours = sorted(((cosine(query, vector), label) for vector, label in zip(self.vectors, self.labels)), reverse=True)[:self.k]
+        votes = {}
+        for similarity, label in neighbours:
+            votes[label] = votes.get(label, 0.0) + max(similarity, 0.0)
+        total = sum(votes.values())
+        if not total:
+            return Intent(UNCERTAIN, source="knn", reason="no similar examples")
+        label, weight = max(votes.items(), key=lambda item: item[1])
+        share = weight / total
+        if share < self.threshold:
+            return Intent(UNCERTAIN, source="knn", reason=f"{label} with only {share:.2f} of the vote")
+        return Intent(label, source="knn", reason=f"{share:.2f} of {len(neighbours)} neighbours")
+
+
+class IntentClassifier:
+    def __init__(self, knn: Optional[NearestNeighbourIntent] = None):
+        self.knn = knn
+
+    def classify(self, text: str) -> Intent:
+        intent = classify_rules(text or "")
+        if intent.confident or self.knn is None:
+            return intent
+        fallback = self.knn.classify(text)
+        fallback.release_ids = intent.release_ids
+        return fallback if fallback.confident else intent
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_classifier() -> IntentClassifier:
+    """The shared classifier; with INTENT_KNN=1 it embeds the labelled examples on first use."""
+    global _classifier
+    if _classifier is None:
+        knn = None
+        if INTENT_KNN:
+            from context import get_embeddings
+
+            knn = NearestNeighbourIntent(get_embeddings(), load_examples())
+        _classifier = IntentClassifier(knn)
+    return _classifier
+
+
+def classify(text: str) -> Intent:
+    return get_classifier().classify(text)
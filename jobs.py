@@ -0,0 +1,149 @@
+import os
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Release-note jobs running at once, and jobs allowed to wait behind them
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "20"))
+# Finished jobs kept around so follow-up actions can find their results
+JOB_HISTORY = int(os.environ.get("JOB_HISTORY", "500"))
+
+
+class JobKey(NamedTuple):
+    user: str
+    channel: str
+    release: str
+
+
+@dataclass
+class Job:
+    key: JobKey
+    payload: Dict[str, Any] = field(default_factory=dict)
+    # Called with a short progress message; slackbot posts these to the request's thread
+    notify: Callable[[str], None] = lambda message: None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued -> running -> done | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: List[str] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def report(self, message: str) -> None:
+        self.progress.append(message)
+        try:
+            self.notify(message)
+        except Exception as e:
+            logger.warning(f"Could not report progress for job {self.id}: {e}")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """Bounded queue of jobs drained by a fixed pool of worker threads.
+
+    At most one job per key (user, channel, release) is queued or running at a time;
+    submitting the same key again returns the job already in flight. `runner(job)` does
+    the work and its return value becomes `job.result`.
+    """
+
+    def __init__(self, runner: Callable[[Job], Any], workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_SIZE, history: int = JOB_HISTORY):
+        self.runner = runner
+        self.workers = max(workers, 1)
+        self.history = history
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max(max_queued, 1))
+        self._jobs: "OrderedDict[JobKey, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "JobQueue":
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, key: JobKey, payload: Optional[Dict[str, Any]] = None, notify: Optional[Callable[[str], None]] = None) -> Job:
+        """Queue a job for `key`, or return the one already queued or running.
+
+        Raises JobQueueFull when the queue has no room; never blocks the caller.
+        """
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and current.active:
+                return current
+            job = Job(key=key, payload=payload or {}, notify=notify or (lambda message: None))
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFull(f"{self._queue.maxsize} jobs already waiting")
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._trim()
+        logger.info(f"Queued job {job.id} for {key} ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, key: JobKey) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _trim(self) -> None:
+        finished = [key for key, job in self._jobs.items() if not job.active]
+        for key in finished[:max(len(self._jobs) - self.history, 0)]:
+            del self._jobs[key]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = self.runner(job)
+                job.status = "done"
+            except Exception as e:
+                logger.exception(f"Job {job.id} for {job.key} failed")
+                job.error = str(e)
+                job.status = "failed"
+                job.report(f"Sorry, something went wrong: {e}")
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+            logger.info(f"Job {job.id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": len(self._threads),
+            "waiting": self._queue.qsize(),
+            **{status: statuses.count(status) for status in ("queued", "running", "done", "failed")},
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Let queued jobs finish, then stop the workers."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
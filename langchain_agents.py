@@ -5,9 +5,15 @@ from typing import Dict, Tuple, Any
 from dotenv import load_dotenv
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_anthropic import ChatAnthropic
-from tools import slack_api_tool, github_data_tool, github_analyzer_tool, human_feedback_interface, process_analytics_optimizer, exception_handler_model_updater
-from context import slack_communication_guidelines, audience_specific_examples, release_notes_best_practices, internal_review_guidelines, system_architecture_docs
+from slack_sdk import WebClient
+from tools import slack_api_tool, github_release_data_tool, release_summary_scorer, human_feedback_interface, process_analytics_optimizer, exception_handler_model_updater
+from context import slack_communication_guidelines, audience_specific_examples, release_notes_best_practices_tool, internal_review_guidelines, system_architecture_docs
 from prompts import agent1_prompt, agent2_prompt, agent3_prompt, agent4_prompt, agent5_prompt
+from llm_cache import get_llm_cache
+from scheduler import build_dag, load_agents, run_dag
+from slack_events import SlackEventIngestor
+from slack_distribution import distribute
+from intent_classifier import OTHER, RELEASE_NOTES, classify
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -20,6 +26,11 @@ load_dotenv()
 class Config:
     RELEASE_NOTE_KEYWORDS = ["release notes", "changelog", "update", "new features"]
     SLACK_RATE_LIMIT = 1  # seconds
+    # Channels to catch up on after a restart (comma-separated IDs); live events cover all channels
+    SLACK_CHANNELS = [channel for channel in os.environ.get("SLACK_CHANNELS", "").split(",") if channel]
+    # Channels the finished notes are posted to (comma-separated IDs); defaults to SLACK_CHANNELS
+    RELEASE_NOTES_CHANNELS = [channel for channel in os.environ.get("RELEASE_NOTES_CHANNELS", "").split(",") if channel] or SLACK_CHANNELS
+    MAX_CONCURRENT_REQUESTS = int(os.environ.get("MAX_CONCURRENT_REQUESTS", "4"))
     GITHUB_RATE_LIMIT = 1  # seconds
     REQUIRED_ENV_VARS = ['anth_apikey', 'SLACK_API_TOKEN', 'GITHUB_API_TOKEN']
 
@@ -32,12 +43,13 @@ validate_env_vars()
 
 # Initialize the language model
 anth_api_key = os.environ['anth_apikey']
-llm = ChatAnthropic(temperature=0.3, anthropic_api_key=anth_api_key, model='claude-3-opus-20240229')
+llm = ChatAnthropic(temperature=0.3, anthropic_api_key=anth_api_key, model='claude-3-opus-20240229', cache=get_llm_cache())
+slack_client = WebClient(token=os.environ['SLACK_API_TOKEN'])
 
 # Define tools for each agent
 agent1_tools = [slack_api_tool, slack_communication_guidelines]
-agent2_tools = [github_data_tool]
-agent3_tools = [github_analyzer_tool, audience_specific_examples, release_notes_best_practices]
+agent2_tools = [github_release_data_tool]
+agent3_tools = [release_summary_scorer, audience_specific_examples, release_notes_best_practices_tool]
 agent4_tools = [human_feedback_interface, internal_review_guidelines]
 agent5_tools = [process_analytics_optimizer, exception_handler_model_updater, system_architecture_docs]
 
@@ -56,6 +68,9 @@ agent4_executor = AgentExecutor(agent=agent4, tools=agent4_tools, verbose=True,
 agent5_executor = AgentExecutor(agent=agent5, tools=agent5_tools, verbose=True, handle_parsing_errors=True)
 
 async def process_slack_message(message: str) -> str:
+    if classify(message).label == RELEASE_NOTES:
+        # An obvious request needs no parsing by agent1's LLM
+        return message
     try:
         input_data = {"input": message}
         output = await agent1_executor.ainvoke(input_data)
@@ -104,30 +119,66 @@ async def process_management_optimization_agent(input_data: str) -> str:
         logger.error(f"Error in process_management_optimization_agent: {str(e)}")
         return f"An error occurred: {str(e)}"
 
+async def distribute_release_notes(final_release_notes: str) -> dict:
+    """Post the reviewed notes to Config.RELEASE_NOTES_CHANNELS; the Slack calls run on worker threads."""
+    if not final_release_notes:
+        raise ValueError("No release notes to distribute")
+    return await asyncio.to_thread(distribute, slack_client, Config.RELEASE_NOTES_CHANNELS, final_release_notes)
+
 def is_release_note_query(message: str) -> bool:
-    return any(keyword in message.lower() for keyword in Config.RELEASE_NOTE_KEYWORDS)
+    # Local intent classifier; uncertain messages go on to agent1
+    return classify(message).label != OTHER
+
+# One runner per stage of the agents.json DAG; each gets its dependencies' outputs by stage name
+STAGE_RUNNERS = {
+    "agent1": lambda inputs: process_slack_message(inputs["input"]),
+    "agent2": lambda inputs: github_data_retrieval_agent(inputs["agent1"]),
+    "agent3": lambda inputs: data_analysis_and_content_generation_agent(inputs["agent2"]),
+    "agent4": lambda inputs: human_interaction_and_feedback_agent(inputs["agent3"]),
+    # Distribution and process optimization both only need agent4's output, so they run side by side
+    "agent1_from_agent4": lambda inputs: distribute_release_notes(inputs["agent4"][0]),
+    "agent5": lambda inputs: process_management_optimization_agent(inputs["agent4"][1]),
+}
+
+agent_stages = build_dag(load_agents())
 
 async def process_message(message: str):
     try:
-        parsed_request = await process_slack_message(message)
-        github_data = await github_data_retrieval_agent(parsed_request)
-        generated_content = await data_analysis_and_content_generation_agent(github_data)
-        final_release_notes, process_feedback = await human_interaction_and_feedback_agent(generated_content)
-        await slack_api_tool.send_message(final_release_notes)
-        optimization_result = await process_management_optimization_agent(process_feedback)
-        logger.info(f"Process improvements and model updates: {optimization_result}")
+        run = await run_dag(agent_stages, STAGE_RUNNERS, message)
+        distribution = run['results']['agent1_from_agent4']
+        logger.info(f"Release notes distribution: {distribution.output if distribution.status == 'done' else distribution.error}")
+        logger.info(f"Process improvements and model updates: {run['results']['agent5'].output}")
+        logger.info(f"Stage timings: {run['report']}")
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}")
 
 async def monitor_slack_channel():
-    while True:
+    """Consume Slack messages as Socket Mode delivers them and run release-note requests.
+
+    Requests run concurrently, at most `Config.MAX_CONCURRENT_REQUESTS` at a time. While
+    they are all busy, the ingestor's bounded queue absorbs new messages.
+    """
+    ingestor = SlackEventIngestor().bind()
+    ingestor.start_socket_mode(channels=Config.SLACK_CHANNELS)
+    semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+    running = set()
+
+    async def handle(message):
         try:
-            new_messages = await slack_api_tool.get_new_messages()
-            tasks = [process_message(message) for message in new_messages if is_release_note_query(message)]
-            await asyncio.gather(*tasks)
-        except Exception as e:
-            logger.error(f"Error in monitor_slack_channel: {str(e)}")
-        await asyncio.sleep(Config.SLACK_RATE_LIMIT)
+            await process_message(message.text)
+        finally:
+            semaphore.release()
+
+    try:
+        async for message in ingestor.messages():
+            if not is_release_note_query(message.text):
+                continue
+            await semaphore.acquire()
+            task = asyncio.ensure_future(handle(message))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        ingestor.flush()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+# Opt-in: replaying cached completions is for prompt iteration, not production runs
+LLM_CACHE = os.environ.get("LLM_CACHE", "0").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(LAZYPMS_CACHE_DIR, "llm.sqlite"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Skip lookups but keep storing fresh responses, e.g. to refresh the cache after a model update
+LLM_CACHE_BYPASS = os.environ.get("LLM_CACHE_BYPASS", "0").lower() in ("1", "true", "yes")
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class TTLSQLiteCache(BaseCache):
+    """Persistent LLM response cache with a TTL and an entry limit.
+
+    LangChain calls it with the serialized prompt (for agent executors that includes the
+    whole tool transcript so far) and the model's `llm_string` (model name, temperature,
+    stop sequences and other call parameters), so a response is only replayed for an
+    identical call. Least recently used entries are evicted past `max_entries`.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES, bypass: bool = LLM_CACHE_BYPASS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    generations TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_used_at ON llm_cache (used_at)")
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.bypass:
+            return None
+        key = cache_key(prompt, llm_string)
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT generations, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self._count(hit=False)
+                return None
+            with conn:
+                conn.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+        try:
+            generations = [loads(item) for item in json.loads(row[0])]
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Unreadable LLM cache entry {key}: {e}")
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, generations, created_at, used_at) VALUES (?, ?, ?, ?)",
+                    (cache_key(prompt, llm_string), json.dumps([dumps(generation) for generation in return_val]), now, now),
+                )
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self, **kwargs: Any) -> None:
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with closing(self._connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+_cache: Optional[TTLSQLiteCache] = None
+
+
+def get_llm_cache() -> Optional[TTLSQLiteCache]:
+    """The shared response cache when LLM_CACHE is on, else None (the model's default: no cache)."""
+    global _cache
+    if not LLM_CACHE:
+        return None
+    if _cache is None:
+        _cache = TTLSQLiteCache()
+        logger.info(f"LLM response cache enabled at {_cache.path}")
+    return _cache
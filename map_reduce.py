@@ -0,0 +1,112 @@
+import os
+import re
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.output_parsers import StrOutputParser
+
+from compaction import summarize_pull_request
+from prompts import pr_group_summary_prompt
+
+logger = logging.getLogger(__name__)
+
+# "auto" uses map-reduce for releases with at least MAP_REDUCE_MIN_ITEMS PRs and issues
+GENERATION_MODE = os.environ.get("GENERATION_MODE", "auto")
+MAP_REDUCE_MIN_ITEMS = int(os.environ.get("MAP_REDUCE_MIN_ITEMS", "12"))
+# PRs and issues per map call, and map calls in flight at once
+MAP_REDUCE_GROUP_SIZE = int(os.environ.get("MAP_REDUCE_GROUP_SIZE", "6"))
+MAP_REDUCE_CONCURRENCY = int(os.environ.get("MAP_REDUCE_CONCURRENCY", "8"))
+
+# Conventional-commit style scopes used in langchain PR titles: "openai[patch]: ...", "core: ..."
+SCOPE_PATTERN = re.compile(r"^\s*([A-Za-z][\w-]*)(?:\[[^\]]*\])?\s*(?:,[^:]*)?:")
+REFERENCE_PATTERN = re.compile(r"#(\d+)")
+
+
+def parse_release_data(github_data: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(github_data)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) and "error" not in data else None
+
+
+def use_map_reduce(data: Optional[Dict[str, Any]], mode: str = GENERATION_MODE, min_items: int = MAP_REDUCE_MIN_ITEMS) -> bool:
+    if data is None or mode == "single":
+        return False
+    items = len(data.get("pull_requests", [])) + len(data.get("issues", []))
+    return mode == "map_reduce" or items >= min_items
+
+
+def pr_scope(pr: Dict[str, Any]) -> str:
+    match = SCOPE_PATTERN.match(pr.get("title") or "")
+    return match.group(1).lower() if match else "other"
+
+
+def group_references(data: Dict[str, Any], group_size: int = MAP_REDUCE_GROUP_SIZE) -> List[Dict[str, Any]]:
+    """Split a release's PRs and issues into small groups of related items.
+
+    PRs are grouped by the scope in their title; an issue joins the group of the first PR
+    that mentions it. Groups larger than `group_size` are split, keeping release order.
+    """
+    groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    issue_scope: Dict[str, str] = {}
+    for pr in data.get("pull_requests", []):
+        scope = pr_scope(pr)
+        groups.setdefault(scope, []).append({"kind": "pull_request", **pr})
+        for number in REFERENCE_PATTERN.findall(f"{pr.get('title', '')} {pr.get('body') or ''}"):
+            issue_scope.setdefault(number, scope)
+    for issue in data.get("issues", []):
+        scope = issue_scope.get(str(issue.get("number")), "issues")
+        groups.setdefault(scope, []).append({"kind": "issue", **issue})
+
+    chunks = []
+    size = max(group_size, 1)
+    for scope, items in groups.items():
+        parts = [items[start:start + size] for start in range(0, len(items), size)]
+        for index, part in enumerate(parts, 1):
+            chunks.append({"name": scope if len(parts) == 1 else f"{scope} ({index}/{len(parts)})", "items": part})
+    return chunks
+
+
+def render_items(items: List[Dict[str, Any]]) -> str:
+    lines = []
+    for item in items:
+        if item["kind"] == "pull_request" and "diff" in item:
+            # Uncompacted release data: summarize raw diffs so each map prompt stays small
+            item = {"kind": "pull_request", **summarize_pull_request(item, "", with_symbols=True, max_files=20)}
+        lines.append(json.dumps(item, separators=(",", ":"), ensure_ascii=False, default=str))
+    return "\n".join(lines)
+
+
+def map_inputs(data: Dict[str, Any], groups: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    return [{"release_title": data.get("release_title") or "", "group_name": group["name"], "items": render_items(group["items"])} for group in groups]
+
+
+def reduce_input(data: Dict[str, Any], groups: List[Dict[str, Any]], summaries: List[str]) -> str:
+    """Input for the generation agent: the release header plus one partial summary per group."""
+    sections = [f"## {group['name']}\n{summary.strip()}" for group, summary in zip(groups, summaries)]
+    return (
+        f"Release: {data.get('release_title') or ''}\n\n"
+        f"Release body:\n{data.get('release_body') or ''}\n\n"
+        f"The changes below were summarized area by area. Merge them into audience-specific release notes.\n\n"
+        + "\n\n".join(sections)
+    )
+
+
+def summarize_groups(llm, data: Dict[str, Any], concurrency: int = MAP_REDUCE_CONCURRENCY) -> str:
+    """Map: summarize every group in parallel with `llm`, then return the reduce input."""
+    groups = group_references(data)
+    chain = pr_group_summary_prompt | llm | StrOutputParser()
+    summaries = chain.batch(map_inputs(data, groups), config={"max_concurrency": max(concurrency, 1)})
+    logger.info(f"Summarized {len(groups)} groups of {data.get('release_title')}")
+    return reduce_input(data, groups, summaries)
+
+
+async def asummarize_groups(llm, data: Dict[str, Any], concurrency: int = MAP_REDUCE_CONCURRENCY) -> str:
+    groups = group_references(data)
+    chain = pr_group_summary_prompt | llm | StrOutputParser()
+    summaries = await chain.abatch(map_inputs(data, groups), config={"max_concurrency": max(concurrency, 1)})
+    logger.info(f"Summarized {len(groups)} groups of {data.get('release_title')}")
+    return reduce_input(data, groups, summaries)
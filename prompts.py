@@ -210,3 +210,21 @@ messages = [    SystemMessagePromptTemplate(prompt=PromptTemplate(input_variable
                 HumanMessagePromptTemplate(prompt=PromptTemplate(input_variables=['tool_names', 'tools', 'agent_scratchpad', 'input',], template=react_prompt))]
 agent5_prompt = ChatPromptTemplate.from_messages(messages)
 
+
+
+
+# Map step of map-reduce generation: one small call per group of related PRs and issues
+pr_group_summary_prompt = """You are summarizing one slice of a GitHub release for a release-notes writer.
+
+Release: {release_title}
+Area: {group_name}
+
+Below are the pull requests and issues in this area, as JSON lines. Summarize them in at most 8 short bullet points covering:
+- New features and improvements, with the user-visible API or behaviour they change
+- Bug fixes, naming the issue they resolve
+- Breaking changes, deprecations and dependency bumps
+Keep PR and issue numbers (e.g. #25123) next to each point. Skip chores like version bumps and CI unless they affect users. Do not add anything that isn't in the input."""
+
+messages = [    SystemMessagePromptTemplate(prompt=PromptTemplate(input_variables=['release_title', 'group_name'], template=pr_group_summary_prompt)),
+                HumanMessagePromptTemplate(prompt=PromptTemplate(input_variables=['items'], template="{items}"))]
+pr_group_summary_prompt = ChatPromptTemplate.from_messages(messages)
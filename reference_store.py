@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+REFERENCE_STORE_PATH = os.environ.get("REFERENCE_STORE_PATH", os.path.join(LAZYPMS_CACHE_DIR, "references.sqlite"))
+
+
+class ReferenceStore:
+    """Persistent store of fetched issues and pull requests keyed by (repo, number, updated_at).
+
+    An entry is only ever reused for the exact `updated_at` it was fetched at, so a PR that
+    was edited since gets refetched (diff included) while untouched references shared by
+    consecutive releases are served from disk. Only the newest version of each number is
+    kept. `fetched_at` is when GitHub (by its own clock) last confirmed the stored version
+    is current; `touch` moves it forward without rewriting the entry. Each operation opens
+    its own connection, so the store can be shared by threads and by several processes
+    pointed at the same file.
+    """
+
+    def __init__(self, path: str = REFERENCE_STORE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS refs (
+                    repo TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    entry TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (repo, number, updated_at)
+                )"""
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, repo: str, number: int, updated_at: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (kind, entry) if this exact version of the reference has been stored."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT kind, entry FROM refs WHERE repo = ? AND number = ? AND updated_at = ?",
+                (repo, number, updated_at),
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def latest(self, repo: str, numbers: Iterable[int]) -> Dict[int, Tuple[str, str, Dict[str, Any], float]]:
+        """Return {number: (updated_at, kind, entry, fetched_at)} for every stored number."""
+        numbers = list(numbers)
+        found = {}
+        with closing(self._connect()) as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(numbers), 500):
+                batch = numbers[start:start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = conn.execute(
+                    f"SELECT number, updated_at, kind, entry, fetched_at FROM refs WHERE repo = ? AND number IN ({placeholders})",
+                    (repo, *batch),
+                ).fetchall()
+                for number, updated_at, kind, entry, fetched_at in rows:
+                    found[number] = (updated_at, kind, json.loads(entry), fetched_at)
+        return found
+
+    def put(self, repo: str, number: int, updated_at: str, kind: str, entry: Dict[str, Any], fetched_at: Optional[float] = None) -> None:
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM refs WHERE repo = ? AND number = ? AND updated_at != ?", (repo, number, updated_at))
+                conn.execute(
+                    "INSERT OR REPLACE INTO refs (repo, number, updated_at, kind, entry, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (repo, number, updated_at, kind, json.dumps(entry), fetched_at if fetched_at is not None else time.time()),
+                )
+
+    def touch(self, repo: str, numbers: Iterable[int], checked_at: float) -> None:
+        """Record that the stored versions of `numbers` were still current at `checked_at`."""
+        numbers = list(numbers)
+        with closing(self._connect()) as conn:
+            with conn:
+                for start in range(0, len(numbers), 500):
+                    batch = numbers[start:start + 500]
+                    placeholders = ",".join("?" for _ in batch)
+                    conn.execute(
+                        f"UPDATE refs SET fetched_at = MAX(fetched_at, ?) WHERE repo = ? AND number IN ({placeholders})",
+                        (checked_at, repo, *batch),
+                    )
+
+    def record_hits(self, count: int) -> None:
+        with self._lock:
+            self.hits += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+reference_store = ReferenceStore()
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shared by every process pointed at the same directory (Slack bot, LangGraph server, ...)
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+RELEASE_CACHE_DIR = os.environ.get("RELEASE_CACHE_DIR", os.path.join(LAZYPMS_CACHE_DIR, "releases"))
+RELEASE_CACHE_TTL = float(os.environ.get("RELEASE_CACHE_TTL", str(6 * 60 * 60)))
+RELEASE_CACHE_MAX_BYTES = int(os.environ.get("RELEASE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    data: str
+    etag: Optional[str]
+    stored_at: float
+    ttl: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+
+class ReleaseCache:
+    """On-disk release data cache keyed by the sha256 of (repo, release_id).
+
+    Entries are written to a temp file and renamed into place, so concurrent readers in
+    other processes never see a partial file. Fresh entries are served as-is; stale ones
+    carry the release ETag so the caller can revalidate them with a conditional request
+    instead of refetching. The directory is kept under `max_bytes` by evicting the least
+    recently used entries (recency is tracked through file mtimes, which every hit bumps).
+    """
+
+    def __init__(self, directory: str = RELEASE_CACHE_DIR, ttl: float = RELEASE_CACHE_TTL, max_bytes: int = RELEASE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(repo_name: str, release_id: str) -> str:
+        return hashlib.sha256(f"{repo_name}\0{release_id}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for `key` (fresh or stale), or None. Only fresh entries count as hits."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as file:
+                record = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        entry = CacheEntry(key=key, data=record["data"], etag=record.get("etag"), stored_at=record["stored_at"], ttl=self.ttl)
+        with self._lock:
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._touch_file(path)
+        return entry
+
+    def put(self, key: str, data: str, etag: Optional[str] = None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        record = {"data": data, "etag": etag, "stored_at": time.time()}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(record, file)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def revalidated(self, entry: CacheEntry) -> None:
+        """Record that GitHub answered 304 for a stale entry, restarting its TTL."""
+        with self._lock:
+            # get() already counted the stale lookup as a miss
+            self.revalidations += 1
+            self.misses -= 1
+            self.hits += 1
+        self.put(entry.key, entry.data, entry.etag)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the directory fits in `max_bytes`."""
+        files = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                logger.info(f"Evicted release cache entry {path}")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    @staticmethod
+    def _touch_file(path: str) -> None:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+release_cache = ReleaseCache()
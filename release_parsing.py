@@ -0,0 +1,33 @@
+import re
+import json
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Release tags as the langchain monorepo names them: `<package>==<version>`, e.g.
+# langchain-openai==0.1.21, langchain-core==0.2.29rc1, langchain==0.2.14.post1
+RELEASE_ID_PATTERN = re.compile(
+    r"(?<![\w.-])([A-Za-z][A-Za-z0-9_.-]*==\d+(?:\.\d+)*(?:(?:a|b|rc|\.post|\.dev)\d+)*)(?![\w-])"
+)
+RELEASE_ID_JSON_PATTERN = re.compile(r'"release_id"\s*:\s*"([^"]+)"')
+
+
+def find_release_ids(text: str) -> List[str]:
+    """Every distinct release ID mentioned in `text`, in order of appearance."""
+    found = [match.group(1).rstrip(".") for match in RELEASE_ID_JSON_PATTERN.finditer(text or "")]
+    found += [match.group(1).rstrip(".") for match in RELEASE_ID_PATTERN.finditer(text or "")]
+    return list(dict.fromkeys(found))
+
+
+def extract_release_id(text: str) -> Optional[str]:
+    """The single release ID a request refers to, or None if there is none or it's ambiguous."""
+    release_ids = find_release_ids(text)
+    if len(release_ids) > 1:
+        logger.info(f"Ambiguous release request, found {release_ids}")
+        return None
+    return release_ids[0] if release_ids else None
+
+
+def release_tool_input(release_id: str) -> str:
+    return json.dumps({"release_id": release_id})
@@ -0,0 +1,128 @@
+import os
+import re
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+# Cached queries per retriever tool
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("RETRIEVAL_CACHE_SIZE", "256"))
+# Also treat queries that differ only in case, punctuation or spacing as the same query
+RETRIEVAL_CACHE_NORMALIZE = os.environ.get("RETRIEVAL_CACHE_NORMALIZE", "1").lower() in ("1", "true", "yes")
+
+# Every live CachingRetriever by id (pydantic models aren't hashable), so collection updates can reach them
+_caches: "weakref.WeakValueDictionary[int, CachingRetriever]" = weakref.WeakValueDictionary()
+_caches_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+class CachingRetriever(BaseRetriever):
+    """LRU cache of query -> documents in front of a retriever over one Chroma collection.
+
+    With `normalize`, queries are keyed by their normalized form, so `max_size` counts
+    distinct normalized queries; each entry remembers the exact spellings it has served,
+    to tell exact hits from normalized ones. Entries for a collection are dropped by
+    `invalidate_collection()`, which the ingestion code calls whenever it writes to that
+    collection.
+    """
+
+    # Typed as Any so pydantic keeps the wrapped retriever itself rather than a copy
+    retriever: Any
+    collection_name: str
+    name: str = ""
+    max_size: int = RETRIEVAL_CACHE_SIZE
+    normalize: bool = RETRIEVAL_CACHE_NORMALIZE
+
+    _cache: Any = PrivateAttr(default_factory=OrderedDict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _generation: int = PrivateAttr(default=0)
+    _counts: Dict[str, int] = PrivateAttr(default_factory=lambda: {"hits": 0, "normalized_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        with _caches_lock:
+            _caches[id(self)] = self
+
+    def _key(self, query: str) -> str:
+        return normalize_query(query) if self.normalize else query
+
+    def _lookup(self, query: str) -> Tuple[Optional[List[Document]], int]:
+        key = self._key(query)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None, self._generation
+            documents, spellings = entry
+            self._cache.move_to_end(key)
+            self._counts["hits" if query in spellings else "normalized_hits"] += 1
+            spellings.add(query)
+            return list(documents), self._generation
+
+    def _store(self, query: str, documents: List[Document], generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                # The collection changed while this search ran
+                return
+            key = self._key(query)
+            self._cache[key] = (list(documents), {query})
+            self._cache.move_to_end(key)
+            while len(self._cache) > max(self.max_size, 0):
+                self._cache.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        documents, generation = self._lookup(query)
+        if documents is None:
+            documents = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+            self._store(query, documents, generation)
+        return documents
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        documents, generation = self._lookup(query)
+        if documents is None:
+            documents = await self.retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+            self._store(query, documents, generation)
+        return documents
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+            self._counts["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._cache)
+        lookups = counts["hits"] + counts["normalized_hits"] + counts["misses"]
+        hit_rate = (counts["hits"] + counts["normalized_hits"]) / lookups if lookups else 0.0
+        return {"collection": self.collection_name, "size": size, **counts, "hit_rate": round(hit_rate, 3)}
+
+
+def invalidate_collection(collection_name: str) -> None:
+    """Drop cached results of every retriever reading `collection_name`."""
+    with _caches_lock:
+        caches = [cache for cache in _caches.values() if cache.collection_name == collection_name]
+    for cache in caches:
+        cache.clear()
+    if caches:
+        logger.info(f"Invalidated {len(caches)} retrieval cache(s) for {collection_name}")
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit-rate metrics per cached retriever, keyed by name (or collection)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name or cache.collection_name: cache.stats() for cache in caches}
@@ -0,0 +1,202 @@
+"""Dependency-aware scheduling of the five agents described in agents.json.
+
+Each agent declares where its inputs come from ("Agent 2") and who receives its outputs
+("Agent 4"). Those references become the edges of a DAG. Broadcast and external
+endpoints ("All Agents", "Slack", "Human reviewers") are side channels and impose no
+order. When an output is sent back to an agent that already ran, as the approved notes go
+from agent 4 back to agent 1 for distribution, the receiving end becomes its own stage
+(`agent1_from_agent4`). That is why distribution and agent 5 can run side by side.
+`run_dag` starts every stage as soon as the stages it depends on finish, and reports
+each stage's timing along with the critical path.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AGENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents.json")
+
+AGENT_REFERENCE = re.compile(r"^Agent\s+(\d+)$", re.IGNORECASE)
+
+# A stage runner receives the initial input under "input" plus each dependency's output by stage name
+Runner = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Stage:
+    name: str
+    agent_id: str
+    depends_on: List[str] = field(default_factory=list)
+    # What the stage receives from each dependency, per agents.json
+    consumes: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = "pending"  # pending | done | failed | skipped
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    output: Any = None
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+def load_agents(path: str = AGENTS_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def agent_reference(endpoint: str) -> Optional[str]:
+    match = AGENT_REFERENCE.match(endpoint.strip())
+    return match.group(1) if match else None
+
+
+def stage_name(agent_id: str) -> str:
+    return f"agent{agent_id}"
+
+
+def agent_edges(agents: List[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+    """(producer, consumer) agent ID pairs from both inputs and outputs, with what is passed."""
+    edges: Dict[Tuple[str, str], str] = {}
+    for agent in agents:
+        for item in agent.get("inputs", []):
+            source = agent_reference(item.get("source", ""))
+            if source:
+                edges.setdefault((source, agent["id"]), item.get("content", ""))
+        for item in agent.get("outputs", []):
+            recipient = agent_reference(item.get("recipient", ""))
+            if recipient:
+                edges.setdefault((agent["id"], recipient), item.get("content", ""))
+    return edges
+
+
+def build_dag(agents: List[Dict[str, Any]]) -> Dict[str, Stage]:
+    """Stages keyed by name, in an order where every stage follows its dependencies."""
+    ids = [agent["id"] for agent in agents]
+    edges = agent_edges(agents)
+    successors: Dict[str, List[str]] = {agent_id: [] for agent_id in ids}
+    for producer, consumer in edges:
+        if producer in successors and consumer in successors:
+            successors[producer].append(consumer)
+    # Entry points declare no inputs from other agents (agent 1 only listens to Slack)
+    declared_inputs = {agent["id"]: {agent_reference(item.get("source", "")) for item in agent.get("inputs", [])} - {None} for agent in agents}
+    roots = [agent_id for agent_id in ids if not declared_inputs[agent_id]] or ids[:1]
+
+    stages: Dict[str, Stage] = {}
+    on_path: List[str] = []
+
+    def visit(agent_id: str):
+        on_path.append(agent_id)
+        for consumer in sorted(successors[agent_id], key=ids.index):
+            content = edges[(agent_id, consumer)]
+            if consumer in on_path:
+                # Sent back to an agent that already ran: that agent's follow-up is a stage of its own
+                name = f"{stage_name(consumer)}_from_{stage_name(agent_id)}"
+                stages[name] = Stage(name, consumer, [stage_name(agent_id)], {stage_name(agent_id): content})
+            elif stage_name(consumer) not in stages:
+                stages[stage_name(consumer)] = Stage(stage_name(consumer), consumer)
+                stages[stage_name(consumer)].depends_on.append(stage_name(agent_id))
+                stages[stage_name(consumer)].consumes[stage_name(agent_id)] = content
+                visit(consumer)
+            else:
+                stages[stage_name(consumer)].depends_on.append(stage_name(agent_id))
+                stages[stage_name(consumer)].consumes[stage_name(agent_id)] = content
+        on_path.pop()
+
+    for root in roots:
+        if stage_name(root) not in stages:
+            stages[stage_name(root)] = Stage(stage_name(root), root)
+            visit(root)
+    return {name: stages[name] for name in topological_order(stages)}
+
+
+def topological_order(stages: Dict[str, Stage]) -> List[str]:
+    remaining = {name: set(stage.depends_on) for name, stage in stages.items()}
+    order: List[str] = []
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps - set(order)]
+        if not ready:
+            raise ValueError(f"Cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+    return order
+
+
+def critical_path(stages: Dict[str, Stage], results: Dict[str, StageResult]) -> Tuple[List[str], float]:
+    """Longest chain of dependent stages by measured duration: the floor on end-to-end latency."""
+    best: Dict[str, Tuple[float, List[str]]] = {}
+    for name in topological_order(stages):
+        before = max((best[dep] for dep in stages[name].depends_on), key=lambda item: item[0], default=(0.0, []))
+        best[name] = (before[0] + results[name].seconds, before[1] + [name])
+    if not best:
+        return [], 0.0
+    seconds, path = max(best.values(), key=lambda item: item[0])
+    return path, seconds
+
+
+async def run_dag(stages: Dict[str, Stage], runners: Dict[str, Runner], initial: Any = None) -> Dict[str, Any]:
+    """Run every stage once its dependencies are done; independent stages run concurrently.
+
+    A stage whose dependency failed or was skipped is skipped. Returns per-stage results
+    plus wall time, the sequential sum and the critical path.
+    """
+    missing = [name for name in stages if name not in runners]
+    if missing:
+        raise KeyError(f"No runner for stages: {missing}")
+    results = {name: StageResult(name) for name in stages}
+    tasks: Dict[str, asyncio.Task] = {}
+    started = time.perf_counter()
+
+    async def run_stage(name: str):
+        stage = stages[name]
+        await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        result = results[name]
+        blocked = [dep for dep in stage.depends_on if results[dep].status != "done"]
+        if blocked:
+            result.status, result.error = "skipped", f"dependency not done: {', '.join(blocked)}"
+            return
+        inputs = {"input": initial, **{dep: results[dep].output for dep in stage.depends_on}}
+        result.started = time.perf_counter()
+        try:
+            result.output = await runners[name](inputs)
+            result.status = "done"
+        except Exception as e:
+            logger.error(f"Stage {name} failed: {str(e)}")
+            result.status, result.error = "failed", str(e)
+        result.finished = time.perf_counter()
+
+    for name in stages:
+        tasks[name] = asyncio.ensure_future(run_stage(name))
+    await asyncio.gather(*tasks.values())
+
+    path, path_seconds = critical_path(stages, results)
+    report = {
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "sequential_seconds": round(sum(result.seconds for result in results.values()), 3),
+        "critical_path": path,
+        "critical_path_seconds": round(path_seconds, 3),
+        "stages": {
+            name: {
+                "status": result.status,
+                "seconds": round(result.seconds, 3),
+                "start_offset": round(result.started - started, 3) if result.started is not None else None,
+                "error": result.error,
+            }
+            for name, result in results.items()
+        },
+    }
+    logger.info(f"Critical path {' -> '.join(path)}: {report['critical_path_seconds']}s of {report['wall_seconds']}s wall")
+    return {"results": results, "report": report}
@@ -0,0 +1,153 @@
+"""Concurrent distribution of release notes to many Slack channels.
+
+- Channels are posted to in parallel (`SLACK_DISTRIBUTION_WORKERS`), each channel's
+  messages in order.
+- `chat.postMessage` is in Slack's "special" rate tier: about one message per second per
+  channel, plus a workspace-wide ceiling. A per-channel interval
+  (`SLACK_CHANNEL_POST_INTERVAL`) and a shared token bucket (`SLACK_POSTS_PER_SECOND`)
+  keep posts inside both.
+- A 429 is retried after its `Retry-After` seconds, up to `SLACK_MAX_RETRIES` times. Other
+  errors such as `channel_not_found` or `not_in_channel` fail that channel only.
+- Notes are split into section blocks of at most 3000 characters, on paragraph and line
+  boundaries where possible, and at most 50 blocks per message. Overflow messages go into
+  the first message's thread.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from slack_sdk.errors import SlackApiError
+
+from github_client import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SLACK_DISTRIBUTION_WORKERS = int(os.environ.get("SLACK_DISTRIBUTION_WORKERS", "8"))
+SLACK_CHANNEL_POST_INTERVAL = float(os.environ.get("SLACK_CHANNEL_POST_INTERVAL", "1.0"))
+SLACK_POSTS_PER_SECOND = float(os.environ.get("SLACK_POSTS_PER_SECOND", "10"))
+SLACK_MAX_RETRIES = int(os.environ.get("SLACK_MAX_RETRIES", "3"))
+
+SECTION_TEXT_LIMIT = 3000
+MAX_BLOCKS_PER_MESSAGE = 50
+# Plain-text fallback shown in notifications
+FALLBACK_TEXT_LIMIT = 300
+
+
+@dataclass
+class ChannelResult:
+    channel: str
+    ok: bool = False
+    ts: List[str] = field(default_factory=list)
+    messages: int = 0
+    blocks: int = 0
+    attempts: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def split_text(text: str, limit: int = SECTION_TEXT_LIMIT) -> List[str]:
+    """Split `text` into pieces of at most `limit` characters, preferring paragraph, then line, then word breaks."""
+    pieces: List[str] = []
+    rest = text.strip()
+    while len(rest) > limit:
+        window = rest[:limit]
+        cut = max(window.rfind("\n\n"), 0) or max(window.rfind("\n"), 0) or max(window.rfind(" "), 0) or limit
+        pieces.append(rest[:cut].rstrip())
+        rest = rest[cut:].lstrip()
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+
+def chunk_messages(notes: str, block_limit: int = SECTION_TEXT_LIMIT, max_blocks: int = MAX_BLOCKS_PER_MESSAGE) -> List[List[Dict[str, Any]]]:
+    """Block lists for each message needed to post `notes` as mrkdwn section blocks."""
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": piece}} for piece in split_text(notes, block_limit)]
+    return [blocks[start:start + max_blocks] for start in range(0, len(blocks), max_blocks)] or [[]]
+
+
+class SlackPacer:
+    """Keeps `chat.postMessage` inside Slack's special tier, per channel and workspace-wide."""
+
+    def __init__(self, channel_interval: float = SLACK_CHANNEL_POST_INTERVAL, posts_per_second: float = SLACK_POSTS_PER_SECOND):
+        self.channel_interval = channel_interval
+        self.posts = TokenBucket(posts_per_second, max(int(posts_per_second), 1))
+        self._next_post: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait_post(self, channel: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_post.get(channel, now))
+            self._next_post[channel] = start + self.channel_interval
+        if start > now:
+            time.sleep(start - now)
+        self.posts.acquire()
+
+
+def retry_after(error: SlackApiError) -> Optional[float]:
+    """Seconds Slack asked us to wait, when `error` is a 429."""
+    response = error.response
+    if response is None or (response.status_code != 429 and response.get("error") != "ratelimited"):
+        return None
+    headers = response.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def post_channel(client, channel: str, messages: List[List[Dict[str, Any]]], fallback: str, pacer: SlackPacer, max_retries: int = SLACK_MAX_RETRIES) -> ChannelResult:
+    result = ChannelResult(channel=channel, blocks=sum(len(blocks) for blocks in messages))
+    started = time.perf_counter()
+    thread_ts = None
+    try:
+        for blocks in messages:
+            for attempt in range(max_retries + 1):
+                pacer.wait_post(channel)
+                result.attempts += 1
+                try:
+                    response = client.chat_postMessage(channel=channel, text=fallback, blocks=blocks, thread_ts=thread_ts)
+                    break
+                except SlackApiError as e:
+                    delay = retry_after(e)
+                    if delay is None or attempt == max_retries:
+                        raise
+                    result.retries += 1
+                    logger.info(f"Rate limited posting to {channel}, retrying in {delay:.0f}s")
+                    time.sleep(delay)
+            result.ts.append(response["ts"])
+            result.messages += 1
+            thread_ts = thread_ts or response["ts"]
+        result.ok = True
+    except SlackApiError as e:
+        result.error = (e.response.get("error") if e.response is not None else None) or str(e)
+    except Exception as e:
+        result.error = str(e)
+    result.seconds = round(time.perf_counter() - started, 3)
+    return result
+
+
+def distribute(client, channels: List[str], notes: str, max_workers: int = SLACK_DISTRIBUTION_WORKERS, pacer: Optional[SlackPacer] = None) -> Dict[str, Any]:
+    """Post `notes` to every channel concurrently; returns {"ok", "seconds", "channels": [per-channel results]}."""
+    pacer = pacer or SlackPacer()
+    messages = chunk_messages(notes)
+    fallback = split_text(notes, FALLBACK_TEXT_LIMIT)[0] if notes.strip() else "Release notes"
+    unique_channels = list(dict.fromkeys(channels))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(unique_channels)), 1)) as executor:
+        results = list(executor.map(lambda channel: post_channel(client, channel, messages, fallback, pacer), unique_channels))
+    failed = [result.channel for result in results if not result.ok]
+    if failed:
+        logger.warning(f"Release notes not delivered to {failed}")
+    return {
+        "ok": not failed,
+        "seconds": round(time.perf_counter() - started, 3),
+        "messages_per_channel": len(messages),
+        "channels": [asdict(result) for result in results],
+    }
@@ -0,0 +1,283 @@
+"""Event-driven Slack ingestion for the agent pipeline.
+
+Replaces polling `conversations.history` with Socket Mode `message` events:
+
+- every event goes through `SlackEventIngestor.handle_event` (from Bolt's worker threads
+  or a test source). It drops bot messages and edits and dedupes redeliveries by
+  (channel, ts). Live events may arrive out of order, so they are not compared with the
+  channel's high-water mark;
+- accepted messages land on a bounded asyncio queue that the pipeline consumes with
+  `async for message in ingestor.messages()`. When the queue is full, new messages are
+  dropped and counted instead of blocking Slack's ack path;
+- a channel's high-water mark only moves once the consumer has taken a message. A
+  dropped message is recorded next to the marks until the consumer takes it, so it
+  doesn't hold the marks back. Marks and dropped messages are saved to
+  `SLACK_CURSOR_PATH` at most every `SLACK_CURSOR_SAVE_INTERVAL` seconds (and on
+  `flush`). After a restart `catch_up` re-reads each dropped message, then pages through
+  `conversations.history` from the mark (`oldest=`) instead of re-reading the latest 100
+  messages.
+"""
+import os
+import json
+import asyncio
+import logging
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LAZYPMS_CACHE_DIR = os.environ.get("LAZYPMS_CACHE_DIR", ".cache")
+SLACK_CURSOR_PATH = os.environ.get("SLACK_CURSOR_PATH", os.path.join(LAZYPMS_CACHE_DIR, "slack_cursors.json"))
+SLACK_EVENT_QUEUE_SIZE = int(os.environ.get("SLACK_EVENT_QUEUE_SIZE", "100"))
+# Recently seen (channel, ts) pairs remembered for dedup; Slack retries within minutes
+SLACK_DEDUP_SIZE = int(os.environ.get("SLACK_DEDUP_SIZE", "4096"))
+SLACK_CATCHUP_PAGE_SIZE = int(os.environ.get("SLACK_CATCHUP_PAGE_SIZE", "200"))
+SLACK_CURSOR_SAVE_INTERVAL = float(os.environ.get("SLACK_CURSOR_SAVE_INTERVAL", "5"))
+
+# Message subtypes that are not new human messages
+IGNORED_SUBTYPES = {"bot_message", "message_changed", "message_deleted", "channel_join", "channel_leave"}
+
+
+@dataclass
+class SlackMessage:
+    channel: str
+    ts: str
+    text: str
+    user: Optional[str] = None
+    thread_ts: Optional[str] = None
+
+
+def ts_value(ts: str) -> float:
+    return float(ts) if ts else 0.0
+
+
+class CursorStore:
+    """Per-channel high-water marks (latest handled `ts`) and dropped messages, saved to a JSON file."""
+
+    def __init__(self, path: Optional[str] = SLACK_CURSOR_PATH, save_interval: float = SLACK_CURSOR_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self._marks: Dict[str, str] = {}
+        # Channel -> ts of messages dropped before the consumer took them
+        self._dropped: Dict[str, List[str]] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r") as file:
+                data = json.load(file)
+            if "marks" in data:
+                self._marks = data["marks"]
+                self._dropped = data.get("dropped", {})
+            else:
+                # Older files only hold the marks
+                self._marks = data
+
+    def get(self, channel: str) -> Optional[str]:
+        with self._lock:
+            return self._marks.get(channel)
+
+    def advance(self, channel: str, ts: str) -> None:
+        """Move the channel's mark to `ts` if it is newer."""
+        with self._lock:
+            current = self._marks.get(channel)
+            if current is None or ts_value(ts) > ts_value(current):
+                self._marks[channel] = ts
+                self._dirty = True
+
+    def drop(self, channel: str, ts: str) -> None:
+        """Remember a message the consumer never got, so catch-up after a restart re-reads it."""
+        with self._lock:
+            dropped = self._dropped.setdefault(channel, [])
+            if ts not in dropped:
+                dropped.append(ts)
+                self._dirty = True
+
+    def resolve(self, channel: str, ts: str) -> None:
+        """Forget a dropped message once it has been handled (or no longer exists)."""
+        with self._lock:
+            dropped = self._dropped.get(channel)
+            if dropped and ts in dropped:
+                dropped.remove(ts)
+                if not dropped:
+                    del self._dropped[channel]
+                self._dirty = True
+
+    def dropped(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {channel: list(tss) for channel, tss in self._dropped.items()}
+
+    def save_if_due(self) -> None:
+        with self._lock:
+            due = self._dirty and time.monotonic() - self._saved_at >= self.save_interval
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {"marks": dict(self._marks), "dropped": {channel: list(tss) for channel, tss in self._dropped.items()}}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".slack_cursors.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SlackEventIngestor:
+    def __init__(self, queue_size: int = SLACK_EVENT_QUEUE_SIZE, cursors: Optional[CursorStore] = None, dedup_size: int = SLACK_DEDUP_SIZE, channels: Optional[Iterable[str]] = None):
+        self.cursors = cursors if cursors is not None else CursorStore()
+        self.dedup_size = dedup_size
+        self.channels = set(channels) if channels else None
+        self.queue: Optional[asyncio.Queue] = None
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counts = {"events": 0, "accepted": 0, "duplicates": 0, "stale": 0, "ignored": 0, "dropped": 0}
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> "SlackEventIngestor":
+        """Attach to the event loop the pipeline consumes on; call from that loop."""
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max(self.queue_size, 1))
+        return self
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def parse(self, event: Dict[str, Any]) -> Optional[SlackMessage]:
+        if event.get("type") not in ("message", "app_mention"):
+            return None
+        if event.get("subtype") in IGNORED_SUBTYPES or event.get("bot_id") or not event.get("ts"):
+            return None
+        if self.channels is not None and event.get("channel") not in self.channels:
+            return None
+        return SlackMessage(channel=event.get("channel", ""), ts=event["ts"], text=event.get("text", ""), user=event.get("user"), thread_ts=event.get("thread_ts"))
+
+    def handle_event(self, event: Dict[str, Any]) -> bool:
+        """Accept one Slack event (thread-safe); returns True if it was queued for the pipeline."""
+        self._count("events")
+        message = self.parse(event)
+        if message is None:
+            self._count("ignored")
+            return False
+        key = (message.channel, message.ts)
+        with self._lock:
+            # A message and the app_mention for it share a ts; redeliveries do too
+            if key in self._seen:
+                self.counts["duplicates"] += 1
+                return False
+            self._seen[key] = None
+            while len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+        self.loop.call_soon_threadsafe(self._enqueue, message)
+        return True
+
+    def _enqueue(self, message: SlackMessage) -> None:
+        try:
+            self.queue.put_nowait(message)
+            self._count("accepted")
+        except asyncio.QueueFull:
+            self._count("dropped")
+            self.cursors.drop(message.channel, message.ts)
+            with self._lock:
+                # Let the re-read through dedup
+                self._seen.pop((message.channel, message.ts), None)
+            logger.warning(f"Slack event queue full, dropped message {message.channel}/{message.ts}; it will be re-read on the next catch-up")
+
+    async def messages(self) -> AsyncIterator[SlackMessage]:
+        """Queued messages, oldest first; a message counts as handled once the consumer asks for the next one."""
+        while True:
+            message = await self.queue.get()
+            try:
+                yield message
+            finally:
+                self.queue.task_done()
+            self.cursors.advance(message.channel, message.ts)
+            self.cursors.resolve(message.channel, message.ts)
+            self.cursors.save_if_due()
+
+    def flush(self) -> None:
+        """Save the channel marks now (on shutdown; otherwise saves are batched)."""
+        self.cursors.save()
+
+    def catch_up(self, client, channels: Iterable[str], page_size: int = SLACK_CATCHUP_PAGE_SIZE) -> int:
+        """Feed dropped messages, then messages posted since each channel's mark (while we
+        were down), through `handle_event`.
+
+        Channels without a mark start from now. Returns the number of messages read.
+        """
+        read = 0
+        for channel, dropped in self.cursors.dropped().items():
+            for ts in sorted(dropped, key=ts_value):
+                response = client.conversations_history(channel=channel, oldest=ts, latest=ts, inclusive=True, limit=1)
+                found = [m for m in response.get("messages", []) if m.get("ts") == ts]
+                read += len(found)
+                if not found:
+                    # Deleted since; nothing left to handle
+                    self.cursors.resolve(channel, ts)
+                for message in found:
+                    self.handle_event({"type": "message", "channel": channel, **message})
+        for channel in channels:
+            oldest = self.cursors.get(channel)
+            if oldest is None:
+                continue
+            cursor = None
+            backlog: List[Dict[str, Any]] = []
+            while True:
+                response = client.conversations_history(channel=channel, oldest=oldest, limit=page_size, cursor=cursor)
+                backlog.extend(response.get("messages", []))
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not response.get("has_more") or not cursor:
+                    break
+            read += len(backlog)
+            # History comes newest first; replay oldest first so the mark only moves forward
+            for message in sorted(backlog, key=lambda m: ts_value(m.get("ts", ""))):
+                if ts_value(message.get("ts", "")) <= ts_value(oldest):
+                    # Already handled before the restart (the dedup memory doesn't survive one)
+                    self._count("stale")
+                    continue
+                self.handle_event({"type": "message", "channel": channel, **message})
+        return read
+
+    def register(self, app) -> None:
+        """Route a Bolt app's `message` and `app_mention` events into this ingestor."""
+        @app.event("message")
+        def on_message(event, ack=None):
+            self.handle_event(event)
+
+        @app.event("app_mention")
+        def on_mention(event, ack=None):
+            self.handle_event(event)
+
+    def start_socket_mode(self, bot_token: Optional[str] = None, app_token: Optional[str] = None, channels: Iterable[str] = ()) -> threading.Thread:
+        """Connect over Socket Mode in a daemon thread after catching up on missed messages."""
+        from slack_bolt import App
+        from slack_bolt.adapter.socket_mode import SocketModeHandler
+
+        app = App(token=bot_token or os.environ.get("SLACK_BOT_TOKEN"))
+        self.register(app)
+        if channels:
+            self.catch_up(app.client, channels)
+        handler = SocketModeHandler(app, app_token or os.environ.get("SLACK_APP_TOKEN"))
+        thread = threading.Thread(target=handler.start, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counts, "queued": self.queue.qsize() if self.queue else 0}
@@ -1,10 +1,14 @@
 import os
-import requests
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from dotenv import load_dotenv
 import logging
+import threading
 import agent
+import context
+from jobs import Job, JobKey, JobQueue, JobQueueFull
+from instrumentation import METRICS_PORT, start_metrics_server
+from github_client import github_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,26 +24,19 @@ REPO_OWNER = 'nehiljain'
 REPO_NAME = 'langchain-by-lazypms'
 RELEASE_TAG = 'langchain-openai==0.1.21'
 
-# GitHub API URLs
-RELEASE_URL = f'https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/tags/{RELEASE_TAG}'
-UPDATE_RELEASE_URL = f'https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/{{release_id}}'
-
-# Headers for the GitHub API request
-githubHeaders = {
-    'Accept': 'application/vnd.github.v3+json',
-}
+# GitHub API paths, requested through the shared github_client (pooled, paced, retried)
+RELEASE_URL = f'/repos/{REPO_OWNER}/{REPO_NAME}/releases/tags/{RELEASE_TAG}'
+UPDATE_RELEASE_URL = f'/repos/{REPO_OWNER}/{REPO_NAME}/releases/{{release_id}}'
 
 def get_release():
-    response = requests.get(RELEASE_URL, headers=githubHeaders)
-    response.raise_for_status()  # Raise an exception for HTTP errors
-    return response.json()
+    # Revalidated with its ETag, so repeat lookups of an unchanged release cost no quota
+    return github_client.get_json(RELEASE_URL)
 
 def update_release(release_id, new_body, access_token):
     update_data = {
         'body': new_body
     }
-    headers = {**githubHeaders, 'Authorization': f'token {os.environ.get("GITHUB_ACCESS_TOKEN")}'}
-    response = requests.patch(UPDATE_RELEASE_URL.format(release_id=release_id), json=update_data, headers=headers)
+    response = github_client.patch(UPDATE_RELEASE_URL.format(release_id=release_id), json=update_data)
     response.raise_for_status()  # Raise an exception for HTTP errors
     return response.json()
 
@@ -91,29 +88,8 @@ def handle_app_mention_events(body, say, logger):
 
 # Listens to button clicks
 
-release_notes = ""
-
-@app.action("suggest_edits_please")
-def handle_suggest_edits(ack, body, say, logger):
-    ack()
-    logger.debug(f"Suggest edits: {body}")
-    
-    say(blocks=[
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "I'm reading through <https://github.com/nehiljain/langchain-by-lazypms/releases/tag/langchain-openai%3D%3D0.1.21|your latest release (langchain-openai==0.1.21)>... I'll let you know as soon as I have a draft of potential improvements to the release notes."
-            }
-        },
-    ], text="I'm reading through...")
-
-    # Kick off the thing
-    global release_notes
-    release_notes = agent.run_agent()
-
-    if release_notes is None:
-        release_notes = """LangChain-OpenAI v0.1.21 Release Notes
+# Shown when the agent doesn't treat the request as a release-notes request; a failed run raises and fails the job
+FALLBACK_RELEASE_NOTES = """LangChain-OpenAI v0.1.21 Release Notes
 ## Executive Summary
 This release significantly enhances our OpenAI integration, focusing on structured outputs and tool calling. These improvements will drive increased efficiency in AI-powered applications and provide more robust control over AI outputs.
 Key impacts:
@@ -153,7 +129,15 @@ Relevant Pull Requests:
 - #25123: Added json_schema support for structured outputs
 - #25111: Enabled strict tool calling with schema validation"""
 
-    say(blocks = [
+# Progress posted to the request's thread as each graph node finishes
+NODE_PROGRESS = {
+    "github_data_retrieval": "Pulled the release, its issues and PRs from GitHub...",
+    "release_data_compaction": "Boiled the diffs down to what changed. Drafting the notes now...",
+    "data_analysis_content_generation": "Draft written, tidying it up...",
+}
+
+def draft_blocks(release_notes):
+    return [
         {
             "type": "section",
             "text": {
@@ -200,7 +184,59 @@ Relevant Pull Requests:
                 }
             ]
         }
-    ], text="Choose an option:")
+    ]
+
+def generate_release_notes(job: Job):
+    """Job runner: run the agent for one request and post the draft back to its channel.
+
+    A run that generates no notes raises, so JobQueue marks the job failed and tells the thread.
+    """
+    job.report("Starting on it now.")
+    release_notes = agent.run_agent(job.payload["message"], on_step=lambda node, state: job.report(NODE_PROGRESS.get(node, f"Finished {node}.")))
+    if release_notes is None:
+        release_notes = FALLBACK_RELEASE_NOTES
+    job.payload["say"](blocks=draft_blocks(release_notes), text="Choose an option:")
+    return release_notes
+
+# Agent runs happen on these workers so Bolt listener threads return right after ack()
+job_queue = JobQueue(generate_release_notes).start()
+
+def job_key(body) -> JobKey:
+    return JobKey(user=body['user']['id'], channel=body['channel']['id'], release=RELEASE_TAG)
+
+@app.action("suggest_edits_please")
+def handle_suggest_edits(ack, body, say, logger):
+    ack()
+    logger.debug(f"Suggest edits: {body}")
+    thread_ts = body.get('container', {}).get('message_ts') or body.get('message', {}).get('ts')
+
+    def notify(message):
+        say(text=message, thread_ts=thread_ts)
+
+    key = job_key(body)
+    current = job_queue.get(key)
+    if current is not None and current.active:
+        say(text="I'm already working on these release notes, I'll post the draft here when it's ready.", thread_ts=thread_ts)
+        return
+
+    say(blocks=[
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "I'm reading through <https://github.com/nehiljain/langchain-by-lazypms/releases/tag/langchain-openai%3D%3D0.1.21|your latest release (langchain-openai==0.1.21)>... I'll let you know as soon as I have a draft of potential improvements to the release notes."
+            }
+        },
+    ], text="I'm reading through...")
+    payload = {"message": f"Please generate release notes for the latest github release {RELEASE_TAG}", "say": say}
+    try:
+        job_queue.submit(key, payload, notify=notify)
+    except JobQueueFull:
+        say(text="I'm working on a lot of release notes right now. Please try again in a few minutes.", thread_ts=thread_ts)
+        return
+    waiting = job_queue.stats()["waiting"]
+    if waiting > 1:
+        notify(f"There are {waiting - 1} other requests ahead of this one.")
 
 @app.action("no_thanks_edits")
 def handle_no_thanks_edits(ack, body, say, logger):
@@ -222,9 +258,13 @@ def handle_option_1(ack, body, say, logger):
     logger.debug(f"Option 1 selected: {body}")
     user = body['user']['id']
     
-    try:
-        global release_notes
+    job = job_queue.get(job_key(body))
+    if job is None or job.status != "done":
+        say(f"<@{user}> I don't have a finished draft for you yet.")
+        return
 
+    try:
+        release_notes = job.result
         release = get_release()
         release_id = release['id']
         # Assume access_token has been retrieved and stored somewhere
@@ -244,4 +284,10 @@ def handle_option_2(ack, body, say, logger):
 
 # Start your app
 if __name__ == "__main__":
+    # Retrievers load on first use; optionally warm the ones the active graph calls in the background
+    warm_up_names = [name.strip() for name in os.environ.get("WARM_UP_RETRIEVERS", "").split(",") if name.strip()]
+    if warm_up_names:
+        threading.Thread(target=context.warm_up, args=(warm_up_names,), daemon=True).start()
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
     SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"]).start()
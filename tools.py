@@ -8,6 +8,7 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 import json
 import threading
 import os
+from slack_distribution import distribute
 
 # Initialize the Slack client and app
 SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
@@ -42,7 +43,7 @@ def slack_api_tool(input: str) -> str:
         elif operation == 'start_monitoring':
             return start_monitoring()
         elif operation == 'get_channel_history':
-            return get_channel_history(data.get('channel'), data.get('limit', 100))
+            return get_channel_history(data.get('channel'), data.get('limit', 100), data.get('oldest'))
         else:
             return f"Unknown operation: {operation}"
     except json.JSONDecodeError:
@@ -68,15 +69,13 @@ def read_message(channel: str, ts: str) -> str:
         return f"Error reading message: {str(e)}"
 
 def distribute_release_notes(channels: list, notes: str) -> str:
-    results = []
-    for channel in channels:
-        result = send_message(channel, notes)
-        results.append(f"Channel {channel}: {result}")
-    return "\n".join(results)
+    # Posts to all channels concurrently within Slack's rate limits; see slack_distribution.py
+    return json.dumps(distribute(slack_client, channels, notes))
 
-def get_channel_history(channel: str, limit: int = 100) -> str:
+def get_channel_history(channel: str, limit: int = 100, oldest: Optional[str] = None) -> str:
+    # Pass the last seen ts as `oldest` to read only newer messages (slack_events.py does this on catch-up)
     try:
-        result = slack_client.conversations_history(channel=channel, limit=limit)
+        result = slack_client.conversations_history(channel=channel, limit=limit, oldest=oldest) if oldest else slack_client.conversations_history(channel=channel, limit=limit)
         messages = result['messages']
         return json.dumps([{"text": msg["text"], "ts": msg["ts"]} for msg in messages])
     except SlackApiError as e:
@@ -116,6 +115,19 @@ from datetime import datetime, timezone
 import json
 import re
 import requests
+from github_fetch import extract_reference_numbers
+from github_graphql import fetch_release_references
+from github_client import RateLimitExceeded, github_client
+from release_cache import release_cache
+from urllib.parse import quote
+
+def release_not_modified(repo_name: str, release_id: str, etag: str) -> bool:
+    """Conditional GET for a release; a 304 means the cached copy is still current and costs no quota."""
+    try:
+        response = github_client.get(f"/repos/{repo_name}/releases/tags/{quote(release_id, safe='')}", headers={'If-None-Match': etag}, timeout=10)
+    except (requests.RequestException, RateLimitExceeded):
+        return False
+    return response.status_code == 304
 
 class GitHubReleaseInput(BaseModel):
     input: str = Field(description="Requires a JSON string containing 'release_id'. Example: {\"release_id\": \"langchain-core==1.0.0\"}")
@@ -133,20 +145,33 @@ def github_release_data_tool(input: str) -> str:
 
         
 
-        # Check if the output file exists
-        output_file = f"{release_id}.json"
-        if os.path.exists(output_file):
-            print("found cached response file for release_id", release_id)
-            with open(output_file, 'r') as file:
-                return file.read()
-            
-        g = Github(GITHUB_ACCESS_TOKEN)
-
         #real repo
-        repo = g.get_repo('langchain-ai/langchain')
-
-        #fake repo
-        fake_repo = g.get_repo('nehiljain/langchain-by-lazypms')
+        repo_name = 'langchain-ai/langchain'
+
+        # Serve from the shared release cache, revalidating stale entries with their ETag
+        cache_key = release_cache.make_key(repo_name, release_id)
+        cached = release_cache.get(cache_key)
+        if cached is not None:
+            if cached.fresh:
+                print("found cached response for release_id", release_id)
+                return cached.data
+            if cached.etag and release_not_modified(repo_name, release_id, cached.etag):
+                print("revalidated cached response for release_id", release_id)
+                release_cache.revalidated(cached)
+                return cached.data
+
+        # Seed the cache from a legacy `{release_id}.json` file in the working directory
+        legacy_file = f"{release_id}.json"
+        if cached is None and os.path.exists(legacy_file):
+            print("found legacy cached response file for release_id", release_id)
+            with open(legacy_file, 'r') as file:
+                output = file.read()
+            release_cache.put(cache_key, output)
+            return output
+
+        g = github_client.github()
+
+        repo = g.get_repo(repo_name)
 
         # Fetch the specific release
         release = repo.get_release(release_id)
@@ -165,43 +190,23 @@ def github_release_data_tool(input: str) -> str:
         for block in code_blocks:
             data["edited_code"].append(block.strip('`'))
 
-        # Extract issues and pull requests from release notes
-        issue_pattern = r'#(\d+)'
-        issues_and_prs = re.findall(issue_pattern, release.body)
-
-        for number in issues_and_prs:
-            try:
-                issue = repo.get_issue(int(number))
-                if issue.pull_request:
-                    data["pull_requests"].append({
-                        "number": issue.number,
-                        "title": issue.title,
-                        "state": issue.state,
-                        "author": issue.user.login,
-                        "diff": requests.get(issue.pull_request.diff_url).text,
-                        "created_at": issue.created_at.isoformat(),
-                    })
-                else:
-                    data["issues"].append({
-                        "number": issue.number,
-                        "title": issue.title,
-                        "state": issue.state,
-                        "author": issue.user.login,
-                        "created_at": issue.created_at.isoformat(),
-                        "closed_at": issue.closed_at.isoformat() if issue.closed_at else None
-                    })
-            except GithubException:
-                # If we can't fetch the issue/PR, we'll skip it
-                continue
-
-        # Cache the output to a local file
-        with open(output_file, 'w') as file:
-            file.write(json.dumps(data, indent=2))
-
-        return json.dumps(data, indent=2)
+        # Extract issues and pull requests from release notes and resolve them in batched
+        # GraphQL queries (REST, one call per reference, when GraphQL isn't available)
+        issues_and_prs = extract_reference_numbers(release.body)
+        data.update(fetch_release_references(repo, issues_and_prs, token=GITHUB_ACCESS_TOKEN))
 
+        output = json.dumps(data, indent=2)
+        release_cache.put(cache_key, output, etag=release.etag)
+
+        return output
+
+    except RateLimitExceeded as e:
+        return json.dumps({"error": f"Rate limit exceeded. {str(e)}."})
     except GithubException as e:
         if e.status == 403:
+            reset = (e.headers or {}).get("x-ratelimit-reset")
+            if reset and reset.isdigit():
+                return json.dumps({"error": f"Rate limit exceeded. {str(RateLimitExceeded(float(reset)))}."})
             return json.dumps({"error": "Rate limit exceeded. Please wait and try again later."})
         elif e.status == 404:
             return json.dumps({"error": "Repository or release not found. Please check the repository name and release ID."})
@@ -484,7 +489,9 @@ from pydantic.v1 import BaseModel, Field
 from langchain.agents import tool
 import json
 import logging
+import time
 from langchain.callbacks import StdOutCallbackHandler
+from instrumentation import token_usage
 from langchain.chains import LLMChain
 from langchain.llms import OpenAI
 from datetime import datetime, timedelta
@@ -515,10 +522,16 @@ class PerformanceTracker(StdOutCallbackHandler):
         self.total_time = 0
         self.query_count = 0
         self.last_update_time = datetime.now()
+        self._started = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs):
+        self._started[run_id] = time.perf_counter()
 
-    def on_llm_end(self, response, **kwargs):
-        self.total_tokens += response.llm_output['token_usage']['total_tokens']
-        self.total_time += response.llm_output['run_time']
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        # Providers report usage differently (Anthropic has no 'token_usage' or 'run_time')
+        input_tokens, output_tokens = token_usage(response)
+        self.total_tokens += input_tokens + output_tokens
+        self.total_time += time.perf_counter() - self._started.pop(run_id, time.perf_counter())
         self.query_count += 1
 
 feedback_collector = FeedbackCollector()